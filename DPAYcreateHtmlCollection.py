@@ -1,4 +1,9 @@
 import base64
+import os
+
+from html_collection import build_collection
+from inscription_cost import payload_report, print_payload_report, write_payload_report
+from recursive_collection import prepare_shared_collection
 
 def create_html_files(start, end):
     """
@@ -45,10 +50,21 @@ def create_html_files(start, end):
 """
     encoded_message = base64.b64encode('Hello World! MUCH WOW FROM @DOGEPAY_DRC20 AND @GREATAPE42069E MUCH ENJOY! SUCH FREE AIRDROP!'.encode()).decode()
     
-    for i in range(start, end + 1):
-        file_name = f"dpaystone{str(i).zfill(5)}.html"  # Generates a filename with a zero-padded sequence number
-        with open(file_name, "w") as file:
-            file.write(template.format(i, encoded_message))  # Writes the template to the file with the current number replacing {0} and the encoded message
+    if os.getenv('SHARED_TEMPLATE') == '1':
+        # Recursive mode: one dpaystone_parent.html holds the page, each item is a small stub loading it.
+        prepare_shared_collection(template, start, end, "dpaystone", "html", args=[encoded_message],
+                                  minify=os.getenv('MINIFY_HTML') == '1')
+        return
+
+    # Renders every file with {0} = its number and {1} = the encoded message on all CPU cores.
+    # Files are named 'dpaystoneXXXXX.html'; only files whose content changed are rewritten.
+    # The template's HTML, CSS and JS are minified first with MINIFY_HTML=1.
+    stats = build_collection(template, start, end, "dpaystone", "html", args=[encoded_message],
+                             minify=os.getenv('MINIFY_HTML') == '1')
+    print(f"{stats['written']} files written, {stats['unchanged']} unchanged in {stats['seconds']}s")
+    print_payload_report(payload_report(stats['sizes']))  # Byte savings and fee estimate before minting
+    write_payload_report("dpaystone_sizes.csv", stats['sizes'])
 
 # Example call that creates files from dpaystone00001.html to dpaystone00002.html
-create_html_files(1, 1500)
+if __name__ == "__main__":  # worker processes import this file, so only generate when run directly
+    create_html_files(1, 1500)
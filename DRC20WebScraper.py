@@ -1,48 +1,41 @@
 import json
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import os
+import time
 
-def setup_driver():
-    options = webdriver.ChromeOptions()
-    driver = webdriver.Chrome(options=options)
-    driver.get("https://doggy.market/dpay")
-    return driver
+from holder_fetcher import HolderFetcher
+from holder_snapshots import SnapshotStore, print_diff, scrape_snapshot
 
-def navigate_to_holders_tab(driver):
-    WebDriverWait(driver, 10).until(
-        EC.element_to_be_clickable((By.XPATH, "//li[contains(text(), 'Holders')]"))
-    ).click()
+TICK = os.getenv('DRC20_TICK', 'dpay')
 
-def scrape_addresses(driver):
-    addresses = []
-    while True:  # Use a loop to navigate through pagination
-        WebDriverWait(driver, 10).until(
-            EC.visibility_of_all_elements_located((By.CSS_SELECTOR, "td.address a"))
-        )
-        addresses.extend([elem.get_attribute('href').split('/')[-1] for elem in driver.find_elements(By.CSS_SELECTOR, "td.address a")])
+def make_fetcher():
+    return HolderFetcher(concurrency=int(os.getenv('HOLDERS_CONCURRENCY', '8')),
+                         rate=float(os.getenv('HOLDERS_RATE', '10')))
 
-        next_button = driver.find_elements(By.CSS_SELECTOR, ".pagination-item.next:not([aria-disabled='true']) button")
-        if next_button:
-            next_button[0].click()
-        else:
-            break  # Exit loop if no next button is active
+def scrape_addresses(fetcher=None, tick=TICK, refresh=False):
+    # Reads the JSON API behind doggy.market's Holders tab instead of clicking through
+    # the table in a browser: pages load in parallel and are cached in .holders_cache.
+    fetcher = fetcher or make_fetcher()
+    return [holder["address"] for holder in fetcher.fetch_holders(tick, refresh)]
 
-    return addresses
-
-def save_addresses_to_json(addresses):
+def save_addresses_to_json(addresses, path='addresses.json'):
     data = {"airDropList": [{"dogecoin_address": addr} for addr in addresses]}
-    with open('addresses.json', 'w') as file:
+    with open(path, 'w') as file:
         json.dump(data, file, indent=4)
 
 def main():
-    driver = setup_driver()
-    navigate_to_holders_tab(driver)
-    addresses = scrape_addresses(driver)
-    save_addresses_to_json(addresses)
-    print("Addresses scraped and saved to JSON.")
-    driver.quit()
+    started = time.perf_counter()
+    # Every scrape becomes a snapshot version; pages stop loading once they only
+    # repeat holders already known with the same balance (HOLDERS_STOP_AFTER=0 reads everything).
+    store = SnapshotStore(TICK)
+    version, created, pages, stopped = scrape_snapshot(make_fetcher(), store, int(os.getenv('HOLDERS_STOP_AFTER', '2')))
+    holders = store.load(version)
+    save_addresses_to_json(list(holders))
+    # Nothing changed since the latest snapshot: the delta is empty, not the previous one again.
+    added, removed, changed = store.diff(new=version) if created else ([], [], [])
+    print_diff(added, removed, changed)
+    save_addresses_to_json(added, 'addresses_delta.json')
+    print(f"{len(holders)} addresses (snapshot v{version}, {pages} pages{', stopped early' if stopped else ''}) "
+          f"saved to JSON in {time.perf_counter() - started:.2f}s; {len(added)} new in addresses_delta.json.")
 
 if __name__ == "__main__":
     main()
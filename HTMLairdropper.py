@@ -1,40 +1,68 @@
-import subprocess
-import time
 import json
-import re
 import os
-from bitcoinrpc.authproxy import AuthServiceProxy, JSONRPCException
-
-# Environment variables are used to securely store sensitive data such as RPC credentials.
-# These should be set in your operating system or through your deployment environment.
-rpc_user = os.getenv('RPC_USER', 'your_default_rpc_username')
-rpc_password = os.getenv('RPC_PASSWORD', 'your_default_rpc_password')
-rpc_host = os.getenv('RPC_HOST', 'localhost')
-rpc_port = os.getenv('RPC_PORT', '22555')  # Default Dogecoin RPC port
-
-# Setting up the AuthServiceProxy client with the RPC server.
-# This client is used to communicate with the Dogecoin node via JSON-RPC.
-rpc_connection = AuthServiceProxy(f"http://{rpc_user}:{rpc_password}@{rpc_host}:{rpc_port}/")
-
-def read_last_output(json_file_name):
+from block_events import get_block_events
+from confirmation_tracker import ConfirmationTracker
+from mint_journal import open_journal
+from mint_scheduler import MintScheduler
+from mint_shards import sharded_minting_process
+from mint_worker import MintWorkerPool
+from preflight import preflight
+from recursive_collection import ensure_parent_inscribed
+from rpc_client import RpcClient
+
+rpc_connection = block_events = confirmation_tracker = mint_pool = mint_scheduler = None
+
+def setup():
+    """
+    Connects to the node and sets up the minting services. Runs once, from continuous_minting_process,
+    so importing this module (the dpay CLI, the simulator) starts no threads and makes no RPC calls.
+    """
+    global rpc_connection, block_events, confirmation_tracker, mint_pool, mint_scheduler
+    if rpc_connection is not None:
+        return
+    # Environment variables are used to securely store sensitive data such as RPC credentials.
+    # These should be set in your operating system or through your deployment environment.
+    rpc_user = os.getenv('RPC_USER', 'your_default_rpc_username')
+    rpc_password = os.getenv('RPC_PASSWORD', 'your_default_rpc_password')
+    rpc_host = os.getenv('RPC_HOST', 'localhost')
+    rpc_port = os.getenv('RPC_PORT', '22555')  # Default Dogecoin RPC port
+
+    # Setting up the RPC client with the RPC server.
+    # It pools keep-alive connections, reconnects by itself and backs off while the node is unreachable.
+    rpc_connection = RpcClient(f"http://{rpc_user}:{rpc_password}@{rpc_host}:{rpc_port}/")
+
+    # New blocks wake the tracker and the scheduler right away: pushed over ZMQ (ZMQ_BLOCK_ENDPOINT)
+    # or the node's -blocknotify hook (BLOCKNOTIFY_PORT), otherwise polled every few seconds.
+    block_events = get_block_events(rpc_connection)
+
+    # Setting up the confirmation tracker with the RPC client.
+    # It remembers every minted txid and checks all of them with one JSON-RPC batch request per poll.
+    confirmation_tracker = ConfirmationTracker(
+        rpc_connection, block_events=block_events,
+        on_confirmed=lambda txid, confirmations, file_name: print(f"Transaction {txid} ({file_name}) is confirmed."))
+
+    # Persistent mint workers keep one Node process loaded instead of starting `node . mint`
+    # for every item. Enabled with MINT_WORKERS=1; None falls back to one process per mint.
+    mint_pool = MintWorkerPool.from_env()
+
+    # The scheduler keeps minting until the unconfirmed chain reaches the node's ancestor limit
+    # (MEMPOOL_CHAIN_LIMIT, 25 by default) and resumes as soon as a block makes room again.
+    mint_scheduler = MintScheduler(rpc_connection, tracker=confirmation_tracker, block_events=block_events,
+                                   chain_limit=int(os.getenv('MEMPOOL_CHAIN_LIMIT', '25')))
+
+def read_minted_files(json_file_name):
     """
-    Reads the last output JSON file to determine the number of entries already processed.
-    This helps in resuming the process from the last successful point after a disruption.
+    Reads the mint journal of the output JSON file to find the files already minted.
+    This helps in resuming the process after a disruption: item n always receives file n,
+    so the files in the journal are skipped instead of counting entries.
 
     Args:
     json_file_name (str): The file name of the JSON where the output is stored.
 
     Returns:
-    int: The number of entries that have been processed.
+    set: The file names that have been minted.
     """
-    if os.path.exists(json_file_name):
-        try:
-            with open(json_file_name, 'r') as file:
-                data = json.load(file)
-                return len(data)  # Return the count of entries in the JSON file.
-        except json.JSONDecodeError as e:
-            print(f"JSON decode error in {json_file_name}: {e}")
-    return 0  # If the file does not exist or is empty, return 0.
+    return set(open_journal(json_file_name).by_file)  # The journal index is loaded once and kept in memory.
 
 def extract_details(file_name):
     """
@@ -55,7 +83,8 @@ def extract_details(file_name):
 
 def update_json_file(image_path, txid, details):
     """
-    Updates or creates a JSON file with minting details including transaction ID and associated address.
+    Records minting details including transaction ID and associated address in the mint journal.
+    The journal is append-only; airDropOutput.json is rewritten from it when the campaign ends.
 
     Args:
     image_path (str): The path to the image file being inscribed.
@@ -64,104 +93,93 @@ def update_json_file(image_path, txid, details):
     """
     json_file_name = "airDropOutput.json"
     try:
-        data = {}
-        if os.path.exists(json_file_name):
-            with open(json_file_name, 'r') as file:
-                data = json.load(file)
-        key = os.path.basename(image_path)
-        data[key] = {"txid": txid, "address": details['dogecoin_address']}
-        with open(json_file_name, 'w') as file:
-            json.dump(data, file, indent=4)  # Update or create the JSON file with new data.
+        open_journal(json_file_name).record(image_path, txid, details['dogecoin_address'])  # One fsync'd line per mint.
     except Exception as e:
         print(f"Error updating {json_file_name}: {e}")
 
-def process_mint_batch(start, end, directory, file_prefix, file_extension, details_list):
+def process_mint_batch(jobs):
     """
-    Processes a batch of minting commands for a range of image files and associated addresses.
+    Processes minting commands for the jobs of a preflighted plan.
+    Each mint waits only if the unconfirmed mempool chain has no room left for it.
 
     Args:
-    start (int): The starting index for processing.
-    end (int): The ending index for processing.
-    directory (str): The directory where image files are stored.
-    file_prefix (str): The prefix of the image file names.
-    file_extension (str): The extension of the image files.
-    details_list (list): A list of details including addresses for minting.
+    jobs (list): (image path, details) pairs whose files exist and whose addresses are valid.
 
     Returns:
-    str: The transaction ID of the last successful mint in the batch.
+    str: The transaction ID of the last successful mint in the range.
     """
     last_txid = ""
-    for i in range(start, min(end, start + 12)):  # Limit the processing to 12 items at a time for safety.
-        details = details_list[i - start]
-        file_number = str(i).zfill(5)
-        image_path = os.path.join(directory, f"{file_prefix}{file_number}.{file_extension}")
-        if not os.path.exists(image_path):
-            print(f"File not found: {image_path}")
-            continue  # Skip to the next file if the current one does not exist.
-
-        mint_command = f"node . mint {details['dogecoin_address']} {image_path}"
-        result_mint = subprocess.run(mint_command, shell=True, capture_output=True, text=True)
+    for image_path, details in jobs:
+        result_mint = mint_scheduler.mint(details['dogecoin_address'], image_path, mint_pool)  # Waits for chain room if needed.
         print("Output from mint command:")
         print(result_mint.stdout)
         if result_mint.stderr:
             print("Error in mint command:")
             print(result_mint.stderr)
 
-        txid_search = re.search("inscription txid: (\\w+)", result_mint.stdout)
-        if txid_search:
-            last_txid = txid_search.group(1)
+        if result_mint.txid:
+            last_txid = result_mint.txid
             print(f"Successful mint, TXID: {last_txid}")
             update_json_file(image_path, last_txid, details)
+            confirmation_tracker.add(last_txid, os.path.basename(image_path))  # Track every txid, not just the last.
+            mint_scheduler.record_mint(last_txid)  # Update the chain depth from the node.
 
     return last_txid
 
-def wait_for_tx_confirmation(txid):
+def wait_for_confirmations():
     """
-    Waits for a transaction to be confirmed by checking its status periodically until it has at least one confirmation.
-
-    Args:
-    txid (str): The transaction ID to check for confirmation.
+    Waits until every tracked transaction has at least one confirmation or has failed.
+    All pending txids are checked together in one batch request every 10 seconds.
     """
-    while True:
-        try:
-            tx_info = rpc_connection.gettransaction(txid)
-            if tx_info and tx_info.get("confirmations", 0) >= 1:
-                print(f"Transaction {txid} is confirmed.")
-                break
-        except JSONRPCException as e:
-            print(f"Error fetching transaction {txid}: {e}")
-        time.sleep(10)  # Pause for 10 seconds between checks to avoid excessive querying.
-
-def continuous_minting_process(directory, file_prefix, file_extension):
+    confirmation_tracker.wait_all()
+    if confirmation_tracker.failed:
+        print(f"Failed transactions so far: {confirmation_tracker.failed}")
+
+def continuous_minting_process(directory, file_prefix, file_extension, wallet_dirs=None):
     """
-    Continuously processes minting in batches until all items in the list are processed. It resumes from the last successfully processed item based on the output JSON file.
+    Continuously processes minting until all items in the list are processed. It resumes from the last successfully processed item based on the output JSON file.
+    Minting is paced by the mempool chain limit rather than by fixed batches.
 
     Args:
     directory (str): The directory where the image files are stored.
     file_prefix (str): The prefix of the image file names.
     file_extension (str): The extension of the image files.
+    wallet_dirs (list): Optional doginals wallet directories. With two or more, the air drop list is
+        sharded across them and each wallet mints on its own mempool chain in parallel.
     """
-    last_count = read_last_output('airDropOutput.json')  # Determine the last processed count from the output JSON.
+    setup()
+    # Shared-template collections: inscribe the parent once and point every item stub at it.
+    ensure_parent_inscribed(directory, file_prefix, file_extension, mint_scheduler, mint_pool,
+                            tracker=confirmation_tracker)
+    if wallet_dirs and len(wallet_dirs) > 1:
+        sharded_minting_process(wallet_dirs, directory, file_prefix, file_extension, extract_details('airDropList.json'),
+                                'airDropOutput.json', use_workers=mint_pool is not None)
+        return  # The shard journals have been merged into airDropOutput.json.
+
+    minted = read_minted_files('airDropOutput.json')  # Files already recorded in the output journal.
     details_list = extract_details('airDropList.json')
-    details_list = details_list[last_count:]  # Start processing from the next item after the last processed count.
-    batch_size = 12
-    num_batches = (len(details_list) + batch_size - 1) // batch_size  # Calculate the total number of batches.
-
-    for batch_index in range(num_batches):
-        start_index = batch_index * batch_size
-        end_index = start_index + batch_size
-        print(f"Processing batch from {start_index + 1} to {end_index}")
-
-        last_txid = process_mint_batch(start_index + 1, end_index, directory, file_prefix, file_extension, details_list)
-        if last_txid:
-            print(f"Waiting for confirmation of TXID: {last_txid}")
-            wait_for_tx_confirmation(last_txid)
-        else:
-            print("No valid transactions in this batch to wait for.")
+    # One directory scan and one address check for the whole list; stops early if the wallet is short.
+    # Item n keeps file n, and files in the journal are skipped, so a rerun picks up where it stopped.
+    plan = preflight(enumerate(details_list, 1), directory, file_prefix, file_extension, minted)
+    if plan is None:
+        return
+    print(f"Processing {len(plan.jobs)} of {len(details_list)} items")
+
+    last_txid = process_mint_batch(plan.jobs)
+    if last_txid:
+        print(f"Waiting for confirmation of {len(confirmation_tracker.pending)} transactions")
+        wait_for_confirmations()
+    else:
+        print("No valid transactions to wait for.")
+
+    open_journal('airDropOutput.json').compact()  # Rewrite airDropOutput.json for downstream tools.
+    rpc_connection.print_stats()  # Calls, errors and latency per RPC method.
 
 # Initialize main variables and start process
 directory = 'E:\\nodedoginals\\dogecoin-ordinals-drc-20-inscription\\stones'
 file_prefix = 'dpaystone'
 file_extension = 'html'
+wallet_dirs = []  # Add two or more wallet directories to mint in parallel, one mempool chain per wallet.
 
-continuous_minting_process(directory, file_prefix, file_extension)
+if __name__ == "__main__":
+    continuous_minting_process(directory, file_prefix, file_extension, wallet_dirs)
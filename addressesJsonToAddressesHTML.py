@@ -1,16 +1,27 @@
 import json
 
-# Load the JSON data from the file
-with open('addresses.json', 'r') as file:
-    data = json.load(file)
+from checker_index import index_addresses_file
 
-# Extract the Dogecoin addresses and wrap them with <li> tags
-addresses = [f"<li>{entry['dogecoin_address']}</li>" for entry in data['airDropList']]
 
-# Save the addresses to a new text file with each address on a new line
-with open('addresses.html', 'w') as file:
-    for address in addresses:
-        file.write(address + "\n")
+def main():
+    # Load the JSON data from the file
+    with open('addresses.json', 'r') as file:
+        data = json.load(file)
 
-print("Addresses have been successfully written to addresses.html")
+    # Extract the Dogecoin addresses and wrap them with <li> tags
+    addresses = [f"<li>{entry['dogecoin_address']}</li>" for entry in data['airDropList']]
 
+    # Save the addresses to a new text file with each address on a new line
+    with open('addresses.html', 'w') as file:
+        for address in addresses:
+            file.write(address + "\n")
+
+    print("Addresses have been successfully written to addresses.html")
+
+    # checker.html looks addresses up in a sharded index instead of an embedded list.
+    index = index_addresses_file('addresses.json')
+    print(f"Checker index: {index['count']} addresses in {index['shards']} shards in checker_index/")
+
+
+if __name__ == "__main__":
+    main()
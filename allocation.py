@@ -0,0 +1,225 @@
+import argparse
+import time
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency: pip install 'dpay-tools[allocation]'
+    np = None
+
+from holder_aggregate import JsonListWriter, iter_holder_rows, parse_source
+from holder_snapshots import SNAPSHOT_DIR, SnapshotStore
+
+SCHEMES = ('proportional', 'capped', 'tiered', 'lottery')
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("the allocation engine needs NumPy: pip install 'dpay-tools[allocation]'")
+
+
+def _snapshot_amount(balance):
+    """A snapshot balance as a holding: 1 when the snapshot did not record one."""
+    if balance is None:
+        return 1
+    try:
+        return float(balance)
+    except ValueError:
+        return 0
+
+
+def parse_snapshot(spec, root=SNAPSHOT_DIR):
+    """'tick[@version][:weight]' -> (SnapshotStore, version or None for the latest, weight)."""
+    spec, _, weight = spec.partition(':')
+    tick, _, version = spec.partition('@')
+    return SnapshotStore(tick, root), int(version) if version else None, float(weight or 1)
+
+
+def load_holdings(sources=(), snapshots=()):
+    """(addresses, holdings) arrays over holder files and stored snapshots, in first-seen order.
+
+    sources is a list of (path, weight, per_item) as parse_source gives them; an
+    address holds weight x its count in every file it appears in (count files give
+    the count, marketplace dumps one per row, airDropLists one per entry).
+    snapshots is a list of (SnapshotStore, version, weight); a holder counts its
+    balance there, or 1 when the snapshot has none. Rows are summed with one
+    np.unique/np.bincount pass instead of a dict per address.
+    """
+    _require_numpy()
+    addresses, amounts = [], []
+    for path, weight, _ in sources:
+        for address, amount in iter_holder_rows(path):
+            addresses.append(address)
+            amounts.append(weight * amount)
+    for store, version, weight in snapshots:
+        for address, balance in store.load(version).items():
+            addresses.append(address)
+            amounts.append(weight * _snapshot_amount(balance))
+    if not addresses:
+        return np.array([], dtype=str), np.array([], dtype=float)
+    unique, first, inverse = np.unique(np.array(addresses), return_index=True, return_inverse=True)
+    holdings = np.bincount(inverse.ravel(), weights=amounts, minlength=len(unique))
+    order = np.argsort(first, kind='stable')
+    return unique[order], holdings[order]
+
+
+def _round_to_total(quotas, total, cap=None):
+    """Integer allocation summing to total from fractional quotas (largest remainder).
+
+    Leftover items go to the largest fractional parts, earlier holders first on ties;
+    nobody is pushed past cap.
+    """
+    allocation = np.floor(quotas + 1e-9).astype(np.int64)
+    left = int(total - allocation.sum())
+    if left > 0:
+        fractions = quotas - allocation
+        if cap is not None:
+            fractions[allocation >= cap] = -1
+        allocation[np.argsort(-fractions, kind='stable')[:left]] += 1
+    return allocation
+
+
+def proportional(holdings, total, cap=None):
+    """total items split in proportion to holdings; with cap nobody gets more than cap.
+
+    The capped split is water-filling: the largest holders are held at cap and the
+    rest is shared proportionally among everyone else, at a rate solved for all
+    possible numbers of capped holders at once over the sorted holdings. If cap x
+    holders is less than total, every holder gets cap and the rest is not allocated.
+    """
+    _require_numpy()
+    holdings = np.maximum(np.asarray(holdings, dtype=float), 0)
+    eligible = int(np.count_nonzero(holdings))
+    if not eligible or total <= 0:
+        return np.zeros(len(holdings), dtype=np.int64)
+    if cap is None:
+        return _round_to_total(holdings * (total / holdings.sum()), total)
+    total = min(total, cap * eligible)
+    ordered = np.sort(holdings)[::-1][:eligible]
+    # With the k largest holders at cap, the others get rate x holding, where
+    # rate = (total - k x cap) / (holdings below them). The right k is the first whose
+    # next holder stays under cap at that rate.
+    below = np.cumsum(ordered[::-1])[::-1]
+    capped = np.arange(eligible)
+    rates = (total - capped * cap) / below
+    k = int(np.argmax(rates * ordered <= cap + 1e-9))
+    quotas = np.minimum(cap, rates[k] * holdings)
+    return _round_to_total(quotas, total, cap)
+
+
+def parse_tiers(spec):
+    """'1:1,10:3,50:10' -> [(1, 1), (10, 3), (50, 10)]: holding at least 10 gets 3 items, and so on."""
+    tiers = []
+    for part in spec.split(','):
+        minimum, _, items = part.partition(':')
+        tiers.append((float(minimum), int(items)))
+    return sorted(tiers)
+
+
+def tiered(holdings, tiers):
+    """Items by the highest tier each holding reaches; below the lowest tier gets nothing."""
+    _require_numpy()
+    minimums = np.array([minimum for minimum, _ in tiers], dtype=float)
+    items = np.array([0] + [count for _, count in tiers], dtype=np.int64)
+    return items[np.searchsorted(minimums, np.asarray(holdings, dtype=float), side='right')]
+
+
+def lottery(holdings, total, seed, unique=False):
+    """total items drawn at random, each holder's odds proportional to its holding.
+
+    The same seed always gives the same draw, so a published seed lets anyone
+    check the result. With unique a holder wins at most once (total is then at most
+    the number of holders).
+    """
+    _require_numpy()
+    holdings = np.maximum(np.asarray(holdings, dtype=float), 0)
+    eligible = int(np.count_nonzero(holdings))
+    if not eligible or total <= 0:
+        return np.zeros(len(holdings), dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    odds = holdings / holdings.sum()
+    if not unique:
+        return rng.multinomial(total, odds).astype(np.int64)
+    winners = rng.choice(len(holdings), size=min(total, eligible), replace=False, p=odds)
+    return np.bincount(winners, minlength=len(holdings)).astype(np.int64)
+
+
+def allocate(holdings, scheme, total=None, cap=None, tiers=None, seed=None, unique=False, min_holding=0):
+    """Items per holder under one of SCHEMES; holders below min_holding get nothing.
+
+    cap limits the items per holder in every scheme but lottery, which only takes
+    unique (at most one win each) and raises ValueError when given a cap.
+    """
+    _require_numpy()
+    holdings = np.asarray(holdings, dtype=float)
+    if min_holding:
+        holdings = np.where(holdings >= min_holding, holdings, 0)
+    if scheme == 'tiered':
+        allocation = tiered(holdings, tiers)
+        return allocation if cap is None else np.minimum(allocation, cap)
+    if total is None:
+        raise ValueError(f"the {scheme} scheme needs a total number of items")
+    if scheme == 'proportional':
+        return proportional(holdings, total, cap)
+    if scheme == 'capped':
+        if cap is None:
+            raise ValueError("the capped scheme needs a cap")
+        return proportional(holdings, total, cap)
+    if scheme == 'lottery':
+        if cap is not None:
+            raise ValueError("the lottery scheme does not take a cap; use unique for one win per holder")
+        return lottery(holdings, total, seed, unique)
+    raise ValueError(f"Unknown scheme {scheme!r}, expected one of {', '.join(SCHEMES)}")
+
+
+def write_airdrop_list(addresses, allocation, output):
+    """airDropList with one entry per item, each holder's entries together in holder order.
+
+    Item n of the list receives file n, the layout every mint driver reads.
+    """
+    with JsonListWriter(output, 'airDropList') as writer:
+        for index in np.repeat(np.arange(len(addresses)), allocation):
+            writer.write({"dogecoin_address": str(addresses[index])})
+        return writer.count
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Allocate items to holders and write the airDropList.")
+    parser.add_argument('sources', nargs='*', metavar='path[:weight]', help="holder or count files")
+    parser.add_argument('--snapshot', action='append', default=[], metavar='tick[@version][:weight]',
+                        help="a stored holder snapshot (repeatable; default version: the latest)")
+    parser.add_argument('--snapshot-dir', default=SNAPSHOT_DIR)
+    parser.add_argument('--scheme', choices=SCHEMES, default='proportional')
+    parser.add_argument('--items', type=int, help="total items to allocate (all schemes but tiered)")
+    parser.add_argument('--cap', type=int, help="most items per holder (not with lottery)")
+    parser.add_argument('--tiers', help="tiered scheme: min_holding:items,... e.g. 1:1,10:3,50:10")
+    parser.add_argument('--seed', type=int, help="lottery seed (printed when omitted, to reproduce the draw)")
+    parser.add_argument('--unique', action='store_true', help="lottery: one win per holder at most")
+    parser.add_argument('--min-holding', type=float, default=0, help="ignore holders below this")
+    parser.add_argument('--output', default='allocated_airDropList.json')
+    args = parser.parse_args(argv)
+    if not args.sources and not args.snapshot:
+        parser.error("give holder files or --snapshot")
+    if args.scheme == 'tiered' and not args.tiers:
+        parser.error("--scheme tiered needs --tiers")
+    if args.scheme != 'tiered' and args.items is None:
+        parser.error(f"--scheme {args.scheme} needs --items")
+    if args.scheme == 'lottery' and args.cap is not None:
+        parser.error("--scheme lottery does not take --cap; use --unique for one win per holder")
+    _require_numpy()
+    if args.scheme == 'lottery' and args.seed is None:
+        args.seed = int(np.random.SeedSequence().entropy % 2 ** 32)
+        print(f"Lottery seed: {args.seed}")
+
+    started = time.perf_counter()
+    addresses, holdings = load_holdings([parse_source(spec) for spec in args.sources],
+                                        [parse_snapshot(spec, args.snapshot_dir) for spec in args.snapshot])
+    allocation = allocate(holdings, args.scheme, args.items, args.cap, args.tiers and parse_tiers(args.tiers),
+                          args.seed, args.unique, args.min_holding)
+    written = write_airdrop_list(addresses, allocation, args.output)
+    print(f"{written} items for {int(np.count_nonzero(allocation))} of {len(addresses)} holders "
+          f"(at most {int(allocation.max(initial=0))} each) saved to {args.output}")
+    print(f"Done in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
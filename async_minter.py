@@ -0,0 +1,162 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import time
+
+from block_events import get_block_events
+from confirmation_tracker import ConfirmationTracker
+from mint_journal import open_journal
+from metrics import get_metrics
+from mint_scheduler import MintScheduler
+from mint_worker import DOGINALS_COMMAND, workers_enabled
+from preflight import preflight
+from recursive_collection import ensure_parent_inscribed
+from rpc_client import get_rpc_client
+
+# Keep Ctrl+C away from running mints so they can finish and be recorded on shutdown.
+if os.name == 'nt':
+    DETACHED = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    DETACHED = {'start_new_session': True}
+
+
+class AsyncMintOrchestrator:
+    """Runs a mint campaign on asyncio.
+
+    Each wallet directory gets one task that takes jobs from a shared queue, so a
+    wallet's mints stay in order while wallets run side by side. A wallet mints one
+    item at a time (each mint spends the change of the one before it), so at most one
+    mint per wallet is in flight: add wallets to mint faster. Mint and `wallet sync`
+    subprocesses start without a shell and at most `concurrency` of them run at once;
+    the MINT_WORKERS pool (mint_worker.py) is not used by this engine. Confirmation polling runs as its own task, and the blocking RPC calls
+    run in threads, so slow RPC calls and slow mints overlap.
+
+    Ledger writes happen on the event loop thread, once per finished mint. If the run
+    is cancelled, mints that are already running are allowed to finish and are
+    recorded, no new ones start, and the output file is compacted from the journal.
+    """
+
+    def __init__(self, journal, wallet_dirs=None, concurrency=4, poll_interval=10, chain_limit=25):
+        self.journal = journal
+        self.wallet_dirs = list(wallet_dirs or [None])
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.poll_interval = poll_interval
+        self.chain_limit = chain_limit
+        self.trackers = []
+        self.stopping = False
+
+    async def run_command(self, args, cwd=None):
+        async with self.semaphore:
+            started = time.perf_counter()
+            process = await asyncio.create_subprocess_exec(
+                *DOGINALS_COMMAND, *[str(a) for a in args], cwd=cwd,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, **DETACHED)
+            stdout, stderr = await process.communicate()
+            get_metrics().observe('mint_command_seconds', time.perf_counter() - started,
+                                  command='wallet sync' if args[0] == 'wallet' else args[0], mode='async')
+        return subprocess.CompletedProcess(args, process.returncode, stdout.decode(errors='replace'),
+                                           stderr.decode(errors='replace'))
+
+    async def mint_and_record(self, scheduler, tracker, wallet_dir, image_path, details):
+        name = wallet_dir or 'wallet'
+        await asyncio.to_thread(scheduler.wait_for_capacity)
+        result = await scheduler.retry.run_async(scheduler, details['dogecoin_address'], os.path.abspath(image_path),
+                                                 lambda args: self.run_command(args, wallet_dir), wallet_dir)
+        if result.txid is None:
+            print(f"[{name}] No inscription txid for {image_path} ({result.error_class})")
+            return None
+        txid = result.txid
+        self.journal.record(image_path, txid, details['dogecoin_address'])
+        tracker.add(txid, os.path.basename(image_path))
+        await asyncio.to_thread(scheduler.record_mint, txid)
+        print(f"[{name}] Successful mint of {os.path.basename(image_path)}, TXID: {txid}")
+        return txid
+
+    async def wallet_worker(self, wallet_dir, jobs):
+        tracker = ConfirmationTracker(get_rpc_client(), poll_interval=self.poll_interval)
+        scheduler = MintScheduler(get_rpc_client(), chain_limit=self.chain_limit, block_events=get_block_events())
+        self.trackers.append(tracker)
+        while not self.stopping:
+            try:
+                image_path, details = jobs.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            step = asyncio.ensure_future(self.mint_and_record(scheduler, tracker, wallet_dir, image_path, details))
+            try:
+                await asyncio.shield(step)
+            except asyncio.CancelledError:
+                # Let a started mint finish so its txid reaches the journal.
+                self.stopping = True
+                await step
+                raise
+
+    async def confirmation_loop(self, workers_done):
+        block_events = get_block_events()
+        while True:
+            seen = block_events.generation
+            for tracker in list(self.trackers):
+                if tracker.pending:
+                    await asyncio.to_thread(tracker.poll)
+            if workers_done.is_set() and not any(tracker.pending for tracker in self.trackers):
+                return
+            # Poll again as soon as a block arrives, or after poll_interval at the latest.
+            await asyncio.to_thread(block_events.wait, seen, self.poll_interval)
+
+    async def run(self, jobs):
+        queue = asyncio.Queue()
+        for job in jobs:
+            queue.put_nowait(job)
+        workers_done = asyncio.Event()
+        confirmations = asyncio.ensure_future(self.confirmation_loop(workers_done))
+        try:
+            await asyncio.gather(*(self.wallet_worker(wallet_dir, queue) for wallet_dir in self.wallet_dirs))
+            workers_done.set()
+            await confirmations
+        finally:
+            confirmations.cancel()
+            self.journal.compact()
+        for tracker in self.trackers:
+            if tracker.failed:
+                print(f"Failed transactions: {tracker.failed}")
+
+
+def async_minting_process(directory, file_prefix, file_extension, details_list, output_file='airDropOutput.json',
+                          wallet_dirs=None, concurrency=4):
+    ensure_parent_inscribed(directory, file_prefix, file_extension, MintScheduler.from_env(),
+                            cwd=(wallet_dirs or [None])[0])
+    journal = open_journal(output_file)
+    # Item n of the airDropList goes to file number n; files already in the ledger are skipped.
+    plan = preflight(enumerate(details_list, 1), directory, file_prefix, file_extension, journal.by_file, wallet_dirs)
+    if plan is None:
+        return
+    jobs = plan.jobs
+    wallet_count = len(wallet_dirs or [None])
+    if workers_enabled():
+        print("MINT_WORKERS is ignored by the async engine; every mint runs its own doginals process.")
+    print(f"Minting {len(jobs)} items with {wallet_count} wallet(s), concurrency {min(concurrency, wallet_count)}")
+    orchestrator = AsyncMintOrchestrator(journal, wallet_dirs, concurrency,
+                                         chain_limit=int(os.getenv('MEMPOOL_CHAIN_LIMIT', '25')))
+    try:
+        asyncio.run(orchestrator.run(jobs))
+    except KeyboardInterrupt:
+        print(f"Stopped. {len(journal)} mints are recorded in {output_file}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mint an airDropList with the asyncio engine.")
+    parser.add_argument('directory')
+    parser.add_argument('file_prefix')
+    parser.add_argument('file_extension')
+    parser.add_argument('--list', default='airDropList.json')
+    parser.add_argument('--output', default='airDropOutput.json')
+    parser.add_argument('--wallet', action='append', dest='wallet_dirs', help="wallet directory (repeatable)")
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help="most mints in flight at once; a wallet mints one item at a time, "
+                             "so more than one per --wallet has no effect")
+    args = parser.parse_args()
+    with open(args.list, 'r', encoding='utf-8') as file:
+        details_list = json.load(file).get('airDropList', [])
+    async_minting_process(args.directory, args.file_prefix, args.file_extension, details_list,
+                          args.output, args.wallet_dirs, args.concurrency)
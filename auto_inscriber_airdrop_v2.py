@@ -1,8 +1,19 @@
-import subprocess
-import time
 import json
-import re
 import os
+from mint_journal import open_journal
+from mint_scheduler import MintScheduler
+from mint_worker import MintWorkerPool
+from preflight import preflight
+
+mint_pool = mint_scheduler = None
+
+def setup():
+    """Build the worker pool and scheduler on first use; importing this module touches nothing."""
+    global mint_pool, mint_scheduler
+    if mint_scheduler is not None:
+        return
+    mint_pool = MintWorkerPool.from_env()  # persistent mint workers when MINT_WORKERS is set
+    mint_scheduler = MintScheduler.from_env()  # paces mints by the node's mempool chain limit
 
 def extract_details(file_name):
     try:
@@ -23,28 +34,16 @@ def extract_details(file_name):
         return []
 
 def run_node_commands(start, end, directory, file_prefix, file_extension, details_list):
+    setup()
     file_indices = range(start, end + 1)
-    for i, details in zip(file_indices, details_list):
+    plan = preflight(zip(file_indices, details_list), directory, file_prefix, file_extension)
+    if plan is None:
+        return
+    for image_path, details in plan.jobs:
         doge_address = details['dogecoin_address']
-        file_number = str(i).zfill(5)
-        image_path = os.path.join(directory, f"{file_prefix}{file_number}.{file_extension}")
-
-        if not os.path.isfile(image_path):
-            print(f"File not found: {image_path}")
-            continue
-
-        base_file_name = os.path.basename(image_path).split('.')[0][:-5]
-        mint_command = f"node . mint {doge_address} {image_path}"
-        result_mint = subprocess.run(mint_command, shell=True, capture_output=True, text=True)
-        update_json_file(base_file_name, image_path, txid, details)
-
-        if not os.path.isfile(image_path):
-            print(f"File not found: {image_path}")
-            continue
 
         base_file_name = os.path.basename(image_path).split('.')[0][:-5]
-        mint_command = f"node . mint {doge_address} {image_path}"
-        result_mint = subprocess.run(mint_command, shell=True, capture_output=True, text=True)
+        result_mint = mint_scheduler.mint(doge_address, image_path, mint_pool)
         print("Output from mint command:")
         print(result_mint.stdout)
 
@@ -52,74 +51,42 @@ def run_node_commands(start, end, directory, file_prefix, file_extension, detail
             print("Error in mint command:")
             print(result_mint.stderr)
 
-        txid_search = re.search("inscription txid: (\w+)", result_mint.stdout)
-        if txid_search:
-            txid = txid_search.group(1)
-            print("Successful mint, updating JSON file, continuing in 100 seconds....")
+        if result_mint.txid:
+            txid = result_mint.txid
+            print("Successful mint, updating JSON file....")
             update_json_file(base_file_name, image_path, txid, details)
-            time.sleep(100)
+            mint_scheduler.record_mint(txid)
             continue
 
-        if "'64: too-long-mempool-chain'" in result_mint.stdout:
-            print("Detected specific error message, proceeding to wallet sync...")
-            while True:
-                wallet_sync_command = "node . wallet sync"
-                result_sync = subprocess.run(wallet_sync_command, shell=True, capture_output=True, text=True)
-                print("Output from wallet sync command:")
-                print(result_sync.stdout)
-
-                if result_sync.stderr:
-                    print("Error in wallet sync command:")
-                    print(result_sync.stderr)
-
-                if "inscription txid" in result_sync.stdout:
-                    txid = re.search("inscription txid: (\w+)", result_sync.stdout).group(1)
-                    update_json_file(base_file_name, image_path, txid, details)
-                    break
-
-                elif "'64: too-long-mempool-chain'" in result_sync.stdout:
-                    print("Detected specific error message, retrying in 100 seconds...")
-                    time.sleep(100)
-                else:
-                    print("Unknown response, stopping the retry loop.")
-                    break
+        print(f"Mint failed ({result_mint.error_class}), moving on to the next item.")
 
+    open_journal("airDropOutput.json").compact()
 
 def update_json_file(base_file_name, image_path, txid, details):
     json_file_name = "airDropOutput.json"
-    data = {}
-
-    try:
-        if os.path.isfile(json_file_name):
-            with open(json_file_name, 'r') as file:
-                data = json.load(file)
-    except (IOError, json.JSONDecodeError) as e:
-        print(f"Error reading from {json_file_name}: {e}")
-
-    key = os.path.basename(image_path)
-    data[key] = {
-        "txid": txid,
-        "address": details['dogecoin_address'],
-        "handle": details['handle'],
-        "at": details['at'],
-        "note": details['note']
-    }
 
     try:
-        with open(json_file_name, 'w') as file:
-            json.dump(data, file, indent=4)
+        open_journal(json_file_name).record(
+            image_path,
+            txid,
+            details['dogecoin_address'],
+            handle=details['handle'],
+            at=details['at'],
+            note=details['note']
+        )
     except IOError as e:
         print(f"Error writing to {json_file_name}: {e}")
 
-file_name = 'airDropList.json'
-details_list = extract_details(file_name)
+if __name__ == "__main__":
+    file_name = 'airDropList.json'
+    details_list = extract_details(file_name)
 
-# Replace with your specific details
-directory = 'C:\\doginals-main\\RiceCerts\\gifCerts\\redWorm'  #c:\doginals-main\RiceCerts\gifCerts\redWorm
-file_prefix = 'smallCert'
-file_extension = 'webp'
-start = 381
-end = 400
+    # Replace with your specific details
+    directory = 'C:\\doginals-main\\RiceCerts\\gifCerts\\redWorm'  #c:\doginals-main\RiceCerts\gifCerts\redWorm
+    file_prefix = 'smallCert'
+    file_extension = 'webp'
+    start = 381
+    end = 400
 
-# Run the modified function
-run_node_commands(start, end, directory, file_prefix, file_extension, details_list)
+    # Run the modified function
+    run_node_commands(start, end, directory, file_prefix, file_extension, details_list)
@@ -1,8 +1,20 @@
-import subprocess
-import time
 import json
-import re
 import os
+from mint_journal import open_journal
+from mint_scheduler import MintScheduler
+from mint_worker import MintWorkerPool
+from preflight import preflight
+from recursive_collection import ensure_parent_inscribed
+
+mint_pool = mint_scheduler = None
+
+def setup():
+    """Build the worker pool and scheduler on first use; importing this module touches nothing."""
+    global mint_pool, mint_scheduler
+    if mint_scheduler is not None:
+        return
+    mint_pool = MintWorkerPool.from_env()  # persistent mint workers when MINT_WORKERS is set
+    mint_scheduler = MintScheduler.from_env()  # waits for a block only when the mempool chain is full
 
 def extract_details(file_name):
     try:
@@ -16,69 +28,41 @@ def extract_details(file_name):
         return []
 
 def run_node_commands(start, end, directory, file_prefix, file_extension, details_list):
-    for i, details in zip(range(start, end + 1), details_list):
-        file_number = str(i).zfill(5)
-        image_path = os.path.join(directory, f"{file_prefix}{file_number}.{file_extension}")
-        if not os.path.exists(image_path):
-            print(f"File not found: {image_path}")
-            continue
-
-        mint_command = f"node . mint {details['dogecoin_address']} {image_path}"
-        result_mint = subprocess.run(mint_command, shell=True, capture_output=True, text=True)
+    setup()
+    ensure_parent_inscribed(directory, file_prefix, file_extension, mint_scheduler, mint_pool)  # shared-template parent
+    plan = preflight(zip(range(start, end + 1), details_list), directory, file_prefix, file_extension)
+    if plan is None:
+        return
+    for image_path, details in plan.jobs:
+        result_mint = mint_scheduler.mint(details['dogecoin_address'], image_path, mint_pool)
         print("Output from mint command:")
         print(result_mint.stdout)
         if result_mint.stderr:
             print("Error in mint command:")
             print(result_mint.stderr)
 
-        txid_search = re.search("inscription txid: (\\w+)", result_mint.stdout)
-        if txid_search:
-            txid = txid_search.group(1)
+        if result_mint.txid:
+            txid = result_mint.txid
             print("Successful mint, updating JSON file")
             update_json_file(image_path, txid, details)
+            mint_scheduler.record_mint(txid)
         else:
-            handle_errors(result_mint.stdout)
-
-def handle_errors(output):
-    if "'64: too-long-mempool-chain'" in output:
-        print("Detected specific error message, proceeding to wallet sync...")
-        while True:
-            result_sync = subprocess.run("node . wallet sync", shell=True, capture_output=True, text=True)
-            print("Output from wallet sync command:")
-            print(result_sync.stdout)
-            if "inscription txid" in result_sync.stdout:
-                txid = re.search("inscription txid: (\\w+)", result_sync.stdout).group(1)
-                update_json_file(image_path, txid, details)
-                break
-            elif "'64: too-long-mempool-chain'" in result_sync.stdout:
-                print("Retrying in 240 seconds...")
-                time.sleep(240)
-            else:
-                print("Unknown response, stopping the retry loop.")
-                break
+            print(f"Mint failed ({result_mint.error_class}), moving on to the next item.")
+    open_journal("airDropOutput.json").compact()
 
 def update_json_file(image_path, txid, details):
     json_file_name = "airDropOutput.json"
-    data = {}
     try:
-        if os.path.exists(json_file_name):
-            with open(json_file_name, 'r') as file:
-                data = json.load(file)
-        key = os.path.basename(image_path)
-        data[key] = {
-            "txid": txid,
-            "address": details['dogecoin_address'],
-        }
-        with open(json_file_name, 'w') as file:
-            json.dump(data, file, indent=4)
+        open_journal(json_file_name).record(image_path, txid, details['dogecoin_address'])
     except Exception as e:
         print(f"Error updating {json_file_name}: {e}")
 
-file_name = 'airDropList.json'
-details_list = extract_details(file_name)
-directory = 'E:\\nodedoginals\\dogecoin-ordinals-drc-20-inscription\\stones'
-file_prefix = 'dpaystone'
-file_extension = 'html'
-start = 1
-end = 70
-run_node_commands(start, end, directory, file_prefix, file_extension, details_list)
+if __name__ == "__main__":
+    file_name = 'airDropList.json'
+    details_list = extract_details(file_name)
+    directory = 'E:\\nodedoginals\\dogecoin-ordinals-drc-20-inscription\\stones'
+    file_prefix = 'dpaystone'
+    file_extension = 'html'
+    start = 1
+    end = 70
+    run_node_commands(start, end, directory, file_prefix, file_extension, details_list)
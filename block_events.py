@@ -0,0 +1,175 @@
+import os
+import socket
+import sys
+import threading
+import time
+
+from rpc_client import JsonRpcError, get_rpc_client
+
+_shared_events = None
+_shared_lock = threading.Lock()
+
+# Where `python block_events.py notify %s` (the node's -blocknotify hook) sends block hashes.
+DEFAULT_NOTIFY_PORT = 28555
+
+
+class BlockEvents:
+    """Wakes waiting threads the moment the node reports a new block.
+
+    Subclasses feed new block hashes into `_new_block`. Waiters read `generation`
+    before they check the chain, then call `wait(generation)`, so a block that arrives
+    between the check and the wait is not missed.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.generation = 0
+        self.best_hash = None
+        self.received_at = None
+
+    def _new_block(self, block_hash):
+        with self.condition:
+            if block_hash == self.best_hash:
+                return
+            self.best_hash = block_hash
+            self.generation += 1
+            self.received_at = time.monotonic()
+            self.condition.notify_all()
+
+    def wait(self, since=None, timeout=None):
+        """Block until a block newer than generation `since` arrives; returns its hash or None on timeout."""
+        with self.condition:
+            if since is None:
+                since = self.generation
+            if self.condition.wait_for(lambda: self.generation > since, timeout):
+                return self.best_hash
+            return None
+
+    def close(self):
+        pass
+
+
+class PollingBlockEvents(BlockEvents):
+    """Fallback source: asks the node for its best block hash every `interval` seconds."""
+
+    def __init__(self, rpc, interval=2):
+        super().__init__()
+        self.rpc = rpc
+        self.interval = interval
+        self.stopped = threading.Event()
+        try:
+            self.best_hash = rpc.getbestblockhash()
+        except (ConnectionError, JsonRpcError) as e:
+            print(f"Error reading best block: {e}")
+        self.thread = threading.Thread(target=self._run, name="block-poll", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self._new_block(self.rpc.getbestblockhash())
+            except (ConnectionError, JsonRpcError) as e:
+                print(f"Error reading best block: {e}")
+
+    def close(self):
+        self.stopped.set()
+
+
+class NotifySocketBlockEvents(BlockEvents):
+    """Listens on a local UDP port for hashes sent by the node's -blocknotify hook.
+
+    Add to dogecoin.conf:  blocknotify=python /path/to/block_events.py notify %s
+    """
+
+    def __init__(self, port=DEFAULT_NOTIFY_PORT, host='127.0.0.1'):
+        super().__init__()
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.port = self.socket.getsockname()[1]
+        self.thread = threading.Thread(target=self._run, name="block-notify", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                data, _ = self.socket.recvfrom(256)
+            except OSError:
+                return  # socket closed
+            self._new_block(data.decode(errors='replace').strip())
+
+    def close(self):
+        self.socket.close()
+
+
+class ZmqBlockEvents(BlockEvents):
+    """Subscribes to the node's ZMQ `hashblock` topic (-zmqpubhashblock=tcp://127.0.0.1:28332).
+
+    Needs pyzmq (`pip install pyzmq`).
+    """
+
+    def __init__(self, endpoint):
+        import zmq  # Optional dependency, only needed for this source.
+
+        super().__init__()
+        self.context = zmq.Context.instance()
+        self.socket = self.context.socket(zmq.SUB)
+        self.socket.setsockopt(zmq.SUBSCRIBE, b"hashblock")
+        self.socket.connect(endpoint)
+        self.zmq = zmq
+        self.thread = threading.Thread(target=self._run, name="block-zmq", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                topic, body, *_ = self.socket.recv_multipart()
+            except self.zmq.ZMQError:
+                return  # socket closed
+            if topic == b"hashblock":
+                self._new_block(body.hex())
+
+    def close(self):
+        self.socket.close(linger=0)
+
+
+def block_events_from_env(rpc):
+    """Pick the fastest block source that is configured.
+
+    ZMQ_BLOCK_ENDPOINT (with pyzmq installed) -> ZMQ subscription;
+    BLOCKNOTIFY_PORT -> UDP listener for the -blocknotify hook;
+    otherwise poll getbestblockhash every BLOCK_POLL_INTERVAL seconds (default 2).
+    """
+    endpoint = os.getenv('ZMQ_BLOCK_ENDPOINT')
+    if endpoint:
+        try:
+            return ZmqBlockEvents(endpoint)
+        except ImportError:
+            print("ZMQ_BLOCK_ENDPOINT is set but pyzmq is not installed, falling back to polling.")
+    notify_port = os.getenv('BLOCKNOTIFY_PORT')
+    if notify_port:
+        return NotifySocketBlockEvents(int(notify_port))
+    return PollingBlockEvents(rpc, float(os.getenv('BLOCK_POLL_INTERVAL', '2')))
+
+
+def get_block_events(rpc=None):
+    """The BlockEvents source shared by everything in this process, built on first use."""
+    global _shared_events
+    with _shared_lock:
+        if _shared_events is None:
+            _shared_events = block_events_from_env(rpc or get_rpc_client())
+        return _shared_events
+
+
+def send_block_notification(block_hash, port=None, host='127.0.0.1'):
+    """What the -blocknotify hook runs: forward one block hash to the listening scheduler."""
+    port = port or int(os.getenv('BLOCKNOTIFY_PORT', DEFAULT_NOTIFY_PORT))
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.sendto(block_hash.encode(), (host, port))
+
+
+if __name__ == "__main__":
+    # blocknotify=python block_events.py notify %s
+    if len(sys.argv) == 3 and sys.argv[1] == 'notify':
+        send_block_notification(sys.argv[2])
+    else:
+        print("usage: python block_events.py notify <blockhash>")
@@ -0,0 +1,290 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from holder_aggregate import JsonListWriter, iter_json_items, iter_json_members
+from manifest_converter import extract_number_from_filename, iter_journal
+
+DB_PATH = os.getenv('DPAY_DB', 'dpay.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    source TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS recipients (
+    campaign_id INTEGER NOT NULL REFERENCES campaigns(id),
+    position INTEGER NOT NULL,  -- 1-based place in the airDropList, i.e. the file number it receives
+    address TEXT NOT NULL,
+    details TEXT,
+    PRIMARY KEY (campaign_id, position)
+);
+CREATE TABLE IF NOT EXISTS inscriptions (
+    campaign_id INTEGER NOT NULL REFERENCES campaigns(id),
+    file TEXT NOT NULL,
+    number INTEGER,
+    txid TEXT,
+    address TEXT,
+    status TEXT NOT NULL,  -- minted, confirmed or failed
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (campaign_id, file)
+);
+CREATE INDEX IF NOT EXISTS recipients_address ON recipients(address);
+CREATE INDEX IF NOT EXISTS inscriptions_address ON inscriptions(address);
+CREATE INDEX IF NOT EXISTS inscriptions_txid ON inscriptions(txid);
+CREATE INDEX IF NOT EXISTS inscriptions_file ON inscriptions(file);
+"""
+
+
+def _now():
+    return time.strftime('%Y-%m-%dT%H:%M:%S')
+
+
+# mint_shards.shard_output_file: airDropOutput.json -> airDropOutput.wallet2.json
+SHARD_SUFFIX = re.compile(r'\.wallet\d+$')
+
+
+def campaign_name(path):
+    """Default campaign for a file: its path without the extension (airDropOutput, NerdStone...).
+
+    A wallet's shard journal (airDropOutput.wallet2.jsonl) belongs to the campaign
+    of the output file it is merged into.
+    """
+    return SHARD_SUFFIX.sub('', os.path.splitext(os.path.relpath(path))[0]).replace(os.sep, '/')
+
+
+class CampaignStore:
+    """Every campaign's recipients and inscriptions in one SQLite database.
+
+    The database runs in WAL mode, so a mint can write while reports and lookups
+    read. Address, txid and file name are indexed, so "has this address received
+    anything from any drop" is a single index lookup instead of loading every
+    ledger. Safe to share between threads; each thread gets its own connection.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self.local = threading.local()
+        self.campaign_ids = {}
+        with self.connection() as db:
+            db.executescript(SCHEMA)
+
+    def connection(self):
+        db = getattr(self.local, 'db', None)
+        if db is None:
+            db = self.local.db = sqlite3.connect(self.path, timeout=30)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+        return db
+
+    def campaign_id(self, name, source=None):
+        if name not in self.campaign_ids:
+            with self.connection() as db:
+                db.execute('INSERT OR IGNORE INTO campaigns (name, source, created_at) VALUES (?, ?, ?)',
+                           (name, source, _now()))
+                self.campaign_ids[name] = db.execute('SELECT id FROM campaigns WHERE name = ?', (name,)).fetchone()[0]
+        return self.campaign_ids[name]
+
+    # -- writes ----------------------------------------------------------
+
+    def add_recipients(self, campaign, details_list, source=None):
+        """Store an airDropList (replacing the campaign's previous one); returns the count."""
+        campaign_id = self.campaign_id(campaign, source)
+        with self.connection() as db:
+            db.execute('DELETE FROM recipients WHERE campaign_id = ?', (campaign_id,))
+            cursor = db.executemany(
+                'INSERT INTO recipients (campaign_id, position, address, details) VALUES (?, ?, ?, ?)',
+                ((campaign_id, position, details.get('dogecoin_address'),
+                  json.dumps({k: v for k, v in details.items() if k != 'dogecoin_address'}) if len(details) > 1 else None)
+                 for position, details in enumerate(details_list, 1)))
+            return cursor.rowcount
+
+    def add_inscriptions(self, campaign, records, source=None):
+        """Store (file, txid, address, status) rows, replacing earlier rows for the same file.
+
+        Writing the same txid as 'minted' again (a re-import, a shard merge) keeps the
+        status the chain already gave it, and a missing address keeps the known one;
+        a different txid (a re-mint) replaces the row.
+        """
+        campaign_id = self.campaign_id(campaign, source)
+        now = _now()
+        with self.connection() as db:
+            cursor = db.executemany(
+                'INSERT INTO inscriptions (campaign_id, file, number, txid, address, status, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (campaign_id, file) DO UPDATE SET '
+                'number = excluded.number, address = COALESCE(excluded.address, inscriptions.address), '
+                "status = CASE WHEN excluded.txid IS inscriptions.txid AND excluded.status = 'minted' "
+                'THEN inscriptions.status ELSE excluded.status END, '
+                'updated_at = excluded.updated_at, txid = excluded.txid',
+                ((campaign_id, file_name, extract_number_from_filename(file_name), txid, address, status, now)
+                 for file_name, txid, address, status in records))
+            return cursor.rowcount
+
+    def record_mint(self, campaign, file_name, txid, address):
+        self.add_inscriptions(campaign, [(file_name, txid, address, 'minted')])
+
+    def set_status(self, txid, status):
+        with self.connection() as db:
+            db.execute('UPDATE inscriptions SET status = ?, updated_at = ? WHERE txid = ?', (status, _now(), txid))
+
+    # -- queries ---------------------------------------------------------
+
+    def address_history(self, address):
+        """[(campaign, file, txid, status)] of every inscription sent to address."""
+        return self.connection().execute(
+            'SELECT campaigns.name, file, txid, status FROM inscriptions JOIN campaigns ON campaigns.id = campaign_id '
+            'WHERE address = ? ORDER BY campaigns.id, number', (address,)).fetchall()
+
+    def received(self, addresses, exclude_campaign=None, statuses=('minted', 'confirmed')):
+        """The subset of addresses that already received an inscription in another campaign."""
+        db = self.connection()
+        db.execute('CREATE TEMP TABLE IF NOT EXISTS lookup (address TEXT PRIMARY KEY)')
+        db.execute('DELETE FROM lookup')
+        db.executemany('INSERT OR IGNORE INTO lookup VALUES (?)', ((address,) for address in addresses))
+        rows = db.execute(
+            f'SELECT DISTINCT lookup.address FROM lookup JOIN inscriptions ON inscriptions.address = lookup.address '
+            f'JOIN campaigns ON campaigns.id = campaign_id '
+            f'WHERE campaigns.name IS NOT ? AND status IN ({",".join("?" * len(statuses))})',
+            (exclude_campaign, *statuses)).fetchall()
+        db.commit()
+        return {address for (address,) in rows}
+
+    def report(self):
+        """Per campaign: {name, recipients, minted, confirmed, failed}."""
+        rows = self.connection().execute("""
+            SELECT name,
+                   (SELECT COUNT(*) FROM recipients WHERE campaign_id = campaigns.id),
+                   (SELECT COUNT(*) FROM inscriptions WHERE campaign_id = campaigns.id AND status = 'minted'),
+                   (SELECT COUNT(*) FROM inscriptions WHERE campaign_id = campaigns.id AND status = 'confirmed'),
+                   (SELECT COUNT(*) FROM inscriptions WHERE campaign_id = campaigns.id AND status = 'failed')
+            FROM campaigns ORDER BY id""").fetchall()
+        return [dict(zip(('name', 'recipients', 'minted', 'confirmed', 'failed'), row)) for row in rows]
+
+    # -- bulk import -----------------------------------------------------
+
+    def import_file(self, path, campaign=None):
+        """Import one campaign file, streaming; returns (kind, rows) or (None, 0) if not recognised.
+
+        Understands airDropLists, {file name: txid or {"txid", "address"}} ledgers
+        (airDropOutput.json, NerdStone.json), mint journals (.jsonl) and OW manifests.
+        """
+        campaign = campaign or campaign_name(path)
+        if path.endswith('.jsonl'):
+            # Lines that do not decode (a torn write) are skipped, as the journal itself does.
+            return 'journal', self.add_inscriptions(
+                campaign, ((r['file'], r['txid'], r.get('address'), 'minted') for r, _ in iter_journal(path)), path)
+        with open(path, 'rb') as file:
+            first = file.read(64).lstrip()[:1]
+        if first == b'{':
+            first_member = next(iter_json_members(path), None)
+            if first_member is None:
+                return None, 0
+            name, value = first_member
+            if name == 'airDropList':
+                return 'airDropList', self.add_recipients(campaign, iter_json_items(path), path)
+            if isinstance(value, str) or (isinstance(value, dict) and 'txid' in value):
+                return 'ledger', self.add_inscriptions(campaign, (
+                    (file_name, entry, None, 'minted') if isinstance(entry, str)
+                    else (file_name, entry['txid'], entry.get('address'), 'minted')
+                    for file_name, entry in iter_json_members(path)), path)
+        elif first == b'[':
+            head = next(iter_json_items(path), None)
+            if isinstance(head, dict) and 'id' in head and 'meta' in head:
+                # An OW manifest names items, not files; the inscription id is "<txid>i0".
+                return 'manifest', self.add_inscriptions(campaign, (
+                    (item['meta']['name'], item['id'].rsplit('i', 1)[0], None, 'minted')
+                    for item in iter_json_items(path)), path)
+        return None, 0
+
+    def import_paths(self, paths, campaign=None):
+        """Import files and every .json/.jsonl under directories; prints what each file was."""
+        total = 0
+        for path in paths:
+            if os.path.isdir(path):
+                files = sorted(os.path.join(root, name) for root, _, names in os.walk(path)
+                               for name in names if name.endswith(('.json', '.jsonl')))
+            else:
+                files = [path]
+            for file_path in files:
+                kind, rows = self.import_file(file_path, campaign)
+                if kind is None:
+                    print(f"Skipping {file_path}: not an airDropList, ledger, journal or OW manifest")
+                else:
+                    print(f"{file_path}: {rows} rows ({kind}) into {campaign or campaign_name(file_path)}")
+                    total += rows
+        return total
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_store():
+    """The CampaignStore at DPAY_DB, shared by this process; None when DPAY_DB is not set.
+
+    Mint journals and confirmation trackers mirror into it when it is configured.
+    """
+    global _shared_store
+    if not os.getenv('DPAY_DB'):
+        return None
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = CampaignStore(os.environ['DPAY_DB'])
+        return _shared_store
+
+
+def dedupe_airdrop_list(store, source, output, campaign=None):
+    """Write source's airDropList without the addresses that already received something.
+
+    Returns (kept, dropped).
+    """
+    addresses = {details.get('dogecoin_address') for details in iter_json_items(source)}
+    already = store.received(addresses, campaign)
+    kept = 0
+    with JsonListWriter(output, 'airDropList') as writer:
+        for details in iter_json_items(source):
+            if details.get('dogecoin_address') not in already:
+                writer.write(details)
+                kept += 1
+    return kept, len(already)
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Cross-campaign SQLite store of recipients and inscriptions.")
+    parser.add_argument('--db', default=DB_PATH, help="database file (DPAY_DB, default dpay.db)")
+    commands = parser.add_subparsers(dest='action', required=True)
+    importer = commands.add_parser('import', help="import campaign JSON files or directories")
+    importer.add_argument('paths', nargs='+')
+    importer.add_argument('--campaign', help="campaign name (default: each file's path)")
+    lookup = commands.add_parser('lookup', help="every inscription an address received")
+    lookup.add_argument('address')
+    commands.add_parser('report', help="recipients and inscriptions per campaign")
+    dedupe = commands.add_parser('dedupe', help="drop addresses that already received from an airDropList")
+    dedupe.add_argument('source')
+    dedupe.add_argument('--output', required=True)
+    dedupe.add_argument('--campaign', help="ignore this campaign's own inscriptions")
+    args = parser.parse_args(argv)
+    store = CampaignStore(args.db)
+    if args.action == 'import':
+        print(f"{store.import_paths(args.paths, args.campaign)} rows imported into {args.db}")
+    elif args.action == 'lookup':
+        for campaign, file_name, txid, status in store.address_history(args.address):
+            print(f"{campaign}  {file_name}  {txid}  {status}")
+    elif args.action == 'report':
+        for row in store.report():
+            print(f"{row['name']:<40} {row['recipients']:>7} recipients  {row['minted']:>6} minted  "
+                  f"{row['confirmed']:>6} confirmed  {row['failed']:>4} failed")
+    else:
+        kept, dropped = dedupe_airdrop_list(store, args.source, args.output, args.campaign)
+        print(f"{kept} entries written to {args.output}; {dropped} addresses had already received an inscription")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import json
+import math
+import os
+import time
+
+from holder_aggregate import iter_holder_rows
+
+INDEX_DIR = 'checker_index'
+SHARD_SIZE = 1000  # addresses per shard, ~35 KB
+
+
+def shard_of(address, shard_count):
+    """FNV-1a of the address modulo shard_count; checker.html computes the same in JS."""
+    h = 2166136261
+    for char in address:
+        h = ((h ^ ord(char)) * 16777619) & 0xffffffff
+    return h % shard_count
+
+
+def shard_file_name(shard):
+    return f"{shard:04x}.txt"
+
+
+def build_checker_index(addresses, directory=INDEX_DIR, shard_size=SHARD_SIZE):
+    """Write the lookup index checker.html reads: index.json plus sorted shard files.
+
+    Each shard holds the addresses that hash to it, sorted and one per line, so the
+    page fetches the small manifest and one shard and binary-searches it: the work
+    per lookup stays the same however long the list gets. Shards left over from a
+    bigger earlier build are removed. Returns the manifest.
+    """
+    unique = sorted(set(address.strip() for address in addresses if address and address.strip()))
+    shard_count = max(1, math.ceil(len(unique) / shard_size))
+    shards = [[] for _ in range(shard_count)]
+    for address in unique:
+        shards[shard_of(address, shard_count)].append(address)
+    os.makedirs(directory, exist_ok=True)
+    for shard, members in enumerate(shards):
+        with open(os.path.join(directory, shard_file_name(shard)), 'w', encoding='utf-8', newline='\n') as file:
+            file.write('\n'.join(members))
+    keep = {shard_file_name(shard) for shard in range(shard_count)}
+    for name in os.listdir(directory):
+        if name.endswith('.txt') and name not in keep:
+            os.remove(os.path.join(directory, name))
+    manifest = {"version": 1, "hash": "fnv1a32", "count": len(unique), "shards": shard_count,
+                "built_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}
+    with open(os.path.join(directory, 'index.json'), 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=4)
+    return manifest
+
+
+def index_addresses_file(path, directory=INDEX_DIR, shard_size=SHARD_SIZE):
+    """build_checker_index from an airDropList (or any holder file holder_aggregate reads)."""
+    return build_checker_index((address for address, _ in iter_holder_rows(path)), directory, shard_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the sharded lookup index used by checker.html.")
+    parser.add_argument('addresses', nargs='?', default='addresses.json')
+    parser.add_argument('--output', default=INDEX_DIR)
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE)
+    args = parser.parse_args()
+    result = index_addresses_file(args.addresses, args.output, args.shard_size)
+    print(f"Indexed {result['count']} addresses into {result['shards']} shards in {args.output}")
@@ -0,0 +1,121 @@
+import os
+import time
+
+from block_events import get_block_events
+from campaign_store import get_store
+from metrics import get_metrics
+from rpc_client import JsonRpcError, get_rpc_client
+
+
+class ConfirmationTracker:
+    """Tracks every in-flight mint txid and checks all of them with one RPC batch per poll.
+
+    on_confirmed(txid, confirmations, label) fires once when a tx reaches the required
+    depth; on_failed(txid, reason, label) fires when the node reports the tx as
+    conflicted (negative confirmations) or has not known it for `missing_timeout` seconds
+    (default CONFIRM_MISSING_TIMEOUT, 600). A tx the node briefly does not know is
+    usually still propagating or was just evicted and rebroadcast, so that alone is
+    not a failure.
+
+    With `block_events` (see block_events.py) `wait_all` polls once per new block
+    instead of every `poll_interval` seconds, re-checking at least every `block_timeout`.
+    The time from `add` to confirmation is recorded as confirmation_seconds.
+    """
+
+    def __init__(self, batch_call, required_confirmations=1, poll_interval=10,
+                 on_confirmed=None, on_failed=None, block_events=None, block_timeout=60,
+                 missing_timeout=None):
+        self.batch_call = batch_call
+        self.required_confirmations = required_confirmations
+        self.poll_interval = poll_interval
+        self.block_events = block_events
+        self.block_timeout = block_timeout
+        if missing_timeout is None:
+            missing_timeout = float(os.getenv('CONFIRM_MISSING_TIMEOUT', '600'))
+        self.missing_timeout = missing_timeout
+        self.on_confirmed = on_confirmed
+        self.on_failed = on_failed
+        self.pending = {}  # txid -> label
+        self.depths = {}
+        self.confirmed = {}
+        self.failed = {}
+        self.added_at = {}
+        self.missing_since = {}  # txid -> when the node first did not know it
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        kwargs.setdefault('block_events', get_block_events())
+        return cls(get_rpc_client(), **kwargs)
+
+    def add(self, txid, label=None):
+        if txid not in self.confirmed and txid not in self.failed:
+            self.pending[txid] = label
+            self.depths.setdefault(txid, 0)
+            self.added_at.setdefault(txid, time.monotonic())
+
+    def poll(self):
+        """Query every pending txid in one batch and return {txid: confirmations}."""
+        txids = list(self.pending)
+        try:
+            replies = self.batch_call([("gettransaction", [txid]) for txid in txids])
+        except (ConnectionError, JsonRpcError) as e:
+            print(f"Error polling {len(txids)} transactions: {e}")
+            return {}
+        for txid, (result, error) in zip(txids, replies):
+            label = self.pending[txid]
+            if error is not None:
+                # -5: the wallet does not know this txid (not relayed yet, dropped or never broadcast).
+                if error.get("code") == -5:
+                    missing_since = self.missing_since.setdefault(txid, time.monotonic())
+                    if time.monotonic() - missing_since >= self.missing_timeout:
+                        self._fail(txid, error.get("message", "unknown transaction"), label, 'unknown')
+                else:
+                    print(f"Error fetching transaction {txid}: {error}")
+                continue
+            self.missing_since.pop(txid, None)
+            confirmations = (result or {}).get("confirmations", 0)
+            self.depths[txid] = confirmations
+            if confirmations < 0:
+                self._fail(txid, f"conflicted ({confirmations} confirmations)", label, 'conflicted')
+            elif confirmations >= self.required_confirmations:
+                del self.pending[txid]
+                self.confirmed[txid] = confirmations
+                get_metrics().observe('confirmation_seconds', time.monotonic() - self.added_at.pop(txid, time.monotonic()))
+                self._set_status(txid, 'confirmed')
+                if self.on_confirmed:
+                    self.on_confirmed(txid, confirmations, label)
+        return {txid: self.depths[txid] for txid in txids}
+
+    def _fail(self, txid, reason, label, error_class):
+        del self.pending[txid]
+        self.added_at.pop(txid, None)
+        self.missing_since.pop(txid, None)
+        self.failed[txid] = reason
+        get_metrics().inc('mint_failures_total', reason=error_class)
+        self._set_status(txid, 'failed')
+        print(f"Transaction {txid} ({label}) failed: {reason}")
+        if self.on_failed:
+            self.on_failed(txid, reason, label)
+
+    def _set_status(self, txid, status):
+        store = get_store()
+        if store is not None:
+            store.set_status(txid, status)
+
+    def wait_all(self, max_polls=None):
+        """Poll until nothing is pending; returns False if max_polls ran out first."""
+        polls = 0
+        while self.pending:
+            seen = self.block_events.generation if self.block_events is not None else None
+            self.poll()
+            polls += 1
+            if not self.pending:
+                break
+            if max_polls is not None and polls >= max_polls:
+                print(f"{len(self.pending)} transactions still unconfirmed after {polls} polls.")
+                return False
+            if self.block_events is not None:
+                self.block_events.wait(seen, self.block_timeout)
+            else:
+                time.sleep(self.poll_interval)
+        return True
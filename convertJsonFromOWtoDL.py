@@ -1,22 +1,10 @@
-import json
+from manifest_converter import convert
 
-# Load the original JSON data from 'OW.json'
-with open('OW.json', 'r') as file:
-    original_data = json.load(file)
+if __name__ == "__main__":
+    # Transform the OW manifest into the DL format, one item at a time.
+    # To write OW, DL and DM in a single pass straight from the ledger, run e.g.
+    #   python manifest_converter.py NerdStone.json --output ow=OW.json --output dl=DL.json --output dm=DM.json
+    convert('OW.json', [('dl', 'DL.json')], symbol="nerd_stones",
+            image_uri="https://media.ordinalswallet.com/c32ff552851a130d4100aeec5950725884bd8f3efa18d25b56a5e0a589c28847.jpeg")
 
-# Transform the data
-transformed_data = {"body": []}
-for item in original_data:
-    new_item = {
-        "inscriptionId": item["id"],
-        "name": item["meta"]["name"],
-        "imageURI": "https://media.ordinalswallet.com/c32ff552851a130d4100aeec5950725884bd8f3efa18d25b56a5e0a589c28847.jpeg",
-        "collectionSymbol": "nerd_stones"
-    }
-    transformed_data["body"].append(new_item)
-
-# Save the transformed data to a new JSON file
-with open('DL.json', 'w') as file:
-    json.dump(transformed_data, file, indent=4)
-
-print("The JSON data has been transformed and saved to 'DL.json'.")
+    print("The JSON data has been transformed and saved to 'DL.json'.")
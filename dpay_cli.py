@@ -0,0 +1,332 @@
+"""dpay: one command line for the collection, holder and mint tools.
+
+    dpay generate TEMPLATE START END PREFIX   build a numbered HTML collection
+    dpay scrape [TICK]                         fetch holders into addresses.json and a snapshot
+    dpay mint DIRECTORY PREFIX [EXTENSION]     mint an airDropList
+    dpay convert SOURCE --output ow=OW.json    ledger -> marketplace manifests
+    dpay snapshot TICK list|import|diff|delta  versioned holder snapshots
+    dpay retry list|mint                       mints that ended in the dead-letter queue
+    dpay fanout status|reconcile               fan-out funding of the mint wallets
+    dpay verify [LEDGER] --list LIST           check minted txids against the node
+    dpay allocate HOLDERS... --items N         holder-weighted airDropList (needs NumPy)
+    dpay db import|lookup|report|dedupe        cross-campaign SQLite store (DPAY_DB)
+
+Settings can come from a config file (--config, DPAY_CONFIG, or dpay.toml / dpay.json
+in the current directory). Its [env] table sets environment variables such as
+RPC_USER that are not already set; a table named after a subcommand supplies
+defaults for that subcommand's options, e.g. [mint] engine = "async". Flags always
+win. Each subcommand imports only the modules it needs, so light commands start
+instantly and nothing connects to the node until a mint starts.
+
+Mints report latency and retry metrics (see metrics.py: METRICS_TRACE,
+METRICS_TEXTFILE, METRICS_PORT) and print a summary at the end; --profile PATH
+runs any subcommand under cProfile.
+"""
+import argparse
+import json
+import os
+import sys
+
+CONFIG_FILES = ('dpay.toml', 'dpay.json')
+
+
+def load_config(path=None):
+    """Settings from a TOML or JSON config file; {} when there is none."""
+    path = path or os.getenv('DPAY_CONFIG') or next((name for name in CONFIG_FILES if os.path.exists(name)), None)
+    if not path:
+        return {}
+    if path.endswith('.toml'):
+        try:
+            import tomllib  # Python 3.11+
+        except ImportError:
+            import tomli as tomllib  # Same API; a dependency on Python 3.9 and 3.10
+
+        with open(path, 'rb') as file:
+            return tomllib.load(file)
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def read_airdrop_list(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file).get('airDropList', [])
+
+
+def cmd_generate(args):
+    from html_collection import build_collection, load_manifest
+    from inscription_cost import payload_report, print_payload_report, write_payload_report
+
+    with open(args.template, 'r', encoding='utf-8') as file:
+        template = file.read()
+    if args.shared:
+        from recursive_collection import prepare_shared_collection
+
+        prepare_shared_collection(template, args.start, args.end, args.file_prefix, args.extension, args.directory,
+                                  args.arg, args.manifest, args.minify)
+        return
+    manifest = load_manifest(args.manifest, args.start) if args.manifest else None
+    stats = build_collection(template, args.start, args.end, args.file_prefix, args.extension, args.directory,
+                             args.arg, manifest, args.workers, args.archive, minify=args.minify)
+    print(f"{stats['total']} files: {stats['written']} written, {stats['unchanged']} unchanged "
+          f"in {stats['seconds']:.2f}s")
+    print_payload_report(payload_report(stats['sizes']))
+    if args.report:
+        write_payload_report(args.report, stats['sizes'])
+
+
+def cmd_scrape(args):
+    from DRC20WebScraper import save_addresses_to_json
+    from holder_fetcher import HolderFetcher
+
+    fetcher = HolderFetcher(concurrency=args.concurrency, rate=args.rate)
+    if args.no_snapshot:
+        holders = fetcher.fetch_holders(args.tick, args.refresh)
+        save_addresses_to_json([holder["address"] for holder in holders], args.output)
+        print(f"{len(holders)} addresses saved to {args.output} {fetcher.stats()}")
+        return
+    from holder_snapshots import SnapshotStore, print_diff, scrape_snapshot
+
+    store = SnapshotStore(args.tick, args.snapshot_dir)
+    version, created, pages, stopped = scrape_snapshot(fetcher, store, 0 if args.full else args.stop_after)
+    holders = store.load(version)
+    save_addresses_to_json(list(holders), args.output)
+    # An unchanged scrape records no version; diffing the latest again would repeat the last delta.
+    added, removed, changed = store.diff(new=version) if created else ([], [], [])
+    print_diff(added, removed, changed)
+    if args.delta:
+        save_addresses_to_json(added, args.delta)
+    print(f"{len(holders)} addresses (snapshot v{version}, {pages} pages{', stopped early' if stopped else ''}) "
+          f"saved to {args.output} {fetcher.stats()}")
+
+
+def cmd_mint(args):
+    wallet_dirs = args.wallet or []
+    if args.fund_from and (args.engine != 'sharded' or not wallet_dirs):
+        sys.exit("--fund-from needs --engine sharded and the --wallet directories to fund")
+    if args.engine == 'async':
+        from async_minter import async_minting_process
+
+        async_minting_process(args.directory, args.file_prefix, args.extension, read_airdrop_list(args.list),
+                              args.output, wallet_dirs or None, args.concurrency)
+    elif args.engine == 'sharded':
+        from mint_shards import sharded_minting_process
+        from mint_worker import workers_enabled
+
+        sharded_minting_process(wallet_dirs, args.directory, args.file_prefix, args.extension,
+                                read_airdrop_list(args.list), args.output, use_workers=workers_enabled(),
+                                fund_from=args.fund_from)
+    else:
+        if (args.list, args.output) != ('airDropList.json', 'airDropOutput.json'):
+            sys.exit("--engine sequential reads airDropList.json and writes airDropOutput.json; "
+                     "use --engine async for other files")
+        import inscriberauto
+
+        inscriberauto.continuous_minting_process(args.directory, args.file_prefix, args.extension, wallet_dirs)
+    from metrics import get_metrics
+
+    get_metrics().print_summary()
+
+
+def cmd_convert(args):
+    from manifest_converter import convert, resolve_source
+
+    manifests = [tuple(spec.split('=', 1)) for spec in args.output]
+    count = convert(args.source, manifests, name=args.name, symbol=args.symbol, image_uri=args.image_uri)
+    print(f"{count} items from {resolve_source(args.source)} written to {', '.join(path for _, path in manifests)}")
+
+
+def cmd_snapshot(args):
+    from holder_snapshots import SnapshotStore, delta_airdrop, load_holder_file, print_diff
+
+    store = SnapshotStore(args.tick, args.snapshot_dir)
+    if args.action == 'list':
+        for item in store.index:
+            print(f"v{item['version']}  {item['taken_at']}  {item['holders']:>7} holders  {item['source']}")
+    elif args.action == 'import':
+        if not args.path:
+            sys.exit("dpay snapshot TICK import needs a file")
+        version, created = store.record(load_holder_file(args.path), args.path)
+        print(f"Recorded {args.path} as version {version}" if created else f"{args.path} is unchanged from version {version}")
+    else:
+        old, new = (args.versions + [None, None])[:2]
+        added, removed, changed = store.diff(old, new)
+        print_diff(added, removed, changed)
+        if args.action == 'delta':
+            airdrop = delta_airdrop(added, changed if args.with_increased else ())
+            with open(args.output, 'w') as file:
+                json.dump(airdrop, file, indent=4)
+            print(f"{len(airdrop['airDropList'])} addresses saved to {args.output}")
+
+
+def cmd_retry(args):
+    from mint_retry import DeadLetterQueue, retry_dead_letters
+
+    queue = DeadLetterQueue(args.file)
+    if args.action == 'list':
+        for entry in queue.entries():
+            if not args.error_class or entry['error_class'] in args.error_class:
+                print(f"{entry['error_class']:<18} {entry['attempts']} attempt(s)  {entry['image_path']}  {entry['address']}")
+        return
+    minted = retry_dead_letters(args.output, args.error_class, queue)
+    print(f"{len(minted)} dead-lettered items minted, {len(queue.entries())} left in {args.file}")
+
+
+def cmd_fanout(args):
+    from fanout import FanoutLedger, fanout_ledger_path, reconcile
+
+    if args.action == 'status':
+        for fanout in FanoutLedger(fanout_ledger_path(args.output)).entries:
+            print(f"{fanout['txid']}  {fanout['created_at']}  {fanout['status']:<10} {len(fanout['splits'])} wallets")
+    else:
+        reconcile(fanout_ledger_path(args.output), args.output, sweep=args.sweep)
+
+
+def cmd_verify(args):
+    from mint_verifier import VerifiedCache, print_report, verify_ledger
+
+    report = verify_ledger(args.source, args.list, VerifiedCache(args.cache), workers=args.workers,
+                           batch_size=args.batch_size, required_confirmations=args.confirmations, recheck=args.recheck)
+    print_report(report)
+    with open(args.report, 'w') as file:
+        json.dump(report, file, indent=4)
+
+
+def cmd_allocate(args):
+    from allocation import main as allocation_main
+
+    allocation_main(args.arguments, prog='dpay allocate')
+
+
+def cmd_db(args):
+    from campaign_store import main as campaign_store_main
+
+    campaign_store_main(args.arguments, prog='dpay db')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='dpay', description="DPAY collection, holder and mint tools.")
+    parser.add_argument('--config', help="TOML or JSON settings file (default: DPAY_CONFIG, dpay.toml, dpay.json)")
+    parser.add_argument('--profile', metavar='PATH', help="run under cProfile and save the stats to PATH")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help="build a numbered HTML collection from a template")
+    generate.add_argument('template', nargs='?')
+    generate.add_argument('start', nargs='?', type=int)
+    generate.add_argument('end', nargs='?', type=int)
+    generate.add_argument('file_prefix', nargs='?')
+    generate.add_argument('--extension', default='html')
+    generate.add_argument('--directory', default='.')
+    generate.add_argument('--arg', action='append', default=[], help="value for {1}, {2}, ... (repeatable)")
+    generate.add_argument('--manifest', help="CSV or JSON file with per-item traits")
+    generate.add_argument('--workers', type=int)
+    generate.add_argument('--archive', help="write into this .zip / .tar / .tar.gz instead")
+    generate.add_argument('--minify', action='store_true')
+    generate.add_argument('--report', help="per-file sizes and fee estimates CSV")
+    generate.add_argument('--shared', action='store_true', help="one shared parent template plus tiny item stubs")
+    generate.set_defaults(handler=cmd_generate, required=('template', 'start', 'end', 'file_prefix'))
+
+    scrape = commands.add_parser('scrape', help="fetch a token's holders")
+    scrape.add_argument('tick', nargs='?', default='dpay')
+    scrape.add_argument('--output', default='addresses.json')
+    scrape.add_argument('--delta', default='addresses_delta.json', help="new holders since the last snapshot")
+    scrape.add_argument('--concurrency', type=int, default=8)
+    scrape.add_argument('--rate', type=float, default=10, help="max requests per second")
+    scrape.add_argument('--stop-after', type=int, default=2, help="stop after N unchanged pages")
+    scrape.add_argument('--full', action='store_true', help="read every page")
+    scrape.add_argument('--refresh', action='store_true', help="ignore cached pages (--no-snapshot)")
+    scrape.add_argument('--no-snapshot', action='store_true', help="just write addresses.json")
+    scrape.add_argument('--snapshot-dir', default=os.getenv('SNAPSHOT_DIR', 'snapshots'))
+    scrape.set_defaults(handler=cmd_scrape, required=())
+
+    mint = commands.add_parser('mint', help="mint an airDropList")
+    mint.add_argument('directory', nargs='?')
+    mint.add_argument('file_prefix', nargs='?')
+    mint.add_argument('extension', nargs='?', default='html')
+    mint.add_argument('--engine', choices=('sequential', 'sharded', 'async'), default='sequential')
+    mint.add_argument('--list', default='airDropList.json')
+    mint.add_argument('--output', default='airDropOutput.json')
+    mint.add_argument('--wallet', action='append', help="doginals wallet directory (repeatable)")
+    mint.add_argument('--concurrency', type=int, default=4,
+                      help="async engine: most mints in flight at once, one per --wallet at most")
+    mint.add_argument('--fund-from', help="sharded engine: fund every --wallet from this wallet directory first")
+    mint.set_defaults(handler=cmd_mint, required=('directory', 'file_prefix'))
+
+    convert = commands.add_parser('convert', help="mint ledger -> marketplace manifests")
+    convert.add_argument('source', nargs='?', default='airDropOutput.json')
+    convert.add_argument('--output', action='append', metavar='FORMAT=PATH', help="ow, dl or dm manifest (repeatable)")
+    convert.add_argument('--name', default='Nerd Stone')
+    convert.add_argument('--symbol', default='nerd_stones')
+    convert.add_argument('--image-uri', default="https://media.ordinalswallet.com/"
+                                                "c32ff552851a130d4100aeec5950725884bd8f3efa18d25b56a5e0a589c28847.jpeg")
+    convert.set_defaults(handler=cmd_convert, required=('output',))
+
+    snapshot = commands.add_parser('snapshot', help="versioned holder snapshots and airdrop deltas")
+    snapshot.add_argument('tick', nargs='?')
+    snapshot.add_argument('action', nargs='?', choices=('list', 'import', 'diff', 'delta'), default='list')
+    snapshot.add_argument('versions', nargs='*', type=int, help="old and new version for diff/delta")
+    snapshot.add_argument('--path', help="file to import")
+    snapshot.add_argument('--output', default='delta_airDropList.json')
+    snapshot.add_argument('--with-increased', action='store_true')
+    snapshot.add_argument('--snapshot-dir', default=os.getenv('SNAPSHOT_DIR', 'snapshots'))
+    snapshot.set_defaults(handler=cmd_snapshot, required=('tick',))
+
+    retry = commands.add_parser('retry', help="list or re-mint items in the dead-letter queue")
+    retry.add_argument('action', nargs='?', choices=('list', 'mint'), default='list')
+    retry.add_argument('--file', default=os.getenv('MINT_DEAD_LETTERS', 'dead_letters.jsonl'))
+    retry.add_argument('--class', dest='error_class', action='append', help="only this error class (repeatable)")
+    retry.add_argument('--output', default='airDropOutput.json', help="ledger to record the mints in")
+    retry.set_defaults(handler=cmd_retry, required=())
+
+    fanout = commands.add_parser('fanout', help="fan-out funding of the mint wallets")
+    fanout.add_argument('action', nargs='?', choices=('status', 'reconcile'), default='status')
+    fanout.add_argument('--output', default='airDropOutput.json', help="the campaign's mint ledger")
+    fanout.add_argument('--sweep', action='store_true', help="send what the funded wallets have left back")
+    fanout.set_defaults(handler=cmd_fanout, required=())
+
+    verify = commands.add_parser('verify', help="check every minted txid against the node")
+    verify.add_argument('source', nargs='?', default='airDropOutput.json', help="mint ledger or journal")
+    verify.add_argument('--list', help="airDropList the ledger was minted from")
+    verify.add_argument('--report', default='verify_report.json')
+    verify.add_argument('--cache', default=os.getenv('VERIFIED_CACHE', '.verified_txs.jsonl'))
+    verify.add_argument('--workers', type=int, default=4)
+    verify.add_argument('--batch-size', type=int, default=50)
+    verify.add_argument('--confirmations', type=int, default=1, help="required depth")
+    verify.add_argument('--recheck', action='store_true', help="ignore the cache")
+    verify.set_defaults(handler=cmd_verify, required=())
+
+    allocate = commands.add_parser('allocate', add_help=False, help="holder-weighted airDropList (see allocation.py)")
+    allocate.add_argument('arguments', nargs=argparse.REMAINDER)
+    allocate.set_defaults(handler=cmd_allocate, required=())
+
+    db = commands.add_parser('db', add_help=False, help="cross-campaign SQLite store (see campaign_store.py)")
+    db.add_argument('arguments', nargs=argparse.REMAINDER)
+    db.set_defaults(handler=cmd_db, required=())
+    return parser, commands
+
+
+def main(argv=None):
+    parser, commands = build_parser()
+    pre_args, _ = parser.parse_known_args(argv)
+    config = load_config(pre_args.config)
+    for key, value in config.get('env', {}).items():
+        os.environ.setdefault(key, str(value))
+    for name, subparser in commands.choices.items():
+        subparser.set_defaults(**{key.replace('-', '_'): value for key, value in config.get(name, {}).items()})
+    args, unknown = parser.parse_known_args(argv)
+    if args.command in ('allocate', 'db'):
+        args.arguments = unknown + args.arguments  # leading options such as --db belong to the module
+    elif unknown:
+        parser.error(f"unrecognized arguments: {' '.join(unknown)}")
+    missing = [name for name in args.required if getattr(args, name) in (None, [])]
+    if missing:
+        parser.error(f"{args.command} needs {', '.join(missing)} (as arguments or in the config file)")
+    if args.profile:
+        from metrics import profile_call
+
+        profile_call(args.handler, args, path=args.profile)
+    else:
+        args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+import argparse
+import json
+import math
+import os
+import shlex
+import subprocess
+import time
+
+from block_events import get_block_events
+from confirmation_tracker import ConfirmationTracker
+from inscription_cost import FEE_PER_KB, INSCRIPTION_OUTPUT_SATS, SATS_PER_DOGE, estimate_inscription
+from mint_journal import open_journal
+from mint_worker import run_doginals
+from preflight import content_type
+from rpc_client import JsonRpcError, get_rpc_client
+
+# Head room per split on top of the estimated cost (fee drift, doginals' change outputs).
+FANOUT_MARGIN = float(os.getenv('FANOUT_MARGIN', '0.1'))
+# Smallest output worth creating; anything less is left to the fee (Dogecoin Core dust limit).
+MIN_OUTPUT_SATS = SATS_PER_DOGE
+# P2PKH sizes: tx header, one signed input, one output.
+TX_HEADER_BYTES, INPUT_BYTES, OUTPUT_BYTES = 10, 148, 34
+# Signs with a doginals wallet, run in its directory (see walletsign.js).
+SIGNER_COMMAND = (shlex.split(os.environ['WALLET_SIGNER_COMMAND']) if 'WALLET_SIGNER_COMMAND' in os.environ
+                  else ['node', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'walletsign.js')])
+
+
+def fanout_ledger_path(output_file):
+    """airDropOutput.json -> airDropOutput.fanout.json, next to the campaign's mint ledger."""
+    return os.path.splitext(output_file)[0] + '.fanout.json'
+
+
+def load_wallet(wallet_dir):
+    with open(os.path.join(wallet_dir or '.', '.wallet.json'), 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_wallet(wallet_dir, wallet):
+    path = os.path.join(wallet_dir or '.', '.wallet.json')
+    with open(path + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump(wallet, file, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def ensure_wallet(wallet_dir):
+    """The doginals wallet in wallet_dir, created with `wallet new` if there is none yet."""
+    if not os.path.exists(os.path.join(wallet_dir or '.', '.wallet.json')):
+        print(f"Creating a doginals wallet in {wallet_dir}")
+        run_doginals(['wallet', 'new'], cwd=wallet_dir)
+    return load_wallet(wallet_dir)
+
+
+def tx_fee(inputs, outputs, fee_per_kb=None):
+    fee_per_kb = FEE_PER_KB if fee_per_kb is None else fee_per_kb
+    return math.ceil((TX_HEADER_BYTES + inputs * INPUT_BYTES + outputs * OUTPUT_BYTES) * fee_per_kb / 1000)
+
+
+def shard_cost(jobs, fee_per_kb=None):
+    """Estimated satoshis to mint jobs ([(image_path, details)]): fees plus inscription outputs."""
+    cost = 0
+    for image_path, _ in jobs:
+        estimate = estimate_inscription(os.path.getsize(image_path), content_type(image_path), fee_per_kb)
+        cost += estimate["fee_sats"] + INSCRIPTION_OUTPUT_SATS
+    return cost
+
+
+def plan_fanout(shards, wallet_dirs, fee_per_kb=None, margin=FANOUT_MARGIN):
+    """One split per wallet that needs funding: {wallet, address, sats, files}.
+
+    shards holds each wallet's jobs. A wallet that already holds enough for its
+    share (a resumed campaign) gets no split; one that holds part of it is topped up.
+    """
+    splits = []
+    for wallet_dir, jobs in zip(wallet_dirs, shards):
+        if not jobs:
+            continue
+        wallet = ensure_wallet(wallet_dir)
+        needed = int(shard_cost(jobs, fee_per_kb) * (1 + margin))
+        needed -= sum(utxo.get('satoshis', 0) for utxo in wallet.get('utxos', []))
+        if needed <= 0:
+            continue
+        splits.append({"wallet": wallet_dir, "address": wallet['address'], "sats": max(needed, MIN_OUTPUT_SATS),
+                       "files": [os.path.basename(image_path) for image_path, _ in jobs]})
+    return splits
+
+
+def sign_transaction(wallet_dir, outputs, fee_per_kb=None):
+    """Build and sign a spend of every UTXO of a doginals wallet to outputs ({address: sats}).
+
+    Change goes back to the wallet. walletsign.js signs in the wallet directory
+    with doginals' own library, so the private key never leaves this machine;
+    nothing is broadcast here. Returns {"txid", "hex", "inputs", "outputs":
+    {address: [vout, script, sats]}, "fee_sats", "change_sats"}.
+    """
+    wallet = load_wallet(wallet_dir)
+    utxos = wallet.get('utxos', [])
+    available = sum(utxo['satoshis'] for utxo in utxos)
+    total = sum(outputs.values())
+    fee = tx_fee(len(utxos), len(outputs) + 1, fee_per_kb)
+    change = available - total - fee
+    if change < 0:
+        raise ValueError(f"{wallet_dir or 'wallet'} holds {available / SATS_PER_DOGE:.4f} DOGE, "
+                         f"the fan-out needs {(total + fee) / SATS_PER_DOGE:.4f} DOGE")
+    if change < MIN_OUTPUT_SATS:
+        fee, change = fee + change, 0
+    amounts = dict(outputs)
+    if change:
+        amounts[wallet['address']] = amounts.get(wallet['address'], 0) + change
+    request = {"outputs": [[address, sats] for address, sats in amounts.items()], "fee": fee}
+    result = subprocess.run(SIGNER_COMMAND, cwd=wallet_dir or None, input=json.dumps(request),
+                            capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"Could not sign the transaction: {result.stderr.strip() or result.stdout.strip()}")
+    signed = json.loads(result.stdout)
+    created = {address: [output['n'], output['script'], output['satoshis']]
+               for address, output in zip(amounts, signed['outputs'])}
+    return {"txid": signed['txid'], "hex": signed['hex'], "inputs": [[utxo['txid'], utxo['vout']] for utxo in utxos],
+            "outputs": created, "fee_sats": fee, "change_sats": change, "change_address": wallet['address']}
+
+
+def broadcast(rpc, raw_hex):
+    """sendrawtransaction; a transaction the node already has counts as sent."""
+    try:
+        return rpc.sendrawtransaction(raw_hex)
+    except JsonRpcError as e:
+        if e.code == -27 or 'already' in (e.message or ''):
+            return None
+        raise
+
+
+def spend_from_wallet(wallet_dir, tx):
+    """Update a doginals wallet file after tx spent its UTXOs, the way doginals does.
+
+    The spent UTXOs are dropped and the change added. Applying the same tx twice
+    changes nothing, so this is safe to repeat after a crash.
+    """
+    wallet = load_wallet(wallet_dir)
+    spent = {tuple(outpoint) for outpoint in tx['inputs']}
+    wallet['utxos'] = [utxo for utxo in wallet.get('utxos', []) if (utxo['txid'], utxo['vout']) not in spent]
+    save_wallet(wallet_dir, wallet)
+    if tx['change_sats']:
+        add_utxo(wallet_dir, tx['txid'], *tx['outputs'][tx['change_address']])
+
+
+def add_utxo(wallet_dir, txid, vout, script, sats):
+    """Add an output paid to a doginals wallet to its wallet file, once."""
+    wallet = load_wallet(wallet_dir)
+    utxos = wallet.setdefault('utxos', [])
+    if not any(utxo['txid'] == txid and utxo['vout'] == vout for utxo in utxos):
+        utxos.append({"txid": txid, "vout": vout, "script": script, "satoshis": sats})
+        save_wallet(wallet_dir, wallet)
+
+
+def send_from_wallet(rpc, wallet_dir, outputs, fee_per_kb=None):
+    """Sign locally, broadcast, and update the wallet file; returns (txid, {address: [vout,
+    script, sats]}, fee_sats, change_sats)."""
+    tx = sign_transaction(wallet_dir, outputs, fee_per_kb)
+    broadcast(rpc, tx['hex'])
+    spend_from_wallet(wallet_dir, tx)
+    return tx['txid'], tx['outputs'], tx['fee_sats'], tx['change_sats']
+
+
+class FanoutLedger:
+    """Every fan-out of a campaign and how it was reconciled, in one JSON file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = []
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                self.entries = json.load(file)['fanouts']
+
+    def save(self):
+        with open(self.path + '.tmp', 'w', encoding='utf-8') as file:
+            json.dump({"fanouts": self.entries}, file, indent=4)
+        os.replace(self.path + '.tmp', self.path)
+
+    def record(self, entry):
+        self.entries.append(entry)
+        self.save()
+        return entry
+
+
+def _complete(entry, ledger, rpc):
+    """Broadcast a signed fan-out and credit every wallet; safe to repeat after a crash."""
+    tx = entry['tx']
+    broadcast(rpc, tx['hex'])
+    spend_from_wallet(entry['source'], tx)
+    for split in entry['splits']:
+        add_utxo(split['wallet'], tx['txid'], *tx['outputs'][split['address']])
+    entry['status'] = 'broadcast'
+    ledger.save()
+
+
+def resume_fanouts(ledger, rpc):
+    """Finish fan-outs that were signed and recorded but never marked broadcast.
+
+    A crash between recording and broadcasting (or between broadcasting and
+    updating the wallet files) leaves such an entry. Its hex is sent again, which
+    the node accepts as a no-op if the first send got through; if its inputs were
+    spent since, the entry is marked failed. Returns the entries now broadcast.
+    """
+    resumed = []
+    for entry in ledger.entries:
+        if entry['status'] != 'signed':
+            continue
+        try:
+            _complete(entry, ledger, rpc)
+            print(f"Fan-out {entry['txid']} from an interrupted run is broadcast.")
+            resumed.append(entry)
+        except JsonRpcError as e:
+            entry['status'] = 'failed'
+            entry['error'] = str(e)
+            ledger.save()
+            print(f"Fan-out {entry['txid']} from an interrupted run was rejected: {e}")
+    return resumed
+
+
+def fan_out(source_dir, wallet_dirs, shards, ledger_path, rpc=None, fee_per_kb=None, wait=True):
+    """Split the source wallet's balance into one funding UTXO per wallet before a campaign.
+
+    A doginals wallet spends its own change, so it can only build one unconfirmed
+    chain and stalls at the mempool chain limit. Funding N wallets from one fan-out
+    transaction gives N independent chains that all progress in the same block. The
+    signed fan-out is recorded in the ledger (status "signed") before it is
+    broadcast, so an interrupted run finishes it on the next start instead of
+    funding the wallets twice. With wait it is confirmed before returning: until
+    then it would count as an ancestor of every chain. Returns the ledger entry, or
+    None when every wallet already holds enough.
+    """
+    rpc = rpc or get_rpc_client()
+    ledger = FanoutLedger(ledger_path)
+    sent = resume_fanouts(ledger, rpc)
+    splits = plan_fanout(shards, wallet_dirs, fee_per_kb)
+    entry = None
+    if not splits:
+        print("Fan-out: every wallet already holds enough for its share.")
+    else:
+        outputs = {}
+        for split in splits:
+            outputs[split['address']] = outputs.get(split['address'], 0) + split['sats']
+        tx = sign_transaction(source_dir, outputs, fee_per_kb)
+        for split in splits:
+            split['vout'] = tx['outputs'][split['address']][0]
+        entry = ledger.record({"txid": tx['txid'], "source": source_dir,
+                               "created_at": time.strftime('%Y-%m-%dT%H:%M:%S'), "fee_sats": tx['fee_sats'],
+                               "change_sats": tx['change_sats'], "status": "signed", "splits": splits, "tx": tx})
+        _complete(entry, ledger, rpc)
+        sent.append(entry)
+        print(f"Fan-out {tx['txid']}: {len(splits)} wallets funded with {sum(outputs.values()) / SATS_PER_DOGE:.4f} "
+              f"DOGE (fee {tx['fee_sats'] / SATS_PER_DOGE:.4f} DOGE)")
+    if wait and sent:
+        print("Waiting for the fan-out to confirm...")
+        tracker = ConfirmationTracker(rpc, block_events=get_block_events())
+        for fanout in sent:
+            tracker.add(fanout['txid'], 'fan-out')
+        tracker.wait_all()
+        for fanout in sent:
+            fanout['status'] = 'failed' if fanout['txid'] in tracker.failed else 'confirmed'
+        ledger.save()
+    return entry
+
+
+def reconcile(ledger_path, output_file, rpc=None, sweep=False, fee_per_kb=None):
+    """Compare every fan-out split with what was minted and what its wallet still holds.
+
+    With sweep the leftover balance of each funded wallet goes back to the source
+    wallet. The result is stored on the ledger entry under "reconciled". Fan-outs an
+    interrupted run left signed but not broadcast are finished first.
+    """
+    ledger = FanoutLedger(ledger_path)
+    if any(entry['status'] == 'signed' for entry in ledger.entries):
+        rpc = rpc or get_rpc_client()
+        resume_fanouts(ledger, rpc)
+    minted = open_journal(output_file).by_file
+    for entry in ledger.entries:
+        print(f"Fan-out {entry['txid']} ({entry['status']}) from {entry['source']}")
+        report = []
+        for split in entry['splits']:
+            wallet = load_wallet(split['wallet'])
+            remaining = sum(utxo.get('satoshis', 0) for utxo in wallet.get('utxos', []))
+            missing = [file_name for file_name in split['files'] if file_name not in minted]
+            item = {"wallet": split['wallet'], "minted": len(split['files']) - len(missing), "missing": missing,
+                    "funded_sats": split['sats'], "remaining_sats": remaining}
+            # send_from_wallet budgets for a change output; sending all but that fee leaves none.
+            sweep_fee = tx_fee(len(wallet.get('utxos', [])), 2, fee_per_kb)
+            if sweep and remaining > sweep_fee + MIN_OUTPUT_SATS:
+                source_address = load_wallet(entry['source'])['address']
+                outputs = {source_address: remaining - sweep_fee}
+                txid, created, _, _ = send_from_wallet(rpc or get_rpc_client(), split['wallet'], outputs, fee_per_kb)
+                add_utxo(entry['source'], txid, *created[source_address])
+                item["sweep_txid"] = txid
+                item["remaining_sats"] = 0
+            print(f"  {split['wallet']}: {item['minted']}/{len(split['files'])} minted, "
+                  f"{split['sats'] / SATS_PER_DOGE:.4f} DOGE funded, {remaining / SATS_PER_DOGE:.4f} DOGE left"
+                  + (f", swept in {item['sweep_txid']}" if 'sweep_txid' in item else ''))
+            report.append(item)
+        entry['reconciled'] = {"at": time.strftime('%Y-%m-%dT%H:%M:%S'), "wallets": report}
+    ledger.save()
+    return ledger.entries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fan-out funding of mint wallets: status and reconciliation.")
+    parser.add_argument('action', choices=('status', 'reconcile'))
+    parser.add_argument('--output', default='airDropOutput.json', help="the campaign's mint ledger")
+    parser.add_argument('--sweep', action='store_true', help="send what the funded wallets have left back")
+    args = parser.parse_args()
+    if args.action == 'status':
+        for fanout in FanoutLedger(fanout_ledger_path(args.output)).entries:
+            print(f"{fanout['txid']}  {fanout['created_at']}  {fanout['status']:<10} "
+                  f"{len(fanout['splits'])} wallets  {sum(split['sats'] for split in fanout['splits']) / SATS_PER_DOGE:.4f} DOGE")
+    else:
+        reconcile(fanout_ledger_path(args.output), args.output, sweep=args.sweep)
@@ -0,0 +1,278 @@
+import argparse
+import json
+import os
+import time
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\r\n'
+_NUMBER_TAIL = '.eE+-'
+
+
+class _Reader:
+    """Buffered character reader over a text file for incremental JSON parsing."""
+
+    def __init__(self, file, chunk_size):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def fill(self):
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character (not consumed), or '' at end of file."""
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in _WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer) or not self.fill():
+                return self.buffer[self.position:self.position + 1]
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at {self.buffer[self.position:self.position + 40]!r}")
+        self.position += 1
+
+    def value(self):
+        """Decode one complete JSON value, reading more of the file until it is whole."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number cut off by the chunk boundary decodes fine but short:
+            # "12" of "123", or "7" of "7.25e3" when the chunk ends after "7.".
+            cut = end == len(self.buffer) or (isinstance(value, (int, float)) and self.buffer[end] in _NUMBER_TAIL)
+            if cut and not self.eof and self.fill():
+                continue
+            self.position = end
+            return value
+
+
+def iter_json_members(path, chunk_size=1 << 16):
+    """Yield (key, value) for the members of a top-level JSON object one at a time.
+
+    For ledgers in the {file name: ...} layout (NerdStone.json, airDropOutput.json).
+    """
+    with open(path, encoding='utf-8') as file:
+        reader = _Reader(file, chunk_size)
+        reader.expect('{')
+        while reader.peek() != '}':
+            name = reader.value()
+            reader.expect(':')
+            yield name, reader.value()
+            if reader.peek() != ',':
+                break
+            reader.expect(',')
+        reader.expect('}')
+
+
+def iter_json_items(path, key='airDropList', chunk_size=1 << 16):
+    """Yield the elements of the list in a JSON file one at a time.
+
+    The file is either a top-level list or an object holding the list under `key`
+    (other members are skipped). Only the current element and one read chunk are in
+    memory, so the size of the file does not matter.
+    """
+    with open(path, encoding='utf-8') as file:
+        reader = _Reader(file, chunk_size)
+        if reader.peek() == '{':
+            reader.expect('{')
+            while True:
+                if reader.peek() == '}':
+                    return
+                name = reader.value()
+                reader.expect(':')
+                if name == key:
+                    break
+                reader.value()
+                if reader.peek() == ',':
+                    reader.expect(',')
+        reader.expect('[')
+        if reader.peek() == ']':
+            return
+        while True:
+            yield reader.value()
+            if reader.peek() != ',':
+                break
+            reader.expect(',')
+        reader.expect(']')
+
+
+def iter_holder_rows(path):
+    """(address, amount) for every row of a holder file, in file order.
+
+    Marketplace dumps (seller_address) give one row per inscription with amount 1;
+    count files ({"address", "count"}) give the count; airDropList files give 1.
+    """
+    for row in iter_json_items(path):
+        if isinstance(row, str):
+            yield row, 1
+        elif 'seller_address' in row:
+            yield row['seller_address'], 1
+        elif 'address' in row:
+            yield row['address'], row.get('count', 1)
+        else:
+            yield row['dogecoin_address'], 1
+
+
+def count_by_address(path):
+    """{address: inscriptions held}, streamed from a holder dump such as cujoNFTholders.json."""
+    counts = {}
+    for address, amount in iter_holder_rows(path):
+        counts[address] = counts.get(address, 0) + amount
+    return counts
+
+
+class JsonListWriter:
+    """Writes a JSON list item by item, byte-for-byte what json.dump(..., indent=4) gives.
+
+    With `key`, the list is wrapped as {"<key>": [...]} like the airDropList files.
+    With append=True an existing file written this way is reopened: its closing
+    brackets are cut off and new items continue the list.
+    """
+
+    def __init__(self, path, key=None, append=False):
+        self.key = key
+        self.depth = 2 if key else 1
+        self.count = 0
+        if append:
+            self._reopen(path)
+            return
+        self.file = open(path, 'w')
+        if key:
+            self.file.write('{\n    ' + json.dumps(key) + ': [')
+        else:
+            self.file.write('[')
+
+    def _closing(self, empty):
+        closing = ']' if empty else '\n' + '    ' * (self.depth - 1) + ']'
+        return closing + ('\n}' if self.key else '')
+
+    def _reopen(self, path):
+        with open(path, 'rb+') as file:
+            file.seek(0, os.SEEK_END)
+            size = file.tell()
+            for empty in (False, True):
+                # Text-mode writes turned '\n' into os.linesep on disk.
+                closing = self._closing(empty).replace('\n', os.linesep).encode()
+                file.seek(max(0, size - len(closing)))
+                if file.read() == closing:
+                    file.truncate(size - len(closing))
+                    self.count = 0 if empty else 1
+                    break
+            else:
+                raise ValueError(f"{path} does not end like a list written by JsonListWriter")
+        self.file = open(path, 'a')
+
+    def write(self, item):
+        indent = '    ' * self.depth
+        text = json.dumps(item, indent=4).replace('\n', '\n' + indent)
+        self.file.write((',\n' if self.count else '\n') + indent + text)
+        self.count += 1
+
+    def close(self):
+        self.file.write(self._closing(not self.count))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_address_counts(counts, path):
+    """Write {address: count} in the cujoNFTAddressCounts.json layout."""
+    with JsonListWriter(path) as writer:
+        for address, count in counts.items():
+            writer.write({"address": address, "count": count})
+
+
+def parse_source(spec):
+    """'path[:weight[:per-item]]' -> (path, weight, per_item), e.g. 'cujoNFTholders.json:2:per-item'."""
+    # Options are taken from the right so Windows paths (C:\...) keep their colon.
+    path, weight, per_item = spec, 1.0, False
+    head, _, tail = path.rpartition(':')
+    if head and tail == 'per-item':
+        path, per_item = head, True
+        head, _, tail = path.rpartition(':')
+    if head:
+        try:
+            path, weight = head, float(tail)
+        except ValueError:
+            pass
+    return path, weight, per_item
+
+
+def merge_sources(sources, output, min_score=1.0, repeat=False):
+    """Merge holder files into one airDropList written to `output` as it is produced.
+
+    sources is a list of (path, weight, per_item). An address scores `weight` for
+    every source it appears in, or weight x inscriptions held when per_item is set.
+    Addresses keep the order they are first seen in. With every weight 1 and no
+    repeat this is a plain dedupe and entries are written while the sources are
+    still being read; otherwise scores are summed first and each address with at
+    least min_score gets one entry (int(score) entries with repeat). Memory grows
+    with the number of distinct addresses, never with the number of inscriptions.
+    Returns the number of entries written.
+    """
+    streaming = not repeat and min_score <= 1 and all(weight >= min_score and not per_item
+                                                      for _, weight, per_item in sources)
+    with JsonListWriter(output, 'airDropList') as writer:
+        if streaming:
+            seen = set()
+            for path, _, _ in sources:
+                for address, _ in iter_holder_rows(path):
+                    if address not in seen:
+                        seen.add(address)
+                        writer.write({"dogecoin_address": address})
+            return writer.count
+        scores = {}
+        for path, weight, per_item in sources:
+            counted = set()
+            for address, amount in iter_holder_rows(path):
+                if per_item:
+                    scores[address] = scores.get(address, 0) + weight * amount
+                elif address not in counted:
+                    counted.add(address)
+                    scores[address] = scores.get(address, 0) + weight
+        for address, score in scores.items():
+            if score >= min_score:
+                for _ in range(int(score) if repeat else 1):
+                    writer.write({"dogecoin_address": address})
+        return writer.count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream holder files into counts or a merged airDropList.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    count = commands.add_parser('count', help="inscriptions per seller_address (cujoNFTAddressCounts.json)")
+    count.add_argument('holders')
+    count.add_argument('--output', default='AddressCounts.json')
+    merge = commands.add_parser('merge', help="dedupe/weight several holder files into one airDropList")
+    merge.add_argument('sources', nargs='+', metavar='path[:weight[:per-item]]')
+    merge.add_argument('--output', default='combined_airDropList.json')
+    merge.add_argument('--min-score', type=float, default=1.0)
+    merge.add_argument('--repeat', action='store_true', help="one entry per whole point of score")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == 'count':
+        address_counts = count_by_address(args.holders)
+        write_address_counts(address_counts, args.output)
+        print(f"{len(address_counts)} holders of {sum(address_counts.values())} inscriptions saved to {args.output}")
+    else:
+        written = merge_sources([parse_source(spec) for spec in args.sources], args.output, args.min_score, args.repeat)
+        print(f"{written} addresses saved to {args.output}")
+    print(f"Done in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,310 @@
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# JSON endpoint behind the marketplace's Holders tab; {tick}, {offset} and {limit} are filled in.
+HOLDERS_URL = os.getenv('HOLDERS_URL', 'https://api.doggy.market/token/{tick}/holders?offset={offset}&limit={limit}')
+CACHE_DIR = os.getenv('HOLDERS_CACHE_DIR', '.holders_cache')
+
+
+class RateLimiter:
+    """Token bucket shared by all fetch threads: at most `rate` requests per second."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def extract_holders(payload):
+    """Holder rows from one page, as [{"address": ..., "balance": ...}], whatever the envelope.
+
+    Accepts a bare list or an object with the list under holders / data / items /
+    results / list. Rows may be address strings or objects with address, holder or
+    owner, and balance, amount or count.
+    """
+    rows = payload
+    if isinstance(payload, dict):
+        for key in ('holders', 'data', 'items', 'results', 'list'):
+            if isinstance(payload.get(key), list):
+                rows = payload[key]
+                break
+        else:
+            rows = []
+    holders = []
+    for row in rows:
+        if isinstance(row, str):
+            holders.append({"address": row})
+            continue
+        address = row.get('address') or row.get('holder') or row.get('owner')
+        if not address:
+            continue
+        holder = {"address": address}
+        for key in ('balance', 'amount', 'count'):
+            if key in row:
+                holder["balance"] = row[key]
+                break
+        holders.append(holder)
+    return holders
+
+
+def _total(payload):
+    if isinstance(payload, dict):
+        for key in ('total', 'totalCount', 'count', 'holders_count'):
+            if isinstance(payload.get(key), int):
+                return payload[key]
+    return None
+
+
+class HolderFetcher:
+    """Downloads a token's full holder list from the marketplace's JSON API.
+
+    Requests go over a small pool of keep-alive connections, `concurrency` pages at a
+    time, never faster than `rate` requests per second. Every raw response is cached
+    in `cache_dir` (keyed by URL); cached pages younger than `max_age` seconds (always,
+    if max_age is None) are not fetched again, so an interrupted snapshot resumes
+    instantly. 429 and 5xx answers are retried with backoff, honouring Retry-After.
+    """
+
+    def __init__(self, url_template=HOLDERS_URL, page_size=100, concurrency=8, rate=10, cache_dir=CACHE_DIR,
+                 max_age=3600, timeout=30, retries=4):
+        self.url_template = url_template
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(rate)
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.timeout = timeout
+        self.retries = retries
+        self.connections = queue.LifoQueue(maxsize=concurrency)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.cache_hits = 0
+        self.bytes = 0
+
+    # -- HTTP ----------------------------------------------------------------
+
+    def _connection(self, parts):
+        try:
+            connection = self.connections.get_nowait()
+            if (connection.host, connection.port) == (parts.hostname, parts.port or connection.default_port):
+                return connection
+            connection.close()
+        except queue.Empty:
+            pass
+        cls = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        return cls(parts.hostname, parts.port, timeout=self.timeout)
+
+    def _release(self, connection):
+        try:
+            self.connections.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def _get(self, url):
+        parts = urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else '')
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            connection = self._connection(parts)
+            try:
+                connection.request('GET', path, headers={'Accept': 'application/json', 'User-Agent': 'dpay-holders'})
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                connection.close()
+                error, delay = e, 2 ** attempt
+            else:
+                self._release(connection)
+                with self.lock:
+                    self.requests += 1
+                    self.bytes += len(body)
+                if response.status == 200:
+                    return body
+                if response.status != 429 and response.status < 500:
+                    raise RuntimeError(f"GET {url} returned HTTP {response.status}")
+                error = f"HTTP {response.status}"
+                retry_after = response.getheader('Retry-After')
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt
+            if attempt < self.retries:
+                print(f"Fetching {url} failed ({error}), retrying in {delay}s")
+                time.sleep(delay)
+        raise ConnectionError(f"GET {url} failed after {self.retries + 1} attempts: {error}")
+
+    # -- cache ---------------------------------------------------------------
+
+    def _cache_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode()).hexdigest()[:32] + '.json')
+
+    def fetch(self, url, refresh=False):
+        """Raw body of `url`, from the disk cache when it is fresh enough."""
+        path = self._cache_path(url)
+        if not refresh and os.path.exists(path):
+            if self.max_age is None or time.time() - os.path.getmtime(path) < self.max_age:
+                with self.lock:
+                    self.cache_hits += 1
+                with open(path, 'rb') as file:
+                    return file.read()
+        body = self._get(url)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(path + '.tmp', 'wb') as file:
+            file.write(body)
+        os.replace(path + '.tmp', path)
+        return body
+
+    # -- pages ---------------------------------------------------------------
+
+    def page_url(self, tick, page):
+        return self.url_template.format(tick=tick, offset=page * self.page_size, limit=self.page_size,
+                                        page=page + 1)
+
+    def fetch_page(self, tick, page, refresh=False):
+        """(holders, total or None) for one page."""
+        payload = json.loads(self.fetch(self.page_url(tick, page), refresh))
+        return extract_holders(payload), _total(payload)
+
+    def iter_pages(self, tick, refresh=False):
+        """Yield (page number, holders) in page order while later pages are already loading.
+
+        The first page tells how many holders there are when the API reports a total;
+        otherwise pages are requested in waves until one comes back short. The caller
+        can stop iterating early; pages not yet started are then cancelled.
+        """
+        first, total = self.fetch_page(tick, 0, refresh)
+        yield 0, first
+        if len(first) < self.page_size:
+            return
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            if total is not None:
+                pages = range(1, -(-total // self.page_size))
+                futures = [executor.submit(self.fetch_page, tick, page, refresh) for page in pages]
+                try:
+                    for page, future in zip(pages, futures):
+                        yield page, future.result()[0]
+                finally:
+                    for future in futures:
+                        future.cancel()
+                return
+            page = 1
+            while True:
+                wave = [executor.submit(self.fetch_page, tick, number, refresh)
+                        for number in range(page, page + self.concurrency)]
+                for future in wave:
+                    holders = future.result()[0]
+                    yield page, holders
+                    page += 1
+                    if len(holders) < self.page_size:
+                        for pending in wave:
+                            pending.cancel()
+                        return
+
+    def fetch_holders(self, tick, refresh=False):
+        """Every holder of `tick`, in the marketplace's order, without duplicates."""
+        seen = set()
+        holders = []
+        for _, page in self.iter_pages(tick, refresh):
+            for holder in page:
+                if holder["address"] not in seen:
+                    seen.add(holder["address"])
+                    holders.append(holder)
+        return holders
+
+    def stats(self):
+        return {"requests": self.requests, "cache_hits": self.cache_hits, "bytes": self.bytes}
+
+
+class HolderFixtureServer:
+    """Local stand-in for the marketplace API, for trying the fetcher without the network.
+
+    Serves `holders` at /token/<tick>/holders?offset=&limit= with a total, waiting
+    `delay` seconds per request like a remote server would.
+    """
+
+    def __init__(self, holders, delay=0.05, report_total=True):
+        self.holders = holders
+        self.delay = delay
+        self.report_total = report_total
+        self.requests = 0
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                query = parse_qs(urlsplit(self.path).query)
+                offset = int(query.get('offset', ['0'])[0])
+                limit = int(query.get('limit', ['100'])[0])
+                fixture.requests += 1
+                time.sleep(fixture.delay)
+                page = fixture.holders[offset:offset + limit]
+                payload = {"holders": page, "total": len(fixture.holders)} if fixture.report_total else page
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url_template = (f"http://127.0.0.1:{self.server.server_address[1]}"
+                             "/token/{tick}/holders?offset={offset}&limit={limit}")
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch every holder of a token over the marketplace JSON API.")
+    parser.add_argument('tick', nargs='?', default='dpay')
+    parser.add_argument('--output', default='addresses.json')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=10, help="max requests per second")
+    parser.add_argument('--refresh', action='store_true', help="ignore cached pages")
+    parser.add_argument('--fixture', type=int, metavar='N', help="serve N fake holders locally and fetch those")
+    args = parser.parse_args()
+    started = time.perf_counter()
+    if args.fixture:
+        fake = [{"address": f"DFixtureHolder{n:010d}", "balance": str(n)} for n in range(args.fixture)]
+        with HolderFixtureServer(fake) as fixture_server:
+            fetcher = HolderFetcher(fixture_server.url_template, concurrency=args.concurrency, rate=args.rate,
+                                    cache_dir=os.path.join(CACHE_DIR, 'fixture'), max_age=0)
+            result = fetcher.fetch_holders(args.tick, args.refresh)
+    else:
+        fetcher = HolderFetcher(concurrency=args.concurrency, rate=args.rate)
+        result = fetcher.fetch_holders(args.tick, args.refresh)
+    with open(args.output, 'w') as output:
+        json.dump({"airDropList": [{"dogecoin_address": holder["address"]} for holder in result]}, output, indent=4)
+    print(f"{len(result)} holders saved to {args.output} in {time.perf_counter() - started:.2f}s {fetcher.stats()}")
@@ -0,0 +1,219 @@
+import argparse
+import datetime
+import gzip
+import hashlib
+import json
+import os
+
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', 'snapshots')
+
+
+def _balance(value):
+    return None if value is None else str(value)
+
+
+def load_holder_file(path):
+    """Holders from one of the loose snapshot files, as {address: balance or None}.
+
+    Understands the formats kept in the dated snapshot folders: airDropList files
+    (addresses*.json), [{"address", "count"}] count lists, marketplace holder dumps
+    with seller_address (one row per item, so items are counted) and bare lists.
+    """
+    with open(path) as file:
+        data = json.load(file)
+    rows = data.get("airDropList", data.get("holders", [])) if isinstance(data, dict) else data
+    holders = {}
+    for row in rows:
+        if isinstance(row, str):
+            holders.setdefault(row, None)
+        elif 'seller_address' in row:
+            holders[row['seller_address']] = str(int(holders.get(row['seller_address']) or 0) + 1)
+        else:
+            address = row.get('dogecoin_address') or row.get('address')
+            holders[address] = _balance(row.get('count', row.get('balance')))
+    return holders
+
+
+def diff_holders(old, new):
+    """(added, removed, changed) between two {address: balance} maps, in one pass over each.
+
+    added and removed are address lists; changed is [(address, old balance, new balance)].
+    New-side lists keep the order of `new`.
+    """
+    added = []
+    changed = []
+    for address, balance in new.items():
+        if address not in old:
+            added.append(address)
+        elif old[address] != balance:
+            changed.append((address, old[address], balance))
+    removed = [address for address in old if address not in new]
+    return added, removed, changed
+
+
+def delta_airdrop(added, changed=(), increased_only=True):
+    """airDropList with only new holders, plus holders whose balance went up if changed is given."""
+    addresses = list(added)
+    for address, before, after in changed:
+        if not increased_only or _as_number(after) > _as_number(before):
+            addresses.append(address)
+    return {"airDropList": [{"dogecoin_address": address} for address in addresses]}
+
+
+def _as_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class SnapshotStore:
+    """Versioned holder snapshots for one token, under <root>/<tick>/.
+
+    Every snapshot is a gzipped JSON file holding [address, balance] pairs in the
+    order they were scraped; index.json lists the versions with their time, source,
+    holder count and content hash. Recording a scrape identical to the latest one
+    returns that version instead of storing a copy.
+    """
+
+    def __init__(self, tick, root=SNAPSHOT_DIR):
+        self.tick = tick
+        self.directory = os.path.join(root, tick)
+        self.index_path = os.path.join(self.directory, 'index.json')
+        self.index = []
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as file:
+                self.index = json.load(file)
+
+    def versions(self):
+        return [entry["version"] for entry in self.index]
+
+    def latest(self):
+        return self.index[-1]["version"] if self.index else None
+
+    def entry(self, version):
+        for entry in self.index:
+            if entry["version"] == version:
+                return entry
+        raise KeyError(f"{self.tick} has no snapshot version {version}")
+
+    def load(self, version=None):
+        """{address: balance} of a version (default: the latest; empty when there is none)."""
+        version = self.latest() if version is None else version
+        if version is None:
+            return {}
+        with gzip.open(os.path.join(self.directory, self.entry(version)["file"]), 'rt') as file:
+            return {address: balance for address, balance in json.load(file)}
+
+    def record(self, holders, source='scrape'):
+        """Store holders ({address: balance} or [(address, balance)]) as a new version.
+
+        Returns (version, created); created is False when holders equal the latest
+        snapshot and that version was returned instead.
+        """
+        pairs = [[address, _balance(balance)]
+                 for address, balance in (holders.items() if isinstance(holders, dict) else holders)]
+        payload = json.dumps(pairs, separators=(',', ':')).encode()
+        digest = hashlib.sha256(payload).hexdigest()
+        if self.index and self.index[-1]["sha256"] == digest:
+            return self.index[-1]["version"], False
+        version = (self.latest() or 0) + 1
+        name = f"{version:05d}.json.gz"
+        os.makedirs(self.directory, exist_ok=True)
+        # mtime=0 keeps identical snapshots byte-identical on disk.
+        with open(os.path.join(self.directory, name), 'wb') as raw, \
+                gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as file:
+            file.write(payload)
+        self.index.append({
+            "version": version,
+            "file": name,
+            "taken_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            "source": source,
+            "holders": len(pairs),
+            "sha256": digest,
+        })
+        with open(self.index_path + '.tmp', 'w') as file:
+            json.dump(self.index, file, indent=4)
+        os.replace(self.index_path + '.tmp', self.index_path)
+        return version, True
+
+    def diff(self, old=None, new=None):
+        """diff_holders between two versions; defaults to the latest against the one before."""
+        versions = self.versions()
+        new = versions[-1] if new is None else new
+        if old is None:
+            position = versions.index(new)
+            old = versions[position - 1] if position else None
+        return diff_holders(self.load(old) if old is not None else {}, self.load(new))
+
+
+def scrape_snapshot(fetcher, store, stop_after=2, refresh=True):
+    """Scrape the current holders into a new snapshot, stopping once the list stops changing.
+
+    Pages are read in the marketplace's order. After `stop_after` pages in a row
+    whose holders are all already in the latest snapshot with the same balance, the
+    rest of the list is taken from that snapshot instead of being downloaded. This
+    assumes a stable order (largest or newest holders first); holders that vanished
+    from the unread tail are only noticed by a full scrape (stop_after=0).
+    Returns (version, created, pages read, stopped early); created is False when
+    nothing changed since the latest snapshot.
+    """
+    known = store.load()
+    holders = {}
+    unchanged = 0
+    pages = 0
+    stopped = False
+    for _, page in fetcher.iter_pages(store.tick, refresh):
+        pages += 1
+        for holder in page:
+            holders.setdefault(holder["address"], _balance(holder.get("balance")))
+        if page and all(known.get(h["address"], object()) == _balance(h.get("balance")) for h in page):
+            unchanged += 1
+        else:
+            unchanged = 0
+        if stop_after and known and unchanged >= stop_after:
+            stopped = True
+            break
+    if stopped:
+        for address, balance in known.items():
+            holders.setdefault(address, balance)
+    version, created = store.record(holders, 'scrape (partial)' if stopped else 'scrape')
+    return version, created, pages, stopped
+
+
+def print_diff(added, removed, changed):
+    print(f"{len(added)} added, {len(removed)} removed, {len(changed)} changed balance")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Versioned holder snapshots and airdrop deltas.")
+    parser.add_argument('tick')
+    parser.add_argument('--root', default=SNAPSHOT_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list')
+    importer = commands.add_parser('import', help="record a loose snapshot file (addresses.json, cujoNFTholders.json, ...)")
+    importer.add_argument('path')
+    for name in ('diff', 'delta'):
+        command = commands.add_parser(name)
+        command.add_argument('old', nargs='?', type=int)
+        command.add_argument('new', nargs='?', type=int)
+    commands.choices['delta'].add_argument('--output', default='delta_airDropList.json')
+    commands.choices['delta'].add_argument('--with-increased', action='store_true',
+                                           help="also airdrop holders whose balance went up")
+    args = parser.parse_args()
+
+    snapshot_store = SnapshotStore(args.tick, args.root)
+    if args.command == 'list':
+        for item in snapshot_store.index:
+            print(f"v{item['version']}  {item['taken_at']}  {item['holders']:>7} holders  {item['source']}")
+    elif args.command == 'import':
+        version, created = snapshot_store.record(load_holder_file(args.path), args.path)
+        print(f"Recorded {args.path} as version {version}" if created else f"{args.path} is unchanged from version {version}")
+    else:
+        delta = snapshot_store.diff(args.old, args.new)
+        print_diff(*delta)
+        if args.command == 'delta':
+            airdrop = delta_airdrop(delta[0], delta[2] if args.with_increased else ())
+            with open(args.output, 'w') as output:
+                json.dump(airdrop, output, indent=4)
+            print(f"{len(airdrop['airDropList'])} addresses saved to {args.output}")
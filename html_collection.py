@@ -0,0 +1,269 @@
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import string
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from html_minify import minify_template
+from inscription_cost import payload_report, print_payload_report, write_payload_report
+
+# File (kept next to the generated files) remembering the sha256 of every file we wrote.
+HASH_INDEX_NAME = '.collection_hashes.json'
+
+_worker_template = None
+_worker_original = None
+
+
+class CompiledTemplate:
+    """A str.format template split into literal text and fields once, up front.
+
+    `{0}` is the item number, `{1}`, `{2}`, ... are the extra positional values and
+    `{name}` is a trait from the manifest. `{{` / `}}` are literal braces as usual, so
+    the templates in DPAYcreateHtmlCollection.py work unchanged. On top of `!s` and `!r`,
+    `!j` inserts the formatted value as a JSON string that is safe inside <script>. Line endings in the
+    template are converted to `newline` here, not per file.
+    """
+
+    def __init__(self, template, newline=os.linesep):
+        self.parts = []
+        formatter = string.Formatter()
+        for literal, field, format_spec, conversion in formatter.parse(template):
+            literal = literal.replace('\n', newline)
+            if field is None:
+                self.parts.append((literal, None, None, None))
+                continue
+            key = int(field) if field.isdigit() else field
+            self.parts.append((literal, key, format_spec or '', conversion))
+
+    def render(self, number, args=(), traits=None):
+        values = (number,) + tuple(args)
+        out = []
+        for literal, key, format_spec, conversion in self.parts:
+            out.append(literal)
+            if key is None:
+                continue
+            if isinstance(key, int):
+                value = values[key]
+            elif traits and key in traits:
+                value = traits[key]
+            else:
+                raise KeyError(f"Item {number} has no '{key}' trait in the manifest")
+            if conversion == 'r':
+                value = repr(value)
+            elif conversion == 's':
+                value = str(value)
+            value = format(value, format_spec) if format_spec else str(value)
+            if conversion == 'j':
+                value = json.dumps(value).replace('<', '\\u003c')
+            out.append(value)
+        return ''.join(out)
+
+
+def load_manifest(path, start=1):
+    """Per-item traits from a CSV or JSON manifest, as {item number: {trait: value}}.
+
+    A `number` column/key picks the item; rows without one are numbered from `start`
+    in file order. JSON may be a list of objects, {"items": [...]} or {"<number>": {...}}.
+    """
+    if path.lower().endswith('.csv'):
+        with open(path, 'r', encoding='utf-8', newline='') as file:
+            rows = list(csv.DictReader(file))
+    else:
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        if isinstance(data, dict) and 'items' in data:
+            rows = data['items']
+        elif isinstance(data, dict):
+            rows = [dict(traits, number=number) for number, traits in data.items()]
+        else:
+            rows = data
+    manifest = {}
+    for position, row in enumerate(rows, start):
+        row = dict(row)
+        number = int(row.pop('number', position))
+        manifest[number] = row
+    return manifest
+
+
+def item_file_name(number, file_prefix, file_extension):
+    return f"{file_prefix}{str(number).zfill(5)}.{file_extension}"
+
+
+def _init_worker(template, original=None):
+    global _worker_template, _worker_original
+    _worker_template = template
+    _worker_original = original
+
+
+def _render_chunk(chunk, args, directory, known_hashes, keep_content):
+    """Render one chunk of items; write the files whose content changed.
+
+    Returns [(file name, sha256, written, content or None, size, unminified size)].
+    With keep_content the files are not written and the encoded content goes back to
+    the parent (archives).
+    """
+    results = []
+    for number, file_name, traits in chunk:
+        content = _worker_template.render(number, args, traits).encode('utf-8')
+        digest = hashlib.sha256(content).hexdigest()
+        size = original_size = len(content)
+        if _worker_original is not None:
+            original_size = len(_worker_original.render(number, args, traits).encode('utf-8'))
+        if keep_content:
+            results.append((file_name, digest, False, content, size, original_size))
+            continue
+        path = os.path.join(directory, file_name)
+        written = True
+        if known_hashes.get(file_name) == digest and os.path.exists(path):
+            written = False
+        elif file_name not in known_hashes and os.path.exists(path):
+            # No index entry yet (first run with this engine): compare with the file itself.
+            with open(path, 'rb') as file:
+                written = hashlib.sha256(file.read()).hexdigest() != digest
+        if written:
+            with open(path, 'wb') as file:
+                file.write(content)
+        results.append((file_name, digest, written, None, size, original_size))
+    return results
+
+
+def _read_hash_index(directory):
+    try:
+        with open(os.path.join(directory, HASH_INDEX_NAME), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_hash_index(directory, hashes):
+    path = os.path.join(directory, HASH_INDEX_NAME)
+    with open(path + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump(hashes, file, indent=0, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+class _ArchiveWriter:
+    """Streams rendered files into one .tar, .tar.gz or .zip, in item order."""
+
+    def __init__(self, path):
+        self.path = path
+        if path.lower().endswith('.zip'):
+            self.zip = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+            self.tar = None
+        else:
+            mode = 'w:gz' if path.lower().endswith(('.tar.gz', '.tgz')) else 'w'
+            self.tar = tarfile.open(path, mode)
+            self.zip = None
+
+    def add(self, file_name, content):
+        if self.zip is not None:
+            # Fixed timestamp so the same collection always gives the same archive.
+            self.zip.writestr(zipfile.ZipInfo(file_name, date_time=(1980, 1, 1, 0, 0, 0)), content,
+                              zipfile.ZIP_DEFLATED)
+        else:
+            info = tarfile.TarInfo(file_name)
+            info.size = len(content)
+            info.mode = 0o644
+            self.tar.addfile(info, io.BytesIO(content))
+
+    def close(self):
+        (self.zip or self.tar).close()
+
+
+def build_collection(template, start, end, file_prefix, file_extension='html', directory='.', args=(),
+                     manifest=None, workers=None, archive=None, chunk_size=500, newline=os.linesep,
+                     minify=False):
+    """Generate items start..end from `template` across a process pool.
+
+    Files are named like the existing scripts do (dpaystone00001.html). A file is only
+    rewritten when its content hash changed since the last run, so regenerating a
+    collection after a small template or manifest edit touches only what differs.
+    With `archive` (.zip, .tar or .tar.gz) nothing is written to `directory`; every
+    item is streamed into that one archive instead.
+    `manifest` maps item numbers to trait dicts (see load_manifest).
+    `minify` runs the template through html_minify once before anything is rendered.
+    Returns {"total", "written", "unchanged", "seconds", "sizes"}, where sizes maps each
+    file to (bytes without minify, bytes written) for inscription_cost.payload_report.
+    """
+    started = time.perf_counter()
+    original = CompiledTemplate(template, newline) if minify else None
+    compiled = CompiledTemplate(minify_template(template) if minify else template, newline)
+    manifest = manifest or {}
+    hashes = {} if archive else _read_hash_index(directory)
+    if not archive:
+        os.makedirs(directory, exist_ok=True)
+
+    chunks = []
+    for chunk_start in range(start, end + 1, chunk_size):
+        chunk = [(number, item_file_name(number, file_prefix, file_extension), manifest.get(number, {}))
+                 for number in range(chunk_start, min(chunk_start + chunk_size, end + 1))]
+        known = {file_name: hashes[file_name] for _, file_name, _ in chunk if file_name in hashes}
+        chunks.append((chunk, tuple(args), directory, known, bool(archive)))
+
+    writer = _ArchiveWriter(archive) if archive else None
+    executor = None
+    written = unchanged = 0
+    sizes = {}
+    try:
+        if workers == 1 or len(chunks) == 1:
+            _init_worker(compiled, original)
+            results = (_render_chunk(*chunk) for chunk in chunks)
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(compiled, original))
+            results = executor.map(_render_chunk, *zip(*chunks))
+        for chunk_results in results:  # map keeps chunk order, so archives are deterministic
+            for file_name, digest, was_written, content, size, original_size in chunk_results:
+                sizes[file_name] = (original_size, size)
+                if writer is not None:
+                    writer.add(file_name, content)
+                    written += 1
+                    continue
+                hashes[file_name] = digest
+                if was_written:
+                    written += 1
+                else:
+                    unchanged += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if writer is not None:
+            writer.close()
+    if not archive:
+        _write_hash_index(directory, hashes)
+
+    return {"total": end - start + 1, "written": written, "unchanged": unchanged,
+            "seconds": round(time.perf_counter() - started, 3), "sizes": sizes}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a numbered HTML collection from a template.")
+    parser.add_argument('template', help="template file in str.format syntax ({0} = item number)")
+    parser.add_argument('start', type=int)
+    parser.add_argument('end', type=int)
+    parser.add_argument('file_prefix')
+    parser.add_argument('--extension', default='html')
+    parser.add_argument('--directory', default='.')
+    parser.add_argument('--arg', action='append', default=[], help="value for {1}, {2}, ... (repeatable)")
+    parser.add_argument('--manifest', help="CSV or JSON file with per-item traits")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument('--archive', help="write everything into this .zip / .tar / .tar.gz instead")
+    parser.add_argument('--minify', action='store_true', help="minify the template's HTML, CSS and JS first")
+    parser.add_argument('--report', help="write per-file sizes and fee estimates to this CSV")
+    cli_args = parser.parse_args()
+    with open(cli_args.template, 'r', encoding='utf-8') as template_file:
+        template_text = template_file.read()
+    manifest_data = load_manifest(cli_args.manifest, cli_args.start) if cli_args.manifest else None
+    stats = build_collection(template_text, cli_args.start, cli_args.end, cli_args.file_prefix, cli_args.extension,
+                             cli_args.directory, cli_args.arg, manifest_data, cli_args.workers, cli_args.archive,
+                             minify=cli_args.minify)
+    print(f"{stats['total']} items: {stats['written']} written, {stats['unchanged']} unchanged "
+          f"in {stats['seconds']}s")
+    print_payload_report(payload_report(stats['sizes']))
+    if cli_args.report:
+        write_payload_report(cli_args.report, stats['sizes'])
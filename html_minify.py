@@ -0,0 +1,230 @@
+import json
+import re
+import string
+
+# Blocks whose content is minified (style, script) or must be kept as is (pre, textarea).
+_BLOCK = re.compile(r'(<(style|script|pre|textarea)\b[^>]*>)(.*?)(</\2\s*>)', re.IGNORECASE | re.DOTALL)
+_COMMENT = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+_TAG_OR_TEXT = re.compile(r'(<[^>]*>)|([^<]+)')
+_IN_TAG = re.compile(r'("[^"]*"|\'[^\']*\')|\s+')
+
+_CSS_TOKEN = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|(/\*.*?\*/)|(\s+)|([^"\'/\s]+|/)', re.DOTALL)
+_CSS_TIGHT_BEFORE = set('{};,>')
+_CSS_TIGHT_AFTER = set('{};,>:')
+
+_JS_REGEX_AFTER = set('(,=:[!&|?{};+-*%<>~^')
+_JS_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw'}
+_JS_NEWLINE_AFTER = set('{;,(')
+_JS_NEWLINE_BEFORE = set('});,')
+
+
+def _word_char(c):
+    return c.isalnum() or c in '_$\\'
+
+
+def _template_literal_end(js, i):
+    """Index just past the template literal starting at js[i], including nested ${...}."""
+    n = len(js)
+    j = i + 1
+    while j < n and js[j] != '`':
+        if js[j] == '\\':
+            j += 2
+        elif js.startswith('${', j):
+            j += 2
+            depth = 1
+            while j < n and depth:
+                c = js[j]
+                if c == '`':
+                    j = _template_literal_end(js, j)
+                    continue
+                if c in '"\'':
+                    j += 1
+                    while j < n and js[j] != c:
+                        j += 2 if js[j] == '\\' else 1
+                elif c == '{':
+                    depth += 1
+                elif c == '}':
+                    depth -= 1
+                j += 1
+        else:
+            j += 1
+    return j + 1
+
+
+def minify_css(css):
+    """Drop comments and whitespace that CSS ignores; strings are kept as they are."""
+    out = []
+    for string_token, comment, space, other in _CSS_TOKEN.findall(css):
+        if comment or space:
+            if out and out[-1] != ' ':
+                out.append(' ')  # A comment separates tokens just like whitespace does.
+            continue
+        token = string_token or other.replace(';}', '}')
+        if out and out[-1] == ' ':
+            out.pop()
+            if out and out[-1][-1] not in _CSS_TIGHT_AFTER and token[0] not in _CSS_TIGHT_BEFORE:
+                out.append(' ')
+        if token[0] == '}' and out and out[-1].endswith(';'):
+            out[-1] = out[-1][:-1]  # The last declaration in a block needs no semicolon.
+        out.append(token)
+    while out and out[-1] == ' ':
+        out.pop()
+    return ''.join(out)
+
+
+def minify_js(js):
+    """Drop comments, indentation and blank lines.
+
+    Deliberately conservative: strings, template literals and regex literals are
+    copied untouched, and a line break is only removed where it cannot end a statement,
+    so automatic semicolon insertion behaves exactly as before.
+    """
+    out = []
+    i, n = 0, len(js)
+    pending = ''  # whitespace seen since the last token: '', ' ' or '\n'
+    last_word = ''
+
+    def emit(token):
+        nonlocal pending
+        if pending and out:
+            prev = out[-1][-1]
+            nxt = token[0]
+            if pending == '\n' and prev not in _JS_NEWLINE_AFTER and nxt not in _JS_NEWLINE_BEFORE:
+                out.append('\n')
+            elif (_word_char(prev) and _word_char(nxt)) or (prev in '+-' and nxt == prev):
+                out.append(' ')
+        pending = ''
+        out.append(token)
+
+    while i < n:
+        c = js[i]
+        if c in ' \t\r\n\f\v':
+            j = i
+            while j < n and js[j] in ' \t\r\n\f\v':
+                j += 1
+            pending = '\n' if '\n' in js[i:j] or pending == '\n' else ' '
+            i = j
+        elif js.startswith('//', i):
+            j = js.find('\n', i)
+            i = n if j < 0 else j
+        elif js.startswith('/*', i):
+            j = js.find('*/', i + 2)
+            i = n if j < 0 else j + 2
+            pending = pending or ' '
+        elif c == '`':
+            j = _template_literal_end(js, i)
+            emit(js[i:j])
+            last_word = ''
+            i = j
+        elif c in '"\'':
+            j = i + 1
+            while j < n and js[j] != c:
+                j += 2 if js[j] == '\\' else 1
+            emit(js[i:j + 1])
+            last_word = ''
+            i = j + 1
+        elif c == '/' and (not out or out[-1][-1] in _JS_REGEX_AFTER or last_word in _JS_REGEX_KEYWORDS):
+            j, in_class = i + 1, False
+            while j < n and (in_class or js[j] != '/') and js[j] != '\n':
+                if js[j] == '\\':
+                    j += 1
+                elif js[j] == '[':
+                    in_class = True
+                elif js[j] == ']':
+                    in_class = False
+                j += 1
+            j += 1
+            while j < n and js[j].isalpha():
+                j += 1
+            emit(js[i:j])
+            last_word = ''
+            i = j
+        elif _word_char(c):
+            j = i
+            while j < n and _word_char(js[j]):
+                j += 1
+            last_word = js[i:j]
+            emit(last_word)
+            i = j
+        else:
+            emit(c)
+            last_word = ''
+            i += 1
+    return ''.join(out)
+
+
+def _minify_tag(tag):
+    tag = _IN_TAG.sub(lambda m: m.group(1) or ' ', tag)
+    return tag.replace(' >', '>').replace(' />', '/>')
+
+
+def _minify_markup(html):
+    html = _COMMENT.sub('', html)
+    out = []
+    for tag, text in _TAG_OR_TEXT.findall(html):
+        if tag:
+            out.append(_minify_tag(tag))
+        elif text.strip():
+            out.append(re.sub(r'\s+', ' ', text))
+        elif text:
+            out.append(' ')  # Whitespace between inline elements renders as a space, line break or not.
+    return ''.join(out)
+
+
+def _minify_script(open_tag, body):
+    script_type = re.search(r'\btype\s*=\s*["\']?([^"\'\s>]+)', open_tag, re.IGNORECASE)
+    script_type = script_type.group(1).lower() if script_type else 'text/javascript'
+    if script_type.endswith('json'):
+        try:
+            return json.dumps(json.loads(body), separators=(',', ':'), ensure_ascii=False)
+        except ValueError:
+            return body
+    if script_type in ('module', 'text/javascript', 'application/javascript'):
+        return minify_js(body)
+    return body  # Templates and other data blocks are not JavaScript.
+
+
+def minify_html(html):
+    """Minify an HTML document: markup whitespace and comments, <style> CSS and <script> JS.
+
+    <pre> and <textarea> content is kept. Whitespace between tags collapses to one space
+    rather than being dropped, since between inline elements it is rendered.
+    """
+    out = []
+    position = 0
+    for match in _BLOCK.finditer(html):
+        out.append(_minify_markup(html[position:match.start()]))
+        open_tag, name, body, close_tag = match.groups()
+        name = name.lower()
+        if name == 'style':
+            body = minify_css(body)
+        elif name == 'script':
+            body = _minify_script(open_tag, body)
+        out.append(_minify_tag(open_tag) + body + _minify_tag(close_tag))
+        position = match.end()
+    out.append(_minify_markup(html[position:]))
+    return ''.join(out).strip()
+
+
+def minify_template(template, minifier=minify_html):
+    """Minify a str.format template without disturbing its {fields} or {{ }} escapes.
+
+    Fields are swapped for identifier-like placeholders, the plain text is minified,
+    then the braces are re-escaped and the fields put back. The result depends only on
+    the input, so regenerated collections stay byte-for-byte identical.
+    """
+    fields = []
+    text = []
+    for literal, field, format_spec, conversion in string.Formatter().parse(template):
+        text.append(literal)
+        if field is not None:
+            text.append(f"__TPLFIELD{len(fields)}__")
+            fields.append('{' + field + (f'!{conversion}' if conversion else '')
+                          + (f':{format_spec}' if format_spec else '') + '}')
+    minified = minifier(''.join(text)).replace('{', '{{').replace('}', '}}')
+    for index, field in enumerate(fields):
+        placeholder = f"__TPLFIELD{index}__"
+        if placeholder not in minified:
+            raise ValueError(f"Minifying removed template field {field}")
+        minified = minified.replace(placeholder, field)
+    return minified
@@ -1,28 +1,48 @@
-import subprocess
-import time
 import json
-import re
 import os
-from bitcoinrpc.authproxy import AuthServiceProxy, JSONRPCException
+from block_events import get_block_events
+from confirmation_tracker import ConfirmationTracker
+from mint_journal import open_journal
+from mint_scheduler import MintScheduler
+from mint_shards import sharded_minting_process
+from mint_worker import MintWorkerPool
+from preflight import preflight
+from recursive_collection import ensure_parent_inscribed
+from rpc_client import RpcClient
 
-# Environment variables are used to securely store sensitive data such as RPC credentials.
-rpc_user = os.getenv('RPC_USER', '<username>')
-rpc_password = os.getenv('RPC_PASSWORD', '<password>')
-rpc_host = os.getenv('RPC_HOST', 'localhost')
-rpc_port = os.getenv('RPC_PORT', '22555')  # Default Dogecoin RPC port
+rpc_connection = block_events = confirmation_tracker = mint_pool = mint_scheduler = None
 
-# Setting up the AuthServiceProxy client with the RPC server.
-rpc_connection = AuthServiceProxy(f"http://{rpc_user}:{rpc_password}@{rpc_host}:{rpc_port}/")
+def setup():
+    """Connect to the node and build the mint services, once; importing this module does neither."""
+    global rpc_connection, block_events, confirmation_tracker, mint_pool, mint_scheduler
+    if rpc_connection is not None:
+        return
+    # Environment variables are used to securely store sensitive data such as RPC credentials.
+    rpc_user = os.getenv('RPC_USER', '<username>')
+    rpc_password = os.getenv('RPC_PASSWORD', '<password>')
+    rpc_host = os.getenv('RPC_HOST', 'localhost')
+    rpc_port = os.getenv('RPC_PORT', '22555')  # Default Dogecoin RPC port
 
-def read_last_output(json_file_name):
-    if os.path.exists(json_file_name):
-        try:
-            with open(json_file_name, 'r') as file:
-                data = json.load(file)
-                return len(data)  # Return the count of entries in the JSON file.
-        except json.JSONDecodeError as e:
-            print(f"JSON decode error in {json_file_name}: {e}")
-    return 0
+    # Setting up the shared RPC client: pooled keep-alive connections that reconnect on their own.
+    rpc_connection = RpcClient(f"http://{rpc_user}:{rpc_password}@{rpc_host}:{rpc_port}/")
+
+    # New blocks are pushed by the node (ZMQ_BLOCK_ENDPOINT or BLOCKNOTIFY_PORT) or polled every 2 seconds.
+    block_events = get_block_events(rpc_connection)
+
+    # Every minted txid is tracked; each poll checks all of them in one JSON-RPC batch request.
+    confirmation_tracker = ConfirmationTracker(
+        rpc_connection, block_events=block_events,
+        on_confirmed=lambda txid, confirmations, file_name: print(f"Transaction {txid} ({file_name}) is confirmed."))
+
+    # Persistent mint workers (MINT_WORKERS=1); None runs `node . mint` once per item.
+    mint_pool = MintWorkerPool.from_env()
+
+    # Mints back to back until the unconfirmed chain reaches the node's ancestor limit (MEMPOOL_CHAIN_LIMIT).
+    mint_scheduler = MintScheduler(rpc_connection, tracker=confirmation_tracker, block_events=block_events,
+                                   chain_limit=int(os.getenv('MEMPOOL_CHAIN_LIMIT', '25')))
+
+def read_minted_files(json_file_name):
+    return set(open_journal(json_file_name).by_file)  # File names already recorded in the journal.
 
 def extract_details(file_name):
     try:
@@ -35,73 +55,64 @@ def extract_details(file_name):
 def update_json_file(image_path, txid, details):
     json_file_name = "airDropOutput.json"
     try:
-        data = {}
-        if os.path.exists(json_file_name):
-            with open(json_file_name, 'r') as file:
-                data = json.load(file)
-        key = os.path.basename(image_path)
-        data[key] = {"txid": txid, "address": details['dogecoin_address']}
-        with open(json_file_name, 'w') as file:
-            json.dump(data, file, indent=4)
+        open_journal(json_file_name).record(image_path, txid, details['dogecoin_address'])
     except Exception as e:
         print(f"Error updating {json_file_name}: {e}")
 
-def process_mint_batch(start, end, directory, file_prefix, file_extension, details_list):
+def process_mint_batch(jobs):
     last_txid = ""
-    for i in range(start, end + 1):
-        if i > len(details_list):
-            break
-        details = details_list[i - 1]
-        file_number = str(i).zfill(5)
-        image_path = os.path.join(directory, f"{file_prefix}{file_number}.{file_extension}")
-        if not os.path.exists(image_path):
-            print(f"File not found: {image_path}")
-            continue
-        mint_command = f"node . mint {details['dogecoin_address']} {image_path}"
-        result_mint = subprocess.run(mint_command, shell=True, capture_output=True, text=True)
+    for image_path, details in jobs:
+        result_mint = mint_scheduler.mint(details['dogecoin_address'], image_path, mint_pool)
         print("Output from mint command:")
         print(result_mint.stdout)
         if result_mint.stderr:
             print("Error in mint command:")
             print(result_mint.stderr)
-        txid_search = re.search("inscription txid: (\\w+)", result_mint.stdout)
-        if txid_search:
-            last_txid = txid_search.group(1)
+        if result_mint.txid:
+            last_txid = result_mint.txid
             print(f"Successful mint, TXID: {last_txid}")
             update_json_file(image_path, last_txid, details)
+            confirmation_tracker.add(last_txid, os.path.basename(image_path))
+            mint_scheduler.record_mint(last_txid)
     return last_txid
 
-def wait_for_tx_confirmation(txid):
-    while True:
-        try:
-            tx_info = rpc_connection.gettransaction(txid)
-            if tx_info and tx_info.get("confirmations", 0) >= 1:
-                print(f"Transaction {txid} is confirmed.")
-                break
-        except JSONRPCException as e:
-            print(f"Error fetching transaction {txid}: {e}")
-        time.sleep(10)
+def wait_for_confirmations():
+    confirmation_tracker.wait_all()
+    if confirmation_tracker.failed:
+        print(f"Failed transactions so far: {confirmation_tracker.failed}")
 
-def continuous_minting_process(directory, file_prefix, file_extension):
-    last_count = read_last_output('airDropOutput.json')
+def continuous_minting_process(directory, file_prefix, file_extension, wallet_dirs=None):
+    setup()
+    # Shared-template collections: inscribe the parent once and point every item stub at it.
+    ensure_parent_inscribed(directory, file_prefix, file_extension, mint_scheduler, mint_pool,
+                            tracker=confirmation_tracker)
+    if wallet_dirs and len(wallet_dirs) > 1:
+        # One mempool chain per wallet; shards resume by file name and merge into airDropOutput.json.
+        sharded_minting_process(wallet_dirs, directory, file_prefix, file_extension, extract_details('airDropList.json'),
+                                'airDropOutput.json', use_workers=mint_pool is not None)
+        return
     details_list = extract_details('airDropList.json')
-    details_list = details_list[last_count:]
-    batch_size = 12
-    num_batches = (len(details_list) + batch_size - 1) // batch_size
-    for batch_index in range(num_batches):
-        start_index = batch_index * batch_size
-        end_index = start_index + batch_size
-        print(f"Processing batch from {start_index + 1} to {end_index}")
-        last_txid = process_mint_batch(start_index + 1, end_index, directory, file_prefix, file_extension, details_list)
-        if last_txid:
-            print(f"Waiting for confirmation of TXID: {last_txid}")
-            wait_for_tx_confirmation(last_txid)
-        else:
-            print("No valid transactions in this batch to wait for.")
+    # Item n always gets file n; files already in the journal are skipped, so a rerun resumes.
+    # Missing files, bad addresses and an underfunded wallet are caught here, before any mint.
+    plan = preflight(enumerate(details_list, 1), directory, file_prefix, file_extension,
+                     read_minted_files('airDropOutput.json'))
+    if plan is None:
+        return
+    print(f"Processing {len(plan.jobs)} of {len(details_list)} items")
+    last_txid = process_mint_batch(plan.jobs)
+    if last_txid:
+        print(f"Waiting for confirmation of {len(confirmation_tracker.pending)} transactions")
+        wait_for_confirmations()
+    else:
+        print("No valid transactions to wait for.")
+    open_journal('airDropOutput.json').compact()
+    rpc_connection.print_stats()
 
 # Initialize main variables and start process
 directory = r'E:\newminternode\dogecoin-ordinals-drc-20-inscription\stones'
 file_prefix = 'dpaystone'
 file_extension = 'html'
+wallet_dirs = []  # Two or more doginals wallet directories to mint in parallel, one chain each.
 
-continuous_minting_process(directory, file_prefix, file_extension)
+if __name__ == "__main__":
+    continuous_minting_process(directory, file_prefix, file_extension, wallet_dirs)
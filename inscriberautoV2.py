@@ -1,123 +1,120 @@
-import subprocess
-import time
 import json
-import re
 import os
-from bitcoinrpc.authproxy import AuthServiceProxy, JSONRPCException
+from block_events import get_block_events
+from confirmation_tracker import ConfirmationTracker
+from mint_journal import open_journal
+from mint_scheduler import MintScheduler
+from mint_shards import sharded_minting_process
+from mint_worker import MintWorkerPool
+from preflight import preflight
+from recursive_collection import ensure_parent_inscribed
+from rpc_client import RpcClient
 
-# Setup environment variables and RPC connection
-rpc_user = os.getenv('RPC_USER', 'your_rpc_user')
-rpc_password = os.getenv('RPC_PASSWORD', 'Password')
-rpc_host = os.getenv('RPC_HOST', 'localhost')
-rpc_port = os.getenv('RPC_PORT', '22555')
-rpc_connection = AuthServiceProxy(f"http://{rpc_user}:{rpc_password}@{rpc_host}:{rpc_port}/")
+rpc_connection = block_events = confirmation_tracker = mint_pool = mint_scheduler = None
 
-def read_last_output(json_file_name):
-    """Read and return the number of processed transactions from JSON."""
-    try:
-        if os.path.exists(json_file_name):
-            with open(json_file_name, 'r') as file:
-                data = json.load(file)
-                print(f"Read data: {data}")
-                return len(data)
-    except json.JSONDecodeError as e:
-        print(f"JSON decode error in {json_file_name}: {e}")
-    return 0
+def setup():
+    """Create the RPC client, block source, tracker, workers and scheduler on first use, not at import."""
+    global rpc_connection, block_events, confirmation_tracker, mint_pool, mint_scheduler
+    if rpc_connection is not None:
+        return
+    # Setup environment variables and RPC connection
+    rpc_user = os.getenv('RPC_USER', 'your_rpc_user')
+    rpc_password = os.getenv('RPC_PASSWORD', 'Password')
+    rpc_host = os.getenv('RPC_HOST', 'localhost')
+    rpc_port = os.getenv('RPC_PORT', '22555')
+    rpc_connection = RpcClient(f"http://{rpc_user}:{rpc_password}@{rpc_host}:{rpc_port}/")  # reconnects on its own
+    block_events = get_block_events(rpc_connection)  # ZMQ / -blocknotify push, polling otherwise
+    confirmation_tracker = ConfirmationTracker(
+        rpc_connection, block_events=block_events,
+        on_confirmed=lambda txid, confirmations, file_name: print(f"Transaction {txid} ({file_name}) is confirmed."))
+    mint_pool = MintWorkerPool.from_env()  # persistent mint workers when MINT_WORKERS is set
+    mint_scheduler = MintScheduler(rpc_connection, tracker=confirmation_tracker, block_events=block_events,
+                                   chain_limit=int(os.getenv('MEMPOOL_CHAIN_LIMIT', '25')))
+
+def read_minted_files(json_file_name):
+    """Read and return the file names already minted, from the mint journal."""
+    minted = set(open_journal(json_file_name).by_file)
+    print(f"Read {len(minted)} entries from the {json_file_name} journal")
+    return minted
 
 def extract_details(file_name):
     """Extract air drop details from JSON file."""
     try:
         with open(file_name, 'r', encoding='utf-8') as file:
             data = json.load(file)
-            print(f"Extracted details: {data.get('airDropList', [])}")
-            return data.get('airDropList', [])
+            details = data.get('airDropList', [])
+            print(f"Extracted {len(details)} airdrop entries from {file_name}")
+            return details
     except Exception as e:
         print(f"An error occurred while reading {file_name}: {e}")
         return []
 
 def update_json_file(image_path, txid, details):
-    """Update JSON file with transaction details."""
+    """Append transaction details to the mint journal."""
     json_file_name = "NothingStonesOutput.json"
     try:
-        data = {}
-        if os.path.exists(json_file_name):
-            with open(json_file_name, 'r') as file:
-                data = json.load(file)
-        key = os.path.basename(image_path)
-        data[key] = {"txid": txid, "address": details['dogecoin_address']}
-        with open(json_file_name, 'w') as file:
-            json.dump(data, file, indent=4)
-        print(f"Updated JSON file {json_file_name} with: {data[key]}")
+        record = open_journal(json_file_name).record(image_path, txid, details['dogecoin_address'])
+        print(f"Updated {json_file_name} journal with: {record}")
     except Exception as e:
         print(f"Error updating {json_file_name}: {e}")
 
-def process_mint_batch(start, end, directory, file_prefix, file_extension, details_list):
-    """Process minting for a batch of transactions."""
+def process_mint_batch(jobs):
+    """Mint the preflighted jobs in order, pausing only when the mempool chain is full."""
     last_txid = ""
-    for i in range(start, end + 1):
-        if i > len(details_list):
-            break
-        details = details_list[i - 1]
-        file_number = str(i).zfill(5)
-        image_path = os.path.join(directory, f"{file_prefix}{file_number}.{file_extension}")
-        if not os.path.exists(image_path):
-            print(f"File not found: {image_path}")
-            continue
-        mint_command = f"node . mint {details['dogecoin_address']} {image_path}"
-        print(f"Executing command: {mint_command}")
-        result_mint = subprocess.run(mint_command, shell=True, capture_output=True, text=True)
+    for image_path, details in jobs:
+        print(f"Executing command: node . mint {details['dogecoin_address']} {image_path}")
+        result_mint = mint_scheduler.mint(details['dogecoin_address'], image_path, mint_pool)
         print("Output from mint command:", result_mint.stdout)
         if result_mint.stderr:
             print("Error in mint command:", result_mint.stderr)
-        txid_search = re.search("inscription txid: (\\w+)", result_mint.stdout)
-        if txid_search:
-            last_txid = txid_search.group(1)
+        if result_mint.txid:
+            last_txid = result_mint.txid
             print(f"Successful mint, TXID: {last_txid}")
             update_json_file(image_path, last_txid, details)
+            confirmation_tracker.add(last_txid, os.path.basename(image_path))
+            mint_scheduler.record_mint(last_txid)
     return last_txid
 
-def wait_for_tx_confirmation(txid):
-    """Wait for a transaction to be confirmed."""
-    retries = 500  # Number of retries
-    while retries > 0:
-        try:
-            tx_info = rpc_connection.gettransaction(txid)
-            if tx_info and tx_info.get("confirmations", 0) >= 1:
-                print(f"Transaction {txid} is confirmed.")
-                return  # Exit the function if transaction is confirmed
-        except JSONRPCException as e:
-            print(f"Error fetching transaction {txid}: {e}")
-        except Exception as e:
-            print(f"An error occurred: {e}")
-        retries -= 1
-        time.sleep(10)  # Wait for a few seconds before retrying
-    print(f"Failed to confirm transaction {txid} after multiple retries.")
+def wait_for_confirmations():
+    """Wait for every tracked transaction to be confirmed (one batch request per poll)."""
+    if not confirmation_tracker.wait_all(max_polls=500):
+        print("Failed to confirm all transactions after multiple retries.")
+    if confirmation_tracker.failed:
+        print(f"Failed transactions so far: {confirmation_tracker.failed}")
 
-def continuous_minting_process(directory, file_prefix, file_extension):
-    """Main processing function to handle minting in continuous mode."""
-    last_count = read_last_output('NothingStonesOutput.json')
+def continuous_minting_process(directory, file_prefix, file_extension, wallet_dirs=None):
+    """Main processing function to handle minting in continuous mode, optionally sharded across wallets."""
+    setup()
+    # Shared-template collections: inscribe the parent once and point every item stub at it.
+    ensure_parent_inscribed(directory, file_prefix, file_extension, mint_scheduler, mint_pool,
+                            tracker=confirmation_tracker)
     details_list = extract_details('airDropList.json')
-    if last_count >= len(details_list):
-        print("No more details to process or index out of bounds.")
+    if wallet_dirs and len(wallet_dirs) > 1:
+        sharded_minting_process(wallet_dirs, directory, file_prefix, file_extension, details_list,
+                                'NothingStonesOutput.json', use_workers=mint_pool is not None)
+        return
+    minted = read_minted_files('NothingStonesOutput.json')
+    plan = preflight(enumerate(details_list, 1), directory, file_prefix, file_extension, minted)
+    if plan is None:
+        return
+    if not plan.jobs:
+        print("No more details to process.")
         return
-    batch_size = 8
-    num_batches = (len(details_list) + batch_size - 1) // batch_size
-    for batch_index in range(num_batches):
-        start_index = batch_index * batch_size
-        end_index = start_index + batch_size - 1
-        if end_index >= len(details_list):
-            end_index = len(details_list) - 1
-        print(f"Processing batch from file {last_count + start_index + 1} to {last_count + end_index + 1}")
-        last_txid = process_mint_batch(last_count + start_index + 1, last_count + end_index + 1, directory, file_prefix, file_extension, details_list)
-        if last_txid:
-            print(f"Waiting for confirmation of TXID: {last_txid}")
-            wait_for_tx_confirmation(last_txid)
-        else:
-            print("No valid transactions in this batch to wait for.")
+    print(f"Processing {len(plan.jobs)} of {len(details_list)} files")
+    last_txid = process_mint_batch(plan.jobs)
+    if last_txid:
+        print(f"Waiting for confirmation of {len(confirmation_tracker.pending)} transactions")
+        wait_for_confirmations()
+    else:
+        print("No valid transactions to wait for.")
+    open_journal('NothingStonesOutput.json').compact()
+    rpc_connection.print_stats()
 
 # Initialize main variables and start the process
 directory = r'C:\doginals-main\SoupForMyFamily\HTMLs'
 file_prefix = 'soup'
 file_extension = 'html'
+wallet_dirs = []  # e.g. [r'C:\doginals-main', r'C:\doginals-wallet2'] to shard the list across wallets
 
-continuous_minting_process(directory, file_prefix, file_extension)
+if __name__ == "__main__":
+    continuous_minting_process(directory, file_prefix, file_extension, wallet_dirs)
@@ -0,0 +1,66 @@
+import csv
+import math
+import os
+
+# How doginals lays out an inscription: the payload is pushed in 240-byte chunks and
+# the pushes are spread over transactions of at most ~1500 script bytes each, plus
+# one final transaction that sends the inscription to the recipient.
+MAX_CHUNK_LEN = 240
+MAX_PAYLOAD_LEN = 1500
+# Rough size of everything in a doginals tx that is not payload: funding input,
+# P2SH unlock script, outputs and the tx header.
+TX_OVERHEAD_BYTES = 350
+# Same variable doginals reads from its .env; 1 DOGE per kB unless set.
+FEE_PER_KB = int(os.getenv('FEE_PER_KB', '100000000'))
+SATS_PER_DOGE = 100_000_000
+# The final doginals tx sends the inscription to the recipient in a 100000-satoshi output.
+INSCRIPTION_OUTPUT_SATS = 100_000
+
+
+def estimate_inscription(payload_bytes, content_type='text/html;charset=utf-8', fee_per_kb=None):
+    """Estimated {chunks, txs, tx_bytes, fee_sats} for inscribing `payload_bytes` bytes."""
+    fee_per_kb = FEE_PER_KB if fee_per_kb is None else fee_per_kb
+    chunks = max(1, math.ceil(payload_bytes / MAX_CHUNK_LEN))
+    # 'ord' tag, chunk count, content type, then a countdown number and a push per chunk.
+    script_bytes = 4 + 2 + len(content_type) + 1 + payload_bytes + chunks * (2 + 2)
+    txs = math.ceil(script_bytes / MAX_PAYLOAD_LEN) + 1
+    tx_bytes = script_bytes + txs * TX_OVERHEAD_BYTES
+    return {"chunks": chunks, "txs": txs, "tx_bytes": tx_bytes,
+            "fee_sats": math.ceil(tx_bytes * fee_per_kb / 1000)}
+
+
+def payload_report(sizes, fee_per_kb=None):
+    """Campaign totals for {file: (original bytes, final bytes)}, including the fee estimate."""
+    original = final = original_fee = final_fee = original_txs = final_txs = 0
+    for original_size, size in sizes.values():
+        before = estimate_inscription(original_size, fee_per_kb=fee_per_kb)
+        after = estimate_inscription(size, fee_per_kb=fee_per_kb)
+        original += original_size
+        final += size
+        original_fee += before["fee_sats"]
+        final_fee += after["fee_sats"]
+        original_txs += before["txs"]
+        final_txs += after["txs"]
+    return {"files": len(sizes), "original_bytes": original, "bytes": final, "saved_bytes": original - final,
+            "original_txs": original_txs, "txs": final_txs,
+            "original_fee_sats": original_fee, "fee_sats": final_fee, "saved_fee_sats": original_fee - final_fee}
+
+
+def print_payload_report(report):
+    saved_pct = report["saved_bytes"] / report["original_bytes"] * 100 if report["original_bytes"] else 0
+    print(f"{report['files']} files: {report['original_bytes']} -> {report['bytes']} bytes "
+          f"({report['saved_bytes']} saved, {saved_pct:.1f}%)")
+    print(f"Estimated {report['txs']} txs (was {report['original_txs']}), fee "
+          f"{report['fee_sats'] / SATS_PER_DOGE:.4f} DOGE (saves {report['saved_fee_sats'] / SATS_PER_DOGE:.4f} DOGE)")
+
+
+def write_payload_report(path, sizes, fee_per_kb=None):
+    """Per-file CSV: file, original_bytes, bytes, saved_bytes, txs, fee_sats."""
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["file", "original_bytes", "bytes", "saved_bytes", "txs", "fee_sats"])
+        for file_name in sorted(sizes):
+            original_size, size = sizes[file_name]
+            estimate = estimate_inscription(size, fee_per_kb=fee_per_kb)
+            writer.writerow([file_name, original_size, size, original_size - size, estimate["txs"],
+                             estimate["fee_sats"]])
@@ -1,30 +1,7 @@
-import json
-import re
+from manifest_converter import convert
 
-def extract_number_from_filename(filename):
-    """ Extract the numeric part from the filename and convert it to an integer. """
-    match = re.search(r'(\d+)\.html$', filename)
-    return int(match.group(1)) if match else None
+if __name__ == "__main__":
+    # Streams the mint ledger; if NerdStone.jsonl (the mint journal) exists, only new mints are appended.
+    convert('NerdStone.json', [('ow', 'TransformedNerdStones.json')], name="Nerd Stone")
 
-# Read the original JSON file
-with open('NerdStone.json', 'r') as file:
-    data = json.load(file)
-
-# Transform the data
-transformed_data = []
-for key, value in data.items():
-    number = extract_number_from_filename(key)
-    if number is not None:
-        transformed_entry = {
-            "id": value + "i0",
-            "meta": {
-                "name": f"Nerd Stone #{number}"
-            }
-        }
-        transformed_data.append(transformed_entry)
-
-# Write the transformed data to a new JSON file
-with open('TransformedNerdStones.json', 'w') as file:
-    json.dump(transformed_data, file, indent=4)
-
-print("Transformation complete. Data saved in TransformedNerdStones.json")
+    print("Transformation complete. Data saved in TransformedNerdStones.json")
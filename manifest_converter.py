@@ -0,0 +1,213 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+
+from holder_aggregate import JsonListWriter, iter_json_items, iter_json_members
+
+STATE_FILE = '.manifest_state.json'
+# Defaults of the original Nerd Stones scripts; pass other values per collection.
+DEFAULT_OPTIONS = {
+    "name": "Nerd Stone",
+    "symbol": "nerd_stones",
+    "image_uri": "https://media.ordinalswallet.com/c32ff552851a130d4100aeec5950725884bd8f3efa18d25b56a5e0a589c28847.jpeg",
+}
+
+
+def extract_number_from_filename(filename):
+    """ Extract the numeric part from the filename and convert it to an integer. """
+    match = re.search(r'(\d+)\.\w+$', filename)
+    return int(match.group(1)) if match else None
+
+
+# Output formats: the list key the items are wrapped in (None for a bare list) and
+# how one record becomes one item. Records carry inscription_id and name.
+FORMATS = {
+    # Ordinals Wallet
+    'ow': {"key": None, "item": lambda record, options: {"id": record["inscription_id"],
+                                                          "meta": {"name": record["name"]}}},
+    # Doge Labs
+    'dl': {"key": "body", "item": lambda record, options: {"inscriptionId": record["inscription_id"],
+                                                            "name": record["name"],
+                                                            "imageURI": options["image_uri"],
+                                                            "collectionSymbol": options["symbol"]}},
+    # Doggy Market
+    'dm': {"key": None, "item": lambda record, options: {"inscriptionId": record["inscription_id"],
+                                                          "name": record["name"]}},
+}
+
+
+def register_format(name, item, key=None):
+    """Add a marketplace format: item(record, options) -> the manifest entry for one record."""
+    FORMATS[name] = {"key": key, "item": item}
+
+
+def resolve_source(path):
+    """The mint journal (.jsonl) behind a ledger file when there is one, else the file itself."""
+    journal = os.path.splitext(path)[0] + '.jsonl'
+    return journal if not path.endswith('.jsonl') and os.path.exists(journal) else path
+
+
+def _record(file_name, txid, options):
+    number = extract_number_from_filename(file_name)
+    if number is None:
+        return None
+    return {"number": number, "file": file_name, "inscription_id": txid + "i0",
+            "name": f"{options['name']} #{number}"}
+
+
+def iter_journal(source, offset=0, end=None, unreadable=None):
+    """Yield (entry, offset after its line) for every readable line of a mint journal.
+
+    Reading starts at byte offset and stops before end. Lines that do not decode
+    (a torn write from an older journal) are skipped, as MintJournal does; their
+    offsets are appended to the unreadable list when one is given.
+    """
+    with open(source, 'rb') as file:
+        file.seek(offset)
+        for line in iter(file.readline, b''):
+            if not line.endswith(b'\n') or (end is not None and offset + len(line) > end):
+                break  # a torn last line; it is read once the mint finishes writing it
+            offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Skipping unreadable line ending at byte {offset} in {source}")
+                if unreadable is not None:
+                    unreadable.append(offset)
+                continue
+            yield entry, offset
+
+
+def iter_records(source, options, offset=0):
+    """Yield (record, offset after it) from a ledger.
+
+    Sources: a mint journal (.jsonl, resumable from a byte offset), a {file name:
+    txid} or {file name: {"txid": ...}} ledger such as NerdStone.json or
+    airDropOutput.json, or an OW manifest ([{"id", "meta": {"name"}}]).
+    Ledgers and manifests are streamed. A journal can hold several records for one
+    file (a re-mint, a shard merge); only the latest counts, so its lines are read
+    first and the records yielded afterwards, each with the offset of the end.
+    Entries whose file name has no number (a shared parent, say) are skipped.
+    """
+    if source.endswith('.jsonl'):
+        latest = {}
+        for entry, offset in iter_journal(source, offset):
+            latest[entry['file']] = entry['txid']
+        for file_name, txid in latest.items():
+            record = _record(file_name, txid, options)
+            if record:
+                yield record, offset
+        return
+    with open(source, 'rb') as file:
+        first = file.read(64).lstrip()[:1]
+    if first == b'{':
+        for file_name, entry in iter_json_members(source):
+            record = _record(file_name, entry['txid'] if isinstance(entry, dict) else entry, options)
+            if record:
+                yield record, None
+    else:
+        for item in iter_json_items(source):
+            yield {"inscription_id": item["id"], "name": item["meta"]["name"]}, None
+
+
+def check_source(source):
+    """Raise before any manifest is touched if source is missing or not a ledger/manifest."""
+    with open(source, 'rb') as file:
+        first = file.read(64).lstrip()[:1]
+    if not source.endswith('.jsonl') and first not in (b'{', b'['):
+        raise ValueError(f"{source} is neither a JSON ledger nor an OW manifest")
+
+
+def _load_state():
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE, 'r') as file:
+            return json.load(file)
+    return {}
+
+
+def _save_state(state):
+    with open(STATE_FILE + '.tmp', 'w') as file:
+        json.dump(state, file, indent=4)
+    os.replace(STATE_FILE + '.tmp', STATE_FILE)
+
+
+def convert(source, outputs, **options):
+    """Write every manifest in outputs ([(format, path)]) from one streaming pass over source.
+
+    When source is a mint journal and every manifest is unchanged since the last
+    run, only the lines appended since then are read and their items appended to
+    the manifests. Otherwise the manifests are rewritten from scratch: they are
+    written next to the old ones (.tmp) and only replace them once the whole source
+    has been read, so a missing or broken source leaves the existing manifests as
+    they were. If the appended lines re-record a file the manifests already list
+    (a re-mint), they are rebuilt instead, since that item has to be replaced.
+    Ledgers and manifests are streamed; a journal needs one entry per file in
+    memory. Returns the number of items written.
+    """
+    options = {**DEFAULT_OPTIONS, **options}
+    source = resolve_source(source)
+    for format_name, _ in outputs:
+        if format_name not in FORMATS:
+            raise ValueError(f"Unknown format {format_name!r}, expected one of {', '.join(sorted(FORMATS))}")
+    check_source(source)
+    fingerprint = hashlib.sha256(json.dumps([source, options], sort_keys=True).encode()).hexdigest()
+    state = _load_state()
+    offset = 0
+    if source.endswith('.jsonl'):
+        previous = [state.get(os.path.abspath(path)) for _, path in outputs]
+        if all(entry and entry["fingerprint"] == fingerprint and entry["format"] == format_name
+               and os.path.exists(path) and os.path.getsize(path) == entry["size"]
+               for entry, (format_name, path) in zip(previous, outputs)) \
+                and len({entry["offset"] for entry in previous}) == 1 \
+                and previous[0]["offset"] <= os.path.getsize(source):
+            offset = previous[0]["offset"]
+    if offset:
+        listed = {entry['file'] for entry, _ in iter_journal(source, 0, offset)}
+        if any(entry['file'] in listed for entry, _ in iter_journal(source, offset)):
+            offset = 0
+    append = offset > 0
+    targets = [path if append else path + '.tmp' for _, path in outputs]
+    writers = [(FORMATS[format_name], JsonListWriter(target, FORMATS[format_name]["key"], append=append))
+               for (format_name, _), target in zip(outputs, targets)]
+    written = 0
+    try:
+        for record, offset in iter_records(source, options, offset):
+            for output_format, writer in writers:
+                writer.write(output_format["item"](record, options))
+            written += 1
+    except BaseException:
+        for _, writer in writers:
+            writer.close()
+        if not append:
+            for target in targets:
+                os.remove(target)
+        raise
+    for _, writer in writers:
+        writer.close()
+    if not append:
+        for (_, path), target in zip(outputs, targets):
+            os.replace(target, path)
+    if source.endswith('.jsonl'):
+        for format_name, path in outputs:
+            state[os.path.abspath(path)] = {"format": format_name, "fingerprint": fingerprint,
+                                            "offset": offset, "size": os.path.getsize(path)}
+        _save_state(state)
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Turn a mint ledger into marketplace manifests in one pass.")
+    parser.add_argument('source', help="mint journal/ledger (airDropOutput.json, NerdStone.json) or an OW manifest")
+    parser.add_argument('--output', action='append', required=True, metavar='FORMAT=PATH',
+                        help=f"manifest to write, format one of {', '.join(sorted(FORMATS))} (repeatable)")
+    parser.add_argument('--name', default=DEFAULT_OPTIONS["name"], help="item name, numbered as '<name> #N'")
+    parser.add_argument('--symbol', default=DEFAULT_OPTIONS["symbol"], help="collection symbol (DL)")
+    parser.add_argument('--image-uri', default=DEFAULT_OPTIONS["image_uri"], help="collection image (DL)")
+    args = parser.parse_args()
+    manifests = [tuple(spec.split('=', 1)) for spec in args.output]
+    count = convert(args.source, manifests, name=args.name, symbol=args.symbol, image_uri=args.image_uri)
+    print(f"{count} items from {resolve_source(args.source)} written to {', '.join(path for _, path in manifests)}")
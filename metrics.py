@@ -0,0 +1,217 @@
+import atexit
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Seconds; wide enough for a 10 ms RPC call and for a confirmation after a slow block.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+HELP = {
+    'mint_command_seconds': "Duration of one doginals CLI command (mint, wallet sync)",
+    'confirmation_seconds': "Time from a mint's txid being tracked to its confirmation",
+    'rpc_call_seconds': "Node JSON-RPC latency per method",
+    'ledger_write_seconds': "Time to append and fsync one mint journal record",
+    'retries_total': "Retried operations by error class",
+    'rpc_errors_total': "RPC calls the node answered with an error, per method",
+    'mint_failures_total': "Minted transactions that failed to confirm, by reason",
+}
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape_label(value):
+    # The exposition format's escapes inside a quoted label value.
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + '}'
+
+
+class Metrics:
+    """Counters and latency histograms for a whole campaign, plus an optional JSONL trace.
+
+    Everything is kept in memory (a handful of numbers per metric and label set), so
+    recording is cheap enough for every RPC call. With a trace file every observation
+    is also written as one JSON line, {"ts", "metric", "value", labels...}, for
+    after-the-fact analysis of where the time went.
+    """
+
+    def __init__(self, trace_path=None):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}  # (name, label key) -> [bucket counts, count, sum, max]
+        self.trace_file = open(trace_path, 'a', encoding='utf-8') if trace_path else None
+
+    def _trace(self, record):
+        if self.trace_file is not None:
+            line = json.dumps(record) + '\n'
+            with self.lock:
+                self.trace_file.write(line)
+                self.trace_file.flush()
+
+    def inc(self, name, amount=1, **labels):
+        with self.lock:
+            key = (name, _label_key(labels))
+            self.counters[key] = self.counters.get(key, 0) + amount
+        self._trace({"ts": time.time(), "metric": name, "value": amount, **labels})
+
+    def observe(self, name, seconds, **labels):
+        with self.lock:
+            key = (name, _label_key(labels))
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [[0] * len(BUCKETS), 0, 0.0, 0.0]
+            for index, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    histogram[0][index] += 1
+            histogram[1] += 1
+            histogram[2] += seconds
+            histogram[3] = max(histogram[3], seconds)
+        self._trace({"ts": time.time(), "metric": name, "value": round(seconds, 6), **labels})
+
+    @contextmanager
+    def timer(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def event(self, name, **fields):
+        """Trace-only record, e.g. a campaign starting."""
+        self._trace({"ts": time.time(), "event": name, **fields})
+
+    def summary(self):
+        """{metric: {label string: {count, total_s, avg_ms, max_ms} or counter value}}."""
+        with self.lock:
+            result = {}
+            for (name, key), (_, count, total, longest) in sorted(self.histograms.items()):
+                result.setdefault(name, {})[_format_labels(key)] = {
+                    "count": count, "total_s": round(total, 3),
+                    "avg_ms": round(total / count * 1000, 1), "max_ms": round(longest * 1000, 1)}
+            for (name, key), value in sorted(self.counters.items()):
+                result.setdefault(name, {})[_format_labels(key)] = value
+            return result
+
+    def print_summary(self):
+        for name, series in self.summary().items():
+            for labels, value in series.items():
+                if isinstance(value, dict):
+                    print(f"{name}{labels}: {value['count']} x avg {value['avg_ms']} ms, "
+                          f"max {value['max_ms']} ms, total {value['total_s']} s")
+                else:
+                    print(f"{name}{labels}: {value}")
+
+    def render_prometheus(self):
+        """Prometheus text exposition format, metric names prefixed with dpay_."""
+        lines = []
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+        described = set()
+        for (name, key), (buckets, count, total, _) in histograms:
+            metric = f"dpay_{name}"
+            if metric not in described:
+                described.add(metric)
+                lines += [f"# HELP {metric} {HELP.get(name, name)}", f"# TYPE {metric} histogram"]
+            for bound, bucket_count in zip(BUCKETS, buckets):
+                lines.append(f"{metric}_bucket{_format_labels(key, [('le', bound)])} {bucket_count}")
+            lines.append(f"{metric}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+            lines.append(f"{metric}_sum{_format_labels(key)} {total}")
+            lines.append(f"{metric}_count{_format_labels(key)} {count}")
+        for (name, key), value in counters:
+            metric = f"dpay_{name}"
+            if metric not in described:
+                described.add(metric)
+                lines += [f"# HELP {metric} {HELP.get(name, name)}", f"# TYPE {metric} counter"]
+            lines.append(f"{metric}{_format_labels(key)} {value}")
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path):
+        """Write the metrics for node_exporter's textfile collector (atomically)."""
+        with open(path + '.tmp', 'w', encoding='utf-8') as file:
+            file.write(self.render_prometheus())
+        os.replace(path + '.tmp', path)
+
+    def export_textfile(self, path, interval=15):
+        """Rewrite `path` every `interval` seconds and once more when the process exits."""
+        def run():
+            while True:
+                time.sleep(interval)
+                self.write_textfile(path)
+
+        threading.Thread(target=run, name="metrics-textfile", daemon=True).start()
+        atexit.register(self.write_textfile, path)
+
+    def serve(self, port, host='127.0.0.1'):
+        """Serve /metrics on a local port for Prometheus to scrape; returns the server."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        return server
+
+
+_shared_metrics = None
+_shared_lock = threading.Lock()
+
+
+def get_metrics():
+    """The Metrics shared by the whole process, set up from the environment on first use.
+
+    METRICS_TRACE=trace.jsonl    append every observation to a JSONL trace
+    METRICS_TEXTFILE=dpay.prom   keep a Prometheus textfile up to date (METRICS_INTERVAL s)
+    METRICS_PORT=9464            serve /metrics on localhost
+    """
+    global _shared_metrics
+    with _shared_lock:
+        if _shared_metrics is None:
+            _shared_metrics = Metrics(os.getenv('METRICS_TRACE') or None)
+            if os.getenv('METRICS_TEXTFILE'):
+                _shared_metrics.export_textfile(os.environ['METRICS_TEXTFILE'], int(os.getenv('METRICS_INTERVAL', '15')))
+            if os.getenv('METRICS_PORT'):
+                _shared_metrics.serve(int(os.environ['METRICS_PORT']))
+        return _shared_metrics
+
+
+def profile_call(func, *args, path=None, **kwargs):
+    """Run func under cProfile when `path` (or DPAY_PROFILE) is set, saving the stats there.
+
+    Load the file with `python -m pstats <path>` or snakeviz; the top entries by
+    cumulative time are printed as well. Without a path func just runs.
+    """
+    path = path or os.getenv('DPAY_PROFILE')
+    if not path:
+        return func(*args, **kwargs)
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        profiler.dump_stats(path)
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(20)
+        print(f"Profile saved to {path}\n{report.getvalue()}")
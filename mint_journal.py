@@ -0,0 +1,150 @@
+import json
+import os
+import sys
+import time
+
+from campaign_store import campaign_name, get_store
+from metrics import get_metrics
+
+_journals = {}
+
+
+class MintJournal:
+    """Append-only record of every mint, one JSON line per mint.
+
+    Each record is flushed and fsync'd before `record` returns, so a crash can at
+    worst lose the line being written, never the mints before it. A line left torn
+    by such a crash is moved to <journal>.corrupt when the journal is next opened,
+    so the journal itself only ever holds whole records. The journal lives
+    next to the output file it replaces (airDropOutput.json -> airDropOutput.jsonl)
+    and `compact` writes the output file in the usual {file name: {...}} layout for
+    the tools that read it. With DPAY_DB set every record is mirrored into the
+    campaign store (campaign_store.py) as well, under DPAY_CAMPAIGN or the output
+    file's name.
+    """
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.path = os.path.splitext(output_file)[0] + '.jsonl'
+        self.by_file = {}
+        self.by_address = {}
+        if os.path.exists(self.path):
+            self._load()
+            self._end_torn_line()
+        elif os.path.exists(output_file):
+            self._import_output()
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def _index(self, record):
+        key = record['file']
+        entry = {k: v for k, v in record.items() if k != 'file'}
+        previous = self.by_file.get(key)
+        if previous is not None:
+            self.by_address[previous.get('address')].remove(key)
+        self.by_address.setdefault(entry.get('address'), []).append(key)
+        self.by_file[key] = entry
+
+    def _load(self):
+        unreadable = set()
+        with open(self.path, 'rb') as file:
+            for line_number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    self._index(json.loads(line))
+                except ValueError:
+                    # Only a torn final line is expected here (crash mid-append).
+                    print(f"Moving unreadable line {line_number} of {self.path} to {self.path}.corrupt")
+                    unreadable.add(line_number)
+        if unreadable:
+            self._set_aside(unreadable)
+
+    def _set_aside(self, line_numbers):
+        """Move the given lines to <journal>.corrupt and rewrite the journal without them."""
+        with open(self.path, 'rb') as file, open(self.path + '.tmp', 'wb') as kept, \
+                open(self.path + '.corrupt', 'ab') as corrupt:
+            for line_number, line in enumerate(file, 1):
+                target = corrupt if line_number in line_numbers else kept
+                target.write(line if line.endswith(b'\n') else line + b'\n')
+            for output in (kept, corrupt):
+                output.flush()
+                os.fsync(output.fileno())
+        os.replace(self.path + '.tmp', self.path)
+
+    def _end_torn_line(self):
+        """Terminate a last record written without its newline so the next one starts on its own line."""
+        with open(self.path, 'rb+') as file:
+            file.seek(0, os.SEEK_END)
+            if file.tell() == 0:
+                return
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) != b'\n':
+                file.write(b'\n')
+
+    def _import_output(self):
+        """Seed a new journal from an existing output file so resumes keep counting."""
+        try:
+            with open(self.output_file, 'r') as file:
+                data = json.load(file)
+        except json.JSONDecodeError as e:
+            print(f"JSON decode error in {self.output_file}: {e}")
+            return
+        with open(self.path, 'w', encoding='utf-8') as file:
+            for key, entry in data.items():
+                record = {'file': key, **entry}
+                file.write(json.dumps(record) + '\n')
+                self._index(record)
+            file.flush()
+            os.fsync(file.fileno())
+        print(f"Imported {len(data)} entries from {self.output_file} into {self.path}")
+
+    def __len__(self):
+        return len(self.by_file)
+
+    def __contains__(self, file_name):
+        return file_name in self.by_file
+
+    def record(self, image_path, txid, address, **extra):
+        """Append one mint to the journal and make it durable."""
+        record = {'file': os.path.basename(image_path), 'txid': txid, 'address': address, **extra}
+        started = time.perf_counter()
+        self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        get_metrics().observe('ledger_write_seconds', time.perf_counter() - started)
+        self._index(record)
+        store = get_store()
+        if store is not None:
+            store.record_mint(os.getenv('DPAY_CAMPAIGN') or campaign_name(self.output_file), record['file'], txid, address)
+        return record
+
+    def files_for_address(self, address):
+        return list(self.by_address.get(address, []))
+
+    def compact(self):
+        """Write the output file in its usual layout, replacing it atomically."""
+        temp_name = self.output_file + '.tmp'
+        with open(temp_name, 'w') as file:
+            json.dump(self.by_file, file, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_name, self.output_file)
+
+    def close(self):
+        self.file.close()
+
+
+def open_journal(output_file):
+    """Return the shared journal for an output file, opening it on first use."""
+    path = os.path.abspath(output_file)
+    if path not in _journals:
+        _journals[path] = MintJournal(output_file)
+    return _journals[path]
+
+
+if __name__ == "__main__":
+    # Rebuild output files from their journals, e.g. `python mint_journal.py airDropOutput.json`
+    for output_file in sys.argv[1:] or ['airDropOutput.json']:
+        journal = open_journal(output_file)
+        journal.compact()
+        print(f"Compacted {len(journal)} entries into {output_file}")
@@ -0,0 +1,284 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import threading
+import time
+
+from metrics import get_metrics
+
+DEAD_LETTER_FILE = os.getenv('MINT_DEAD_LETTERS', 'dead_letters.jsonl')
+TXID_PATTERN = re.compile("inscription txid: (\\w+)")
+
+# Checked in order against the output of a mint or `wallet sync`; the first match wins.
+# Node rejects come through as "<code>: <reason>", CLI and network failures as Node messages.
+ERROR_CLASSES = (
+    ('chain_limit', re.compile(r'too-long-mempool-chain')),
+    # doginals: "found pending-txs.json. rebroadcasting..."; any mention means txs are waiting there.
+    ('pending_txs', re.compile(r'pending-txs\.json', re.I)),
+    ('insufficient_funds', re.compile(r'not enough funds|insufficient funds|no (spendable )?utxos', re.I)),
+    ('fee_too_low', re.compile(r'min relay fee not met|mempool min fee not met|insufficient priority|fee too low', re.I)),
+    ('rpc_unreachable', re.compile(r'ECONNREFUSED|ECONNRESET|ETIMEDOUT|EHOSTUNREACH|socket hang up'
+                                   r'|Work queue depth exceeded|status code 5\d\d', re.I)),
+    ('missing_file', re.compile(r'ENOENT|no such file', re.I)),
+)
+
+
+class RetryPolicy:
+    """What to do about one error class.
+
+    action is 'sync' (wait for a block, then `wallet sync` the transactions doginals
+    kept in pending-txs.json), 'block' (wait for a block, then mint again), 'backoff'
+    (exponential backoff with full jitter between base_delay and max_delay) or 'fail'
+    (dead-letter at once). After max_retries retries the item is dead-lettered; with
+    halt the engine also stops minting, since every later item would fail the same way.
+    """
+
+    def __init__(self, action, max_retries=0, base_delay=1, max_delay=60, halt=False):
+        self.action = action
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.halt = halt
+
+    def delay(self, retry, rng=random):
+        return rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (retry - 1)))
+
+
+DEFAULT_POLICIES = {
+    # A block always makes room, so keep going as long as it takes.
+    'chain_limit': RetryPolicy('sync', max_retries=1000),
+    'pending_txs': RetryPolicy('sync', max_retries=3),
+    # Retrying cannot fix these; the wallet needs funding or FEE_PER_KB needs raising.
+    'insufficient_funds': RetryPolicy('fail', halt=True),
+    'fee_too_low': RetryPolicy('block', max_retries=2),
+    'rpc_unreachable': RetryPolicy('backoff', max_retries=6, base_delay=2, max_delay=60),
+    'missing_file': RetryPolicy('fail'),
+    'unknown': RetryPolicy('backoff', max_retries=2, base_delay=2, max_delay=30),
+}
+
+
+def classify(output):
+    """Error class of a failed command's output (stdout + stderr), 'unknown' if nothing matches."""
+    for error_class, pattern in ERROR_CLASSES:
+        if pattern.search(output):
+            return error_class
+    return 'unknown'
+
+
+class MintResult(subprocess.CompletedProcess):
+    """The combined output of every command one mint ran, with how it ended.
+
+    txid is None when the item was dead-lettered; error_class then says why.
+    """
+
+    def __init__(self, args, returncode, stdout, stderr, txid=None, error_class=None, attempts=1):
+        super().__init__(args, returncode, stdout, stderr)
+        self.txid = txid
+        self.error_class = error_class
+        self.attempts = attempts
+
+
+class DeadLetterQueue:
+    """Items that could not be minted, one JSON line each, keyed by image path.
+
+    An item that fails again replaces its earlier entry. `python mint_retry.py retry`
+    mints the entries again later and removes the ones that succeed.
+    """
+
+    def __init__(self, path=DEAD_LETTER_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def entries(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'r', encoding='utf-8') as file:
+            by_path = {}
+            for line in file:
+                if line.strip():
+                    entry = json.loads(line)
+                    by_path[entry['image_path']] = entry
+        return list(by_path.values())
+
+    def add(self, image_path, address, error_class, message, attempts, cwd=None):
+        entry = {'image_path': image_path, 'address': address, 'wallet': cwd, 'error_class': error_class,
+                 'message': message.strip()[-500:], 'attempts': attempts, 'failed_at': time.time()}
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write(json.dumps(entry) + '\n')
+        return entry
+
+    def remove(self, image_paths):
+        """Drop entries (after they were minted) and compact the file."""
+        image_paths = set(image_paths)
+        with self.lock:
+            remaining = [entry for entry in self.entries() if entry['image_path'] not in image_paths]
+            with open(self.path + '.tmp', 'w', encoding='utf-8') as file:
+                file.writelines(json.dumps(entry) + '\n' for entry in remaining)
+            os.replace(self.path + '.tmp', self.path)
+
+
+_shared_queue = None
+_shared_lock = threading.Lock()
+
+
+def get_dead_letters():
+    """The DeadLetterQueue (MINT_DEAD_LETTERS, default dead_letters.jsonl) shared by this process."""
+    global _shared_queue
+    with _shared_lock:
+        if _shared_queue is None:
+            _shared_queue = DeadLetterQueue()
+        return _shared_queue
+
+
+class RetryEngine:
+    """Runs one mint to completion, retrying each kind of failure by its own policy.
+
+    `steps` holds the decision logic; `run` drives it with blocking waits and
+    `run_async` with asyncio ones, so the sequential, sharded and async engines
+    retry identically. One engine belongs to one wallet: a halting error (an empty
+    wallet) stops that wallet only, dead-lettering its remaining items without
+    running them.
+    """
+
+    def __init__(self, policies=None, dead_letters=None, rng=None):
+        self.policies = {**DEFAULT_POLICIES, **(policies or {})}
+        self.dead_letters = dead_letters or get_dead_letters()
+        self.rng = rng or random.Random()
+        self.halted = None
+
+    def steps(self, address, image_path, cwd=None):
+        """Generator: yields ('run', args) and ('wait', kind, seconds); send it each command result.
+
+        Returns (via StopIteration) the MintResult.
+        """
+        if self.halted:
+            message = f"skipped, wallet halted after {self.halted}"
+            print(f"Mint of {os.path.basename(image_path)} {message}, saved to {self.dead_letters.path}")
+            self.dead_letters.add(image_path, address, self.halted, message, 0, cwd)
+            return MintResult(['mint', address, image_path], 1, '', message, error_class=self.halted, attempts=0)
+        args = ['mint', address, image_path]
+        stdout, stderr, retries = [], [], {}
+        attempts = 0
+        while True:
+            result = yield ('run', args)
+            attempts += 1
+            stdout.append(result.stdout)
+            stderr.append(result.stderr)
+            txid_search = TXID_PATTERN.search(result.stdout)
+            if txid_search:
+                return MintResult(result.args, result.returncode, ''.join(stdout), ''.join(stderr),
+                                  txid_search.group(1), attempts=attempts)
+            error_class = classify(result.stdout + result.stderr)
+            policy = self.policies[error_class]
+            retry = retries[error_class] = retries.get(error_class, 0) + 1
+            if policy.action == 'fail' or retry > policy.max_retries:
+                if policy.halt:
+                    self.halted = error_class
+                print(f"Mint of {os.path.basename(image_path)} failed ({error_class}) after {attempts} "
+                      f"attempt(s), saved to {self.dead_letters.path}")
+                self.dead_letters.add(image_path, address, error_class, result.stdout + result.stderr, attempts, cwd)
+                return MintResult(result.args, result.returncode or 1, ''.join(stdout), ''.join(stderr),
+                                  error_class=error_class, attempts=attempts)
+            get_metrics().inc('retries_total', error_class=error_class)
+            if policy.action == 'backoff':
+                delay = policy.delay(retry, self.rng)
+                print(f"Mint of {os.path.basename(image_path)} failed ({error_class}), retrying in {delay:.1f}s...")
+                yield ('wait', 'delay', delay)
+            else:
+                print(f"Mint of {os.path.basename(image_path)} failed ({error_class}), retrying after the next block...")
+                yield ('wait', 'chain_full' if error_class == 'chain_limit' else 'block', None)
+            # Transactions doginals could not broadcast wait in pending-txs.json; minting again would fail.
+            pending = policy.action == 'sync' or 'pending-txs.json' in result.stdout
+            args = ['wallet', 'sync'] if pending else ['mint', address, image_path]
+
+    def run(self, scheduler, address, image_path, run_command, cwd=None):
+        """Mint with blocking waits; run_command(args) runs one doginals command."""
+        steps = self.steps(address, image_path, cwd)
+        try:
+            step = next(steps)
+            while True:
+                if step[0] == 'run':
+                    step = steps.send(run_command(step[1]))
+                    continue
+                _, kind, delay = step
+                if kind == 'delay':
+                    time.sleep(delay)
+                elif kind == 'chain_full':
+                    scheduler.chain_full()
+                else:
+                    scheduler.wait_for_block()
+                step = next(steps)
+        except StopIteration as done:
+            return done.value
+
+    async def run_async(self, scheduler, address, image_path, run_command, cwd=None):
+        """Same as run; run_command(args) is a coroutine and waits do not block the loop."""
+        steps = self.steps(address, image_path, cwd)
+        try:
+            step = next(steps)
+            while True:
+                if step[0] == 'run':
+                    step = steps.send(await run_command(step[1]))
+                    continue
+                _, kind, delay = step
+                if kind == 'delay':
+                    await asyncio.sleep(delay)
+                elif kind == 'chain_full':
+                    await asyncio.to_thread(scheduler.chain_full)
+                else:
+                    await asyncio.to_thread(scheduler.wait_for_block)
+                step = next(steps)
+        except StopIteration as done:
+            return done.value
+
+
+def retry_dead_letters(output_file, error_classes=None, dead_letters=None):
+    """Mint dead-lettered items again (after topping up the wallet, say) into output_file's journal."""
+    from mint_journal import open_journal
+    from mint_scheduler import MintScheduler
+
+    dead_letters = dead_letters or get_dead_letters()
+    journal = open_journal(output_file)
+    schedulers = {}
+    minted = []
+    for entry in dead_letters.entries():
+        if error_classes and entry['error_class'] not in error_classes:
+            continue
+        if os.path.basename(entry['image_path']) in journal:
+            minted.append(entry['image_path'])  # minted by a later run of the campaign
+            continue
+        scheduler = schedulers.get(entry['wallet'])
+        if scheduler is None:
+            scheduler = schedulers[entry['wallet']] = MintScheduler.from_env(retry=RetryEngine(dead_letters=dead_letters))
+        result = scheduler.mint(entry['address'], entry['image_path'], cwd=entry['wallet'])
+        if result.txid:
+            print(f"Successful mint of {os.path.basename(entry['image_path'])}, TXID: {result.txid}")
+            journal.record(entry['image_path'], result.txid, entry['address'])
+            scheduler.record_mint(result.txid)
+            minted.append(entry['image_path'])
+    dead_letters.remove(minted)
+    journal.compact()
+    return minted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect and retry mints that ended in the dead-letter queue.")
+    parser.add_argument('action', choices=('list', 'retry'))
+    parser.add_argument('--file', default=DEAD_LETTER_FILE, help="dead-letter queue (MINT_DEAD_LETTERS)")
+    parser.add_argument('--class', dest='error_classes', action='append', help="only this error class (repeatable)")
+    parser.add_argument('--output', default='airDropOutput.json', help="ledger to record retried mints in")
+    args = parser.parse_args()
+    queue = DeadLetterQueue(args.file)
+    if args.action == 'list':
+        for entry in queue.entries():
+            if not args.error_classes or entry['error_class'] in args.error_classes:
+                print(f"{entry['error_class']:<18} {entry['attempts']} attempt(s)  {entry['image_path']}  "
+                      f"{entry['address']}  {entry['message'].splitlines()[-1] if entry['message'] else ''}")
+    else:
+        minted = retry_dead_letters(args.output, args.error_classes, queue)
+        print(f"{len(minted)} dead-lettered items minted, {len(queue.entries())} left in {args.file}")
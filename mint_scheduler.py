@@ -0,0 +1,144 @@
+import os
+import time
+
+from block_events import get_block_events
+from rpc_client import JsonRpcError, get_rpc_client
+from mint_retry import RetryEngine
+from mint_worker import run_doginals
+
+
+class MintScheduler:
+    """Keeps minting until the unconfirmed ancestor chain reaches the node's limit.
+
+    After every mint the scheduler asks the node for the ancestor count of the newest
+    txid (getmempoolentry), learns how many transactions one mint adds to the chain,
+    and only blocks when the next mint would not fit. As soon as a block confirms
+    the chain it lets minting resume; there is no fixed batch size or sleep.
+
+    Without `block_events` it notices new blocks by polling every `poll_interval`
+    seconds; with a BlockEvents source it wakes the moment the node announces a block
+    and only re-checks on its own every `block_timeout` seconds.
+
+    Failed mints are retried by a RetryEngine (see mint_retry.py), one per scheduler
+    and so one per wallet.
+    """
+
+    def __init__(self, batch_call, chain_limit=25, poll_interval=2, tracker=None,
+                 block_events=None, block_timeout=60, retry=None):
+        self.batch_call = batch_call
+        self.chain_limit = chain_limit
+        self.poll_interval = poll_interval
+        self.tracker = tracker
+        self.block_events = block_events
+        self.block_timeout = block_timeout
+        self.retry = retry or RetryEngine()
+        self.tip = None
+        self.depth = 0
+        self.txs_per_mint = 1
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """Build a scheduler from RPC_* and MEMPOOL_CHAIN_LIMIT (Dogecoin Core default: 25)."""
+        kwargs.setdefault('chain_limit', int(os.getenv('MEMPOOL_CHAIN_LIMIT', '25')))
+        kwargs.setdefault('block_events', get_block_events())
+        return cls(get_rpc_client(), **kwargs)
+
+    def _call(self, method, *params):
+        try:
+            [(result, error)] = self.batch_call([(method, list(params))])
+        except (ConnectionError, JsonRpcError) as e:
+            print(f"Error calling {method}: {e}")
+            return None, {"code": None, "message": str(e)}
+        return result, error
+
+    def _tip_depth(self):
+        if self.tip is None:
+            return 0
+        result, error = self._call("getmempoolentry", self.tip)
+        if error is None:
+            return result.get("ancestorcount", 1)
+        if error.get("code") == -5:
+            return 0  # Not in the mempool any more: the chain has been mined.
+        print(f"Error reading mempool entry for {self.tip}: {error}")
+        return self.depth
+
+    def _generation(self):
+        return self.block_events.generation if self.block_events is not None else None
+
+    def _sleep_until_block(self, seen):
+        """Returns the new block hash when a block event woke us, None after a plain timeout."""
+        if self.block_events is None:
+            time.sleep(self.poll_interval)
+            return None
+        return self.block_events.wait(seen, self.block_timeout)
+
+    def _poll(self):
+        if self.tracker is not None and self.tracker.pending:
+            self.tracker.poll()
+
+    def record_mint(self, txid):
+        """Register a successful mint and update the chain depth from the node."""
+        previous = self.depth
+        self.tip = txid
+        self.depth = self._tip_depth()
+        if self.depth > previous:
+            self.txs_per_mint = max(self.txs_per_mint, self.depth - previous)
+
+    def has_capacity(self):
+        return self.depth + self.txs_per_mint <= self.chain_limit
+
+    def wait_for_capacity(self):
+        """Block until the next mint fits under the chain limit."""
+        if self.has_capacity():
+            return
+        print(f"Mempool chain at {self.depth}/{self.chain_limit}, waiting for a block...")
+        while True:
+            # Read the block generation before the depth, so a block in between still wakes us.
+            seen = self._generation()
+            self.depth = self._tip_depth()
+            if self.has_capacity():
+                break
+            self._sleep_until_block(seen)
+            self._poll()
+        print(f"Chain depth back to {self.depth}, resuming minting.")
+
+    def wait_for_block(self):
+        """Block until the node's block height changes."""
+        seen = self._generation()
+        height, _ = self._call("getblockcount")
+        while True:
+            new_block = self._sleep_until_block(seen)
+            seen = self._generation()
+            self._poll()
+            new_height, _ = self._call("getblockcount")
+            if new_block is not None:
+                return new_height
+            if height is None:
+                height = new_height
+            elif new_height is not None and new_height != height:
+                return new_height
+
+    def chain_full(self):
+        """The node rejected a mint for chain length; wait until a block makes room."""
+        if self.tip is None:
+            # The chain was started outside this run, so its depth is unknown.
+            print("Mempool chain limit reached, waiting for the next block...")
+            self.wait_for_block()
+            return
+        self.depth = self._tip_depth()
+        if self.has_capacity():
+            # A mint needs more room than we had learned (large files span several txs).
+            self.txs_per_mint = self.chain_limit - self.depth + 1
+        self.wait_for_capacity()
+
+    def mint(self, address, image_path, pool=None, cwd=None):
+        """Run `mint` once there is room in the chain, retrying failures by error class.
+
+        When the node rejects part of the mint for chain length, doginals keeps the
+        remaining transactions in pending-txs.json; they are broadcast by the next
+        `wallet sync` as soon as a block has made room, so the item is never minted twice.
+        Returns a MintResult holding the output of every command that ran; its txid
+        is None when the item ended in the dead-letter queue.
+        """
+        self.wait_for_capacity()
+        return self.retry.run(self, address, image_path, lambda args: run_doginals(args, pool, cwd), cwd)
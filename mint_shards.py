@@ -0,0 +1,122 @@
+import os
+import threading
+
+from block_events import get_block_events
+from confirmation_tracker import ConfirmationTracker
+from fanout import fan_out, fanout_ledger_path, reconcile
+from mint_journal import open_journal
+from mint_scheduler import MintScheduler
+from mint_worker import MintWorkerPool
+from preflight import preflight
+from rpc_client import get_rpc_client
+
+
+def shard_output_file(output_file, wallet_index):
+    """airDropOutput.json -> airDropOutput.wallet2.json for the second wallet."""
+    base, extension = os.path.splitext(output_file)
+    return f"{base}.wallet{wallet_index + 1}{extension}"
+
+
+def plan_shards(details_list, wallet_count, directory, file_prefix, file_extension, done):
+    """Deal the airDropList round-robin across wallets.
+
+    Item n of the list (1-based) always maps to file number n, so the split does not
+    depend on how far earlier runs got. Items whose file is in `done` are left out.
+    """
+    shards = [[] for _ in range(wallet_count)]
+    for number, details in enumerate(details_list, 1):
+        file_name = f"{file_prefix}{str(number).zfill(5)}.{file_extension}"
+        if file_name in done:
+            continue
+        shards[(number - 1) % wallet_count].append((os.path.join(directory, file_name), details))
+    return shards
+
+
+def mint_shard(wallet_dir, jobs, journal, use_workers=False):
+    """Mint one wallet's share of the list on its own mempool chain."""
+    name = os.path.basename(os.path.normpath(wallet_dir))
+    block_events = get_block_events()  # one block source wakes every wallet thread
+    tracker = ConfirmationTracker(
+        get_rpc_client(), block_events=block_events,
+        on_confirmed=lambda txid, confirmations, file_name: print(f"[{name}] Transaction {txid} ({file_name}) is confirmed."))
+    scheduler = MintScheduler(tracker.batch_call, tracker=tracker, block_events=block_events,
+                              chain_limit=int(os.getenv('MEMPOOL_CHAIN_LIMIT', '25')))
+    pool = MintWorkerPool([wallet_dir]) if use_workers else None
+    try:
+        for image_path, details in jobs:
+            result_mint = scheduler.mint(details['dogecoin_address'], os.path.abspath(image_path), pool, wallet_dir)
+            if result_mint.stderr:
+                print(f"[{name}] Error in mint command: {result_mint.stderr}")
+            if result_mint.txid:
+                txid = result_mint.txid
+                print(f"[{name}] Successful mint of {os.path.basename(image_path)}, TXID: {txid}")
+                journal.record(image_path, txid, details['dogecoin_address'])
+                tracker.add(txid, os.path.basename(image_path))
+                scheduler.record_mint(txid)
+            else:
+                print(f"[{name}] No inscription txid for {image_path} ({result_mint.error_class})")
+        tracker.wait_all()
+        if tracker.failed:
+            print(f"[{name}] Failed transactions: {tracker.failed}")
+    finally:
+        if pool is not None:
+            pool.close()
+
+
+def merge_shard_journals(output_file, wallet_count):
+    """Fold every wallet's journal into the main ledger and rewrite output_file."""
+    journal = open_journal(output_file)
+    entries = {}
+    for wallet_index in range(wallet_count):
+        entries.update(open_journal(shard_output_file(output_file, wallet_index)).by_file)
+    for file_name in sorted(entries):  # Keep the ledger in file order, not wallet order.
+        if journal.by_file.get(file_name) != entries[file_name]:
+            journal.record(file_name, **entries[file_name])
+    journal.compact()
+    return journal
+
+
+def sharded_minting_process(wallet_dirs, directory, file_prefix, file_extension, details_list,
+                            output_file='airDropOutput.json', use_workers=False, fund_from=None):
+    """Mint an airDropList across several doginals wallets in parallel.
+
+    Every wallet directory gets its own share of the list, its own journal
+    (airDropOutput.walletN.jsonl), mempool chain scheduler and confirmation tracker.
+    When all wallets are done their journals are merged into output_file.
+    Re-running with the same wallet directories resumes every shard where it stopped.
+
+    With fund_from (a funded doginals wallet directory) every wallet first gets its
+    share's cost from one fan-out transaction (see fanout.py), and the splits are
+    reconciled against the ledger at the end.
+    """
+    wallet_count = len(wallet_dirs)
+    main_journal = open_journal(output_file)
+    shard_journals = [open_journal(shard_output_file(output_file, i)) for i in range(wallet_count)]
+    done = set(main_journal.by_file)
+    for shard_journal in shard_journals:
+        done.update(shard_journal.by_file)
+
+    # Checked once up front against the combined balance; rejected items are dealt to no wallet.
+    plan = preflight(enumerate(details_list, 1), directory, file_prefix, file_extension, done,
+                     wallet_dirs + [fund_from] if fund_from else wallet_dirs)
+    if plan is None:
+        return main_journal
+    shards = plan_shards(details_list, wallet_count, directory, file_prefix, file_extension, done | set(plan.rejected))
+    print(f"Minting {sum(len(jobs) for jobs in shards)} items across {wallet_count} wallets "
+          f"({', '.join(str(len(jobs)) for jobs in shards)})")
+    if fund_from:
+        fan_out(fund_from, wallet_dirs, shards, fanout_ledger_path(output_file))
+
+    threads = [threading.Thread(target=mint_shard, args=(wallet_dir, jobs, shard_journal, use_workers),
+                                name=f"wallet{i + 1}")
+               for i, (wallet_dir, jobs, shard_journal) in enumerate(zip(wallet_dirs, shards, shard_journals))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    journal = merge_shard_journals(output_file, wallet_count)
+    print(f"Merged {len(journal)} entries into {output_file}")
+    if fund_from:
+        reconcile(fanout_ledger_path(output_file), output_file)
+    return journal
@@ -0,0 +1,230 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from campaign_store import get_store
+from holder_aggregate import iter_json_items, iter_json_members
+from inscription_cost import INSCRIPTION_OUTPUT_SATS, SATS_PER_DOGE
+from manifest_converter import extract_number_from_filename, iter_journal, resolve_source
+from rpc_client import JsonRpcError, get_rpc_client
+
+VERIFIED_CACHE = os.getenv('VERIFIED_CACHE', '.verified_txs.jsonl')
+# Entries that are fine for now but must be looked at again on the next sweep.
+RECHECK = ('pending', 'unchecked')
+# Statuses that go into the verified cache.
+VERIFIED = ('verified', 'verified_partial')
+
+
+def iter_ledger(source, unreadable=None):
+    """Yield (file name, txid, address) from a mint journal (.jsonl) or {file: ...} ledger.
+
+    A journal can hold several records for one file (a re-mint, a shard merge);
+    only the latest counts, as in MintJournal. Journal lines that do not decode are
+    skipped and their offsets appended to unreadable.
+    """
+    source = resolve_source(source)
+    if source.endswith('.jsonl'):
+        latest = {}
+        for record, _ in iter_journal(source, unreadable=unreadable):
+            latest[record['file']] = (record['txid'], record.get('address'))
+        for file_name, (txid, address) in latest.items():
+            yield file_name, txid, address
+        return
+    for file_name, entry in iter_json_members(source):
+        if isinstance(entry, dict):
+            yield file_name, entry['txid'], entry.get('address')
+        else:
+            yield file_name, entry, None
+
+
+class VerifiedCache:
+    """txids already verified on chain, one JSON line each, so a sweep only checks new entries."""
+
+    def __init__(self, path=VERIFIED_CACHE):
+        self.path = path
+        self.txids = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.txids[entry['txid']] = entry
+
+    def __contains__(self, txid):
+        return txid in self.txids
+
+    def add(self, entries):
+        with open(self.path, 'a', encoding='utf-8') as file:
+            for entry in entries:
+                self.txids[entry['txid']] = entry
+                file.write(json.dumps(entry) + '\n')
+
+
+def _first_output(tx):
+    """(address, satoshis, script type) of output 0, where doginals sends the inscription."""
+    outputs = tx.get('vout') or []
+    if not outputs:
+        return None, None, None
+    script = outputs[0].get('scriptPubKey', {})
+    address = script.get('address') or (script.get('addresses') or [None])[0]
+    return address, int(Decimal(str(outputs[0].get('value', 0))) * SATS_PER_DOGE), script.get('type')
+
+
+def check_batch(batch_call, entries, required_confirmations=1):
+    """Verify (file, txid, address) entries with at most three RPC batches.
+
+    getrawtransaction (verbose) answers for every tx with -txindex or in the mempool;
+    the rest fall back to the wallet's gettransaction, whose hex is decoded in one
+    more batch. Returns {txid: (status, detail, confirmations)}.
+
+    For an inscription split over several transactions doginals prints the first
+    reveal, whose output 0 locks the next part in a P2SH script; the recipient is
+    only paid by the last part, which the node cannot find from here. Those report
+    verified_partial once confirmed: the address and amount are not checked.
+    """
+    results = {}
+    txs = {}
+    replies = batch_call([("getrawtransaction", [txid, 1]) for _, txid, _ in entries])
+    fallback = []
+    for (file_name, txid, address), (result, error) in zip(entries, replies):
+        if error is None and result:
+            txs[txid] = (result, result.get('confirmations', 0))
+        else:
+            fallback.append((file_name, txid, address))
+    if fallback:
+        replies = batch_call([("gettransaction", [txid]) for _, txid, _ in fallback])
+        to_decode = []
+        for (file_name, txid, address), (result, error) in zip(fallback, replies):
+            if error is not None or not result:
+                results[txid] = ('missing', (error or {}).get('message', 'unknown transaction'), None)
+            elif result.get('confirmations', 0) < 0:
+                results[txid] = ('conflicted', f"{result['confirmations']} confirmations", result['confirmations'])
+            elif result.get('hex'):
+                to_decode.append((txid, result))
+            else:
+                txs[txid] = (None, result.get('confirmations', 0))
+        if to_decode:
+            replies = batch_call([("decoderawtransaction", [result['hex']]) for _, result in to_decode])
+            for (txid, wallet_tx), (decoded, error) in zip(to_decode, replies):
+                txs[txid] = (decoded if error is None else None, wallet_tx.get('confirmations', 0))
+    for file_name, txid, address in entries:
+        if txid not in txs:
+            continue
+        tx, confirmations = txs[txid]
+        if tx is None:
+            results[txid] = ('unchecked', "the node returned no outputs to check the address against", confirmations)
+            continue
+        paid_to, sats, script_type = _first_output(tx)
+        if script_type == 'scripthash':
+            if confirmations < required_confirmations:
+                results[txid] = ('pending', f"{confirmations} confirmations", confirmations)
+            else:
+                results[txid] = ('verified_partial', "first part of a multi-part inscription; recipient not checked",
+                                 confirmations)
+        elif address and paid_to != address:
+            results[txid] = ('wrong_address', f"inscription output pays {paid_to}, not {address}", confirmations)
+        elif sats != INSCRIPTION_OUTPUT_SATS:
+            results[txid] = ('wrong_address', f"output 0 holds {sats} satoshis, not an inscription", confirmations)
+        elif confirmations < required_confirmations:
+            results[txid] = ('pending', f"{confirmations} confirmations", confirmations)
+        else:
+            results[txid] = ('verified', None, confirmations)
+    return results
+
+
+def intended_addresses(list_path):
+    """{item number: dogecoin_address} from an airDropList (item n receives file n)."""
+    return {number: details.get('dogecoin_address') for number, details in enumerate(iter_json_items(list_path), 1)}
+
+
+def verify_ledger(source, list_path=None, cache=None, rpc=None, workers=4, batch_size=50,
+                  required_confirmations=1, recheck=False):
+    """Check every ledger entry that is not in the verified cache against the node.
+
+    Batches of batch_size txids go to the node from `workers` threads at once (the
+    shared RpcClient pools its connections). With list_path the inscription must pay
+    item n of the airDropList for file n, and a ledger that recorded a different
+    address is reported as a list_mismatch. Verified txids are
+    added to the cache (and marked confirmed in the campaign store when DPAY_DB is
+    set). Returns the report: counts per status and every entry that is not verified.
+    """
+    cache = cache or VerifiedCache()
+    rpc = rpc or get_rpc_client()
+    intended = intended_addresses(list_path) if list_path else {}
+    report = {"source": resolve_source(source), "checked_at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+              "cached": 0, "unreadable": 0, "counts": {}, "mismatches": []}
+    entries = []
+    unreadable = []
+    for file_name, txid, address in iter_ledger(source, unreadable):
+        number = extract_number_from_filename(file_name)
+        if number in intended:
+            if address and intended[number] != address:
+                report["mismatches"].append({"file": file_name, "txid": txid, "address": address,
+                                             "status": "list_mismatch",
+                                             "detail": f"airDropList item {number} is {intended[number]}"})
+            address = intended[number]  # the chain must pay the intended recipient
+        if txid in cache and not recheck:
+            report["cached"] += 1
+        else:
+            entries.append((file_name, txid, address))
+    report["unreadable"] = len(unreadable)
+    batches = [entries[i:i + batch_size] for i in range(0, len(entries), batch_size)]
+
+    def check(batch):
+        try:
+            return batch, check_batch(rpc, batch, required_confirmations)
+        except (ConnectionError, JsonRpcError) as e:
+            return batch, {txid: ('error', str(e), None) for _, txid, _ in batch}
+
+    store = get_store()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for batch, results in executor.map(check, batches):
+            verified = []
+            for file_name, txid, address in batch:
+                status, detail, confirmations = results[txid]
+                report["counts"][status] = report["counts"].get(status, 0) + 1
+                if status in VERIFIED:
+                    verified.append({"txid": txid, "file": file_name, "address": address, "status": status,
+                                     "confirmations": confirmations, "verified_at": report["checked_at"]})
+                else:
+                    report["mismatches"].append({"file": file_name, "txid": txid, "address": address,
+                                                 "status": status, "detail": detail})
+                if store is not None and status in VERIFIED + ('conflicted',):
+                    store.set_status(txid, 'failed' if status == 'conflicted' else 'confirmed')
+            cache.add(verified)
+    return report
+
+
+def print_report(report):
+    counts = ', '.join(f"{count} {status}" for status, count in sorted(report["counts"].items()))
+    print(f"{report['source']}: {report['cached']} already verified, {counts or 'nothing new to check'}")
+    if report.get("unreadable"):
+        print(f"  {report['unreadable']} unreadable journal lines skipped")
+    for mismatch in report["mismatches"]:
+        if mismatch["status"] not in RECHECK:
+            print(f"  {mismatch['status']:<14} {mismatch['file']}  {mismatch['txid']}  {mismatch['detail']}")
+    pending = sum(1 for mismatch in report["mismatches"] if mismatch["status"] in RECHECK)
+    if pending:
+        print(f"  {pending} entries not final yet; they are checked again on the next sweep")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check every minted txid in a ledger against the node.")
+    parser.add_argument('source', nargs='?', default='airDropOutput.json', help="mint ledger or journal")
+    parser.add_argument('--list', help="airDropList the ledger was minted from, to cross-check addresses")
+    parser.add_argument('--report', default='verify_report.json', help="where to write the mismatch report")
+    parser.add_argument('--cache', default=VERIFIED_CACHE, help="verified-tx cache (VERIFIED_CACHE)")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--confirmations', type=int, default=1, help="required depth")
+    parser.add_argument('--recheck', action='store_true', help="ignore the cache and check everything")
+    args = parser.parse_args()
+    report = verify_ledger(args.source, args.list, VerifiedCache(args.cache), workers=args.workers,
+                           batch_size=args.batch_size, required_confirmations=args.confirmations, recheck=args.recheck)
+    print_report(report)
+    with open(args.report, 'w') as file:
+        json.dump(report, file, indent=4)
+    print(f"Report written to {args.report}")
@@ -0,0 +1,155 @@
+import json
+import os
+import queue
+import shlex
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from metrics import get_metrics
+
+# Command used to run the doginals CLI when no worker pool is in use.
+DOGINALS_COMMAND = shlex.split(os.getenv('DOGINALS_COMMAND', 'node .'))
+# Command that starts one persistent worker (see mintworker.js).
+WORKER_COMMAND = (shlex.split(os.environ['MINT_WORKER_COMMAND']) if 'MINT_WORKER_COMMAND' in os.environ
+                  else ['node', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mintworker.js'), 'index.js'])
+
+
+class MintWorker:
+    """One long-lived mintworker.js process, bound to a wallet directory."""
+
+    def __init__(self, cwd=None, command=None):
+        self.cwd = cwd
+        self.command = command or WORKER_COMMAND
+        self.process = None
+        self.next_id = 0
+        self.restarts = 0
+
+    def start(self):
+        self.process = subprocess.Popen(
+            self.command, cwd=self.cwd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            text=True, bufsize=1)  # stderr is inherited, so a crashing worker says why
+        ready = self.process.stdout.readline()
+        if not ready:
+            raise RuntimeError(f"Mint worker in {self.cwd or os.getcwd()} exited during startup")
+
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def run(self, args):
+        """Run one CLI command in the worker and return it as a CompletedProcess."""
+        if not self.alive():
+            if self.process is not None:
+                self.restarts += 1
+                print(f"Mint worker in {self.cwd or os.getcwd()} died, restarting (restart #{self.restarts})")
+            self.start()
+        self.next_id += 1
+        request = {"id": self.next_id, "args": [str(a) for a in args]}
+        try:
+            self.process.stdin.write(json.dumps(request) + "\n")
+            self.process.stdin.flush()
+            line = self.process.stdout.readline()
+        except (BrokenPipeError, OSError) as e:
+            line = ""
+            print(f"Mint worker pipe error: {e}")
+        if not line:
+            # The worker crashed mid-job. The job is not re-run: the mint may already
+            # have been broadcast, so the caller decides what to do with it.
+            self.close()
+            return subprocess.CompletedProcess(args, -1, "", "mint worker exited before answering")
+        try:
+            reply = json.loads(line)
+            return subprocess.CompletedProcess(args, reply["returncode"], reply["stdout"], reply["stderr"])
+        except (ValueError, KeyError, TypeError):
+            # Something other than the worker wrote to its stdout. Replies can no longer be
+            # matched to jobs, so the job counts as crashed and the worker is restarted.
+            self.close()
+            return subprocess.CompletedProcess(args, -1, "", f"mint worker wrote an unexpected line: {line.strip()}")
+
+    def close(self):
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+
+
+def workers_enabled():
+    """Whether MINT_WORKERS turns worker mode on; unset, empty and 0 leave it off."""
+    return os.getenv('MINT_WORKERS', '').strip() not in ('', '0')
+
+
+class MintWorkerPool:
+    """A pool of persistent mint workers, one per wallet directory.
+
+    Jobs go to whichever worker is idle. Jobs for the same wallet must not overlap,
+    so a pool with one wallet directory runs its jobs strictly in order.
+    """
+
+    def __init__(self, wallet_dirs=None, command=None):
+        wallet_dirs = list(wallet_dirs or [None])
+        self.workers = [MintWorker(cwd, command) for cwd in wallet_dirs]
+        self.idle = queue.Queue()
+        for worker in self.workers:
+            self.idle.put(worker)
+        self.executor = ThreadPoolExecutor(max_workers=len(self.workers))
+
+    @classmethod
+    def from_env(cls):
+        """Build a pool from MINT_WORKERS, or return None when worker mode is off.
+
+        MINT_WORKERS is either 1 (one worker on the current directory's wallet) or an
+        os.pathsep separated list of wallet directories, one worker each. A larger count
+        is refused: workers sharing a wallet would spend the same UTXOs.
+        """
+        if not workers_enabled():
+            return None
+        value = os.environ['MINT_WORKERS'].strip()
+        if value.isdigit():
+            if int(value) > 1:
+                raise ValueError(f"MINT_WORKERS={value} would run {value} workers on one wallet; "
+                                 f"list one wallet directory per worker, separated by {os.pathsep!r}")
+            return cls([None])
+        return cls(value.split(os.pathsep))
+
+    def run(self, args):
+        worker = self.idle.get()
+        try:
+            return worker.run(args)
+        finally:
+            self.idle.put(worker)
+
+    def submit(self, args):
+        return self.executor.submit(self.run, args)
+
+    def imap_unordered(self, jobs):
+        """Run every job in jobs and yield (job, result) pairs as they finish."""
+        futures = {self.submit(job): job for job in jobs}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        for worker in self.workers:
+            worker.close()
+
+
+def run_doginals(args, pool=None, cwd=None):
+    """Run a doginals CLI command such as ['mint', address, path].
+
+    Uses the persistent worker pool when one is given, otherwise starts `node .` once
+    for the command (without a shell, so paths need no quoting) in cwd, the wallet directory.
+    Each command's duration is recorded as mint_command_seconds{command, mode}.
+    """
+    started = time.perf_counter()
+    if pool is not None:
+        result = pool.run(args)
+    else:
+        result = subprocess.run(DOGINALS_COMMAND + [str(a) for a in args], cwd=cwd, capture_output=True, text=True)
+    get_metrics().observe('mint_command_seconds', time.perf_counter() - started,
+                          command=' '.join(str(a) for a in args[:2]) if args[0] == 'wallet' else args[0],
+                          mode='worker' if pool is not None else 'process')
+    return result
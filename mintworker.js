@@ -0,0 +1,101 @@
+// Long-lived mint worker for the doginals CLI.
+//
+// Loads the CLI (index.js) and its dependencies once, then runs jobs read from
+// stdin as JSON lines: {"id": 1, "args": ["mint", "<address>", "<path>"]}.
+// Every job is answered with one JSON line on stdout:
+// {"id": 1, "stdout": "...", "stderr": "...", "returncode": 0}
+//
+// Run it from the wallet directory, the same place you would run `node . mint`:
+//   node mintworker.js [path/to/index.js]
+const fs = require('fs')
+const path = require('path')
+const Module = require('module')
+const readline = require('readline')
+
+const cliPath = path.resolve(process.argv[2] || 'index.js')
+const writeLine = process.stdout.write.bind(process.stdout)
+const realExit = process.exit
+
+let job = null
+
+function capture(stream) {
+    return (...args) => {
+        const text = args.map(a => typeof a === 'string' ? a : require('util').inspect(a)).join(' ') + '\n'
+        if (job) job[stream] += text
+        else process.stderr.write(text)
+    }
+}
+
+// Everything the CLI prints belongs to the current job, never to the protocol channel.
+console.log = capture('stdout')
+console.info = capture('stdout')
+console.warn = capture('stderr')
+console.error = capture('stderr')
+
+function loadCli() {
+    // Compile index.js with `main` exported. The CLI calls main() itself on load,
+    // and doginals' main() rebroadcasts pending-txs.json before looking at the
+    // command, so that call must not run at all: the hoisted `main` is exported,
+    // then replaced with a no-op before the CLI's own code calls it. The prologue
+    // goes on the first code line so stack traces keep their line numbers.
+    let source = fs.readFileSync(cliPath, 'utf8')
+    let shebang = ''
+    if (source.startsWith('#!')) {
+        const end = source.indexOf('\n') + 1
+        shebang = source.slice(0, end)
+        source = source.slice(end)
+    }
+    const prologue = 'module.exports.__main = main; main = async function () {};'
+    const cli = new Module(cliPath, module)
+    cli.filename = cliPath
+    cli.paths = Module._nodeModulePaths(path.dirname(cliPath))
+    process.argv = [process.argv[0], cliPath, '__mintworker_load__']
+    cli._compile(shebang + prologue + source, cliPath)
+    return cli.exports.__main
+}
+
+class ExitCalled extends Error {
+    constructor(code) {
+        super(`process.exit(${code})`)
+        this.code = code
+    }
+}
+
+async function runJob(main, request) {
+    job = { id: request.id, stdout: '', stderr: '', returncode: 0 }
+    process.argv = [process.argv[0], cliPath, ...request.args]
+    process.exit = code => { throw new ExitCalled(code || 0) }
+    try {
+        await main()
+    } catch (e) {
+        if (e instanceof ExitCalled) {
+            job.returncode = e.code
+        } else {
+            // Same message the CLI prints from its own main().catch handler.
+            let reason = e.response && e.response.data && e.response.data.error && e.response.data.error.message
+            console.log(reason ? e.message + ':' + reason : e.message)
+            job.returncode = 1
+        }
+    } finally {
+        process.exit = realExit
+    }
+    const done = job
+    job = null
+    writeLine(JSON.stringify(done) + '\n')
+}
+
+async function serve() {
+    const main = loadCli()
+    writeLine(JSON.stringify({ ready: true }) + '\n')
+
+    const rl = readline.createInterface({ input: process.stdin })
+    for await (const line of rl) {
+        if (!line.trim()) continue
+        await runJob(main, JSON.parse(line))
+    }
+}
+
+serve().catch(e => {
+    process.stderr.write(`mintworker failed: ${e.stack || e}\n`)
+    realExit(1)
+})
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import mimetypes
+import os
+
+from inscription_cost import INSCRIPTION_OUTPUT_SATS, SATS_PER_DOGE, estimate_inscription
+
+BASE58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+_BASE58_INDEX = {char: index for index, char in enumerate(BASE58_ALPHABET)}
+# Address version bytes: P2PKH (D... / n...) and P2SH (9... or A... / 2...).
+ADDRESS_VERSIONS = {
+    'mainnet': {0x1e: 'p2pkh', 0x16: 'p2sh'},
+    'testnet': {0x71: 'p2pkh', 0xc4: 'p2sh'},
+}
+NETWORK = os.getenv('DOGE_NETWORK', 'mainnet')
+
+
+def decode_base58check(address):
+    """Payload (version byte + hash) of a base58check string; ValueError if it is not valid."""
+    number = 0
+    for char in address:
+        if char not in _BASE58_INDEX:
+            raise ValueError(f"invalid base58 character {char!r}")
+        number = number * 58 + _BASE58_INDEX[char]
+    raw = number.to_bytes((number.bit_length() + 7) // 8, 'big')
+    raw = b'\0' * (len(address) - len(address.lstrip('1'))) + raw
+    if len(raw) < 5:
+        raise ValueError("too short")
+    payload, checksum = raw[:-4], raw[-4:]
+    if hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4] != checksum:
+        raise ValueError("bad checksum")
+    return payload
+
+
+def encode_base58check(payload):
+    raw = payload + hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4]
+    number = int.from_bytes(raw, 'big')
+    chars = []
+    while number:
+        number, remainder = divmod(number, 58)
+        chars.append(BASE58_ALPHABET[remainder])
+    return '1' * (len(raw) - len(raw.lstrip(b'\0'))) + ''.join(reversed(chars))
+
+
+def address_problem(address, network=None):
+    """Why `address` cannot receive an inscription on `network`, or None if it can."""
+    if not isinstance(address, str) or not address:
+        return "missing address"
+    try:
+        payload = decode_base58check(address.strip())
+    except ValueError as e:
+        return f"not base58check ({e})"
+    versions = ADDRESS_VERSIONS[network or NETWORK]
+    if len(payload) != 21:
+        return f"wrong length ({len(payload) - 1}-byte hash)"
+    if payload[0] not in versions:
+        return f"not a Dogecoin {network or NETWORK} address (version 0x{payload[0]:02x})"
+    return None
+
+
+def validate_addresses(addresses, network=None):
+    """{address: problem} for every bad address; each distinct address is decoded once."""
+    problems = {}
+    checked = set()
+    for address in addresses:
+        if address in checked:
+            continue
+        checked.add(address)
+        problem = address_problem(address, network)
+        if problem:
+            problems[address] = problem
+    return problems
+
+
+def scan_directory(directory):
+    """{file name: size} for every file in `directory`, from a single os.scandir pass."""
+    with os.scandir(directory) as entries:
+        return {entry.name: entry.stat().st_size for entry in entries if entry.is_file()}
+
+
+def content_type(file_name):
+    """The content type doginals inscribes a file with."""
+    mime = mimetypes.guess_type(file_name)[0] or 'application/octet-stream'
+    return mime + ';charset=utf-8' if mime.startswith('text/') else mime
+
+
+def wallet_balance(wallet_dir=None):
+    """Spendable satoshis in a doginals wallet (.wallet.json utxos), or None if unknown."""
+    try:
+        with open(os.path.join(wallet_dir or '.', '.wallet.json'), 'r', encoding='utf-8') as file:
+            wallet = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if 'utxos' not in wallet:
+        return None
+    return sum(utxo.get('satoshis', 0) for utxo in wallet['utxos'])
+
+
+class MintPlan:
+    """The validated jobs of a campaign and what preflight found on the way.
+
+    jobs are (image_path, details) in minting order; rejected maps the file name of
+    every left-out item to the reason. cost_sats is the estimated fee plus the
+    inscription outputs of all jobs; balance_sats is None when no wallet could be read.
+    """
+
+    def __init__(self):
+        self.jobs = []
+        self.rejected = {}
+        self.cost_sats = 0
+        self.balance_sats = None
+
+    @property
+    def shortfall_sats(self):
+        if self.balance_sats is None:
+            return 0
+        return max(0, self.cost_sats - self.balance_sats)
+
+
+def build_plan(items, directory, file_prefix, file_extension, done=(), wallet_dirs=None, fee_per_kb=None,
+               network=None):
+    """Check a campaign before the first mint and return its MintPlan.
+
+    items are (file number, details) pairs in minting order. Files already in `done`
+    (the ledger's file names) are skipped silently; items whose file is missing or
+    whose dogecoin_address is not a valid address are rejected. The directory is read
+    once, addresses are validated in one batch and the cost is compared with the
+    balance of every wallet in wallet_dirs (default: the current directory's wallet).
+    """
+    plan = MintPlan()
+    try:
+        files = scan_directory(directory)
+    except OSError as e:
+        print(f"Cannot read {directory}: {e}")
+        files = {}
+    pending = []
+    for number, details in items:
+        file_name = f"{file_prefix}{str(number).zfill(5)}.{file_extension}"
+        if file_name not in done:
+            pending.append((file_name, details))
+    bad_addresses = validate_addresses((details.get('dogecoin_address') for _, details in pending), network)
+    for file_name, details in pending:
+        address = details.get('dogecoin_address')
+        if file_name not in files:
+            plan.rejected[file_name] = "file not found"
+        elif address in bad_addresses:
+            problem = bad_addresses[address]
+            plan.rejected[file_name] = f"{address}: {problem}" if address else problem
+        else:
+            plan.jobs.append((os.path.join(directory, file_name), details))
+            estimate = estimate_inscription(files[file_name], content_type(file_name), fee_per_kb)
+            plan.cost_sats += estimate["fee_sats"] + INSCRIPTION_OUTPUT_SATS
+    balances = [wallet_balance(wallet_dir) for wallet_dir in (wallet_dirs or [None])]
+    if all(balance is not None for balance in balances):
+        plan.balance_sats = sum(balances)
+    return plan
+
+
+def print_plan(plan):
+    for file_name, reason in plan.rejected.items():
+        print(f"Preflight: skipping {file_name}: {reason}")
+    balance = "unknown" if plan.balance_sats is None else f"{plan.balance_sats / SATS_PER_DOGE:.4f} DOGE"
+    print(f"Preflight: {len(plan.jobs)} items to mint, {len(plan.rejected)} rejected, "
+          f"estimated cost {plan.cost_sats / SATS_PER_DOGE:.4f} DOGE, wallet balance {balance}")
+    if plan.shortfall_sats:
+        print(f"Preflight: the wallet is {plan.shortfall_sats / SATS_PER_DOGE:.4f} DOGE short of the estimated cost")
+
+
+def preflight(items, directory, file_prefix, file_extension, done=(), wallet_dirs=None):
+    """build_plan and print it; None if the campaign must not start.
+
+    A balance below the estimated cost stops the run unless PREFLIGHT_ALLOW_SHORTFALL=1
+    (the estimate is conservative, and a run can be topped up while it goes).
+    """
+    plan = build_plan(items, directory, file_prefix, file_extension, done, wallet_dirs)
+    print_plan(plan)
+    if plan.shortfall_sats and os.getenv('PREFLIGHT_ALLOW_SHORTFALL') != '1':
+        print("Preflight failed: fund the wallet or set PREFLIGHT_ALLOW_SHORTFALL=1.")
+        return None
+    return plan
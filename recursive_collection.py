@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import re
+import string
+
+from html_collection import build_collection, load_manifest
+from html_minify import minify_template
+
+# Per-item values in the parent are marked __ITEM0__, __ITEM1__, ... and filled in by the stub.
+ITEM_MARKER = "__ITEM{}__"
+
+# Each item is this stub: it fetches the parent, puts its own values into the markers
+# and replaces the page with the result, so scripts in the parent run as usual.
+STUB_TEMPLATE = ('<!DOCTYPE html><script>fetch("/content/{{parent_id}}").then(r=>r.text()).then(h=>{{{{'
+                 'let v=[{values}],d=document;d.open();d.write(h.replace(/__ITEM(\\d+)__/g,(m,i)=>v[i]));'
+                 'd.close()}}}})</script>')
+
+
+def shared_file_names(file_prefix, file_extension):
+    """dpaystone -> ('dpaystone_parent.html', 'dpaystone_shared.json')."""
+    return f"{file_prefix}_parent.{file_extension}", f"{file_prefix}_shared.json"
+
+
+def split_template(template, args=(), newline=os.linesep):
+    """Split a collection template into the shared parent and the per-item fields.
+
+    Everything that is the same for every item, including the constant `args`
+    ({1}, {2}, ...), goes into the parent. The item number {0} and the manifest
+    traits become markers. Returns (parent text, [item field]), where each item field
+    is the str.format field text ("0:05d", "color") the stub must fill in.
+    """
+    parent = []
+    fields = []
+    for literal, field, format_spec, conversion in string.Formatter().parse(template):
+        parent.append(literal.replace('\n', newline))
+        if field is None:
+            continue
+        field_text = field + (f'!{conversion}' if conversion else '') + (f':{format_spec}' if format_spec else '')
+        if field.isdigit() and int(field) > 0:
+            parent.append(('{' + field_text + '}').format(None, *args))
+            continue
+        parent.append(ITEM_MARKER.format(len(fields)))
+        fields.append(field_text)
+    return ''.join(parent), fields
+
+
+def stub_template(fields):
+    """The str.format template of one item stub; {parent_id} is left for build_stubs."""
+    values = ','.join('{' + re.sub(r'^([^!:]+)(![a-z])?', r'\1!j', field) + '}' for field in fields)
+    return STUB_TEMPLATE.format(values=values)
+
+
+def _read_spec(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def _write_spec(path, spec):
+    with open(path + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump(spec, file, indent=4)
+    os.replace(path + '.tmp', path)
+
+
+def prepare_shared_collection(template, start, end, file_prefix, file_extension='html', directory='.', args=(),
+                              manifest_path=None, minify=False, newline=os.linesep):
+    """Write the parent asset and the collection spec; write the stubs once the parent is inscribed.
+
+    The parent goes to <prefix>_parent.<ext> and the spec to <prefix>_shared.json. The
+    spec holds the item range, the stub fields and, after the mint driver has inscribed
+    the parent, its txid. If the parent changes after it was inscribed, the old txid is
+    dropped so the drivers inscribe the new parent before any item.
+    """
+    if minify:
+        template = minify_template(template)
+    parent, fields = split_template(template, args, newline)
+    parent_file, spec_file = shared_file_names(file_prefix, file_extension)
+    os.makedirs(directory, exist_ok=True)
+    parent_bytes = parent.encode('utf-8')
+    parent_hash = hashlib.sha256(parent_bytes).hexdigest()
+
+    spec_path = os.path.join(directory, spec_file)
+    spec = _read_spec(spec_path) if os.path.exists(spec_path) else {}
+    if spec.get('parent_sha256') != parent_hash:
+        if spec.get('parent_txid'):
+            print(f"{parent_file} changed since it was inscribed as {spec['parent_txid']}i0; "
+                  "it will be inscribed again.")
+        spec['parent_txid'] = None
+        with open(os.path.join(directory, parent_file), 'wb') as file:
+            file.write(parent_bytes)
+    spec.update(parent_file=parent_file, parent_sha256=parent_hash, parent_bytes=len(parent_bytes),
+                stub_template=stub_template(fields), start=start, end=end, file_prefix=file_prefix,
+                file_extension=file_extension, manifest=manifest_path)
+    _write_spec(spec_path, spec)
+
+    if spec['parent_txid']:
+        build_stubs(spec_path)
+    else:
+        print(f"Wrote {parent_file} ({len(parent_bytes)} bytes). The mint driver inscribes it first, "
+              f"then writes the {end - start + 1} item stubs.")
+    return spec
+
+
+def build_stubs(spec_path):
+    """Render every item stub against the inscribed parent (incremental, like build_collection)."""
+    spec = _read_spec(spec_path)
+    if not spec.get('parent_txid'):
+        raise ValueError(f"{spec['parent_file']} has not been inscribed yet")
+    directory = os.path.dirname(spec_path) or '.'
+    template = spec['stub_template'].replace('{parent_id}', f"{spec['parent_txid']}i0")
+    manifest = load_manifest(spec['manifest'], spec['start']) if spec.get('manifest') else None
+    stats = build_collection(template, spec['start'], spec['end'], spec['file_prefix'], spec['file_extension'],
+                             directory, manifest=manifest)
+    print(f"{stats['written']} item stubs written, {stats['unchanged']} unchanged "
+          f"(parent {spec['parent_txid']}i0)")
+    return stats
+
+
+def wallet_address(wallet_dir=None):
+    """The doginals wallet's own address, from .wallet.json."""
+    with open(os.path.join(wallet_dir or '.', '.wallet.json'), 'r', encoding='utf-8') as file:
+        return json.load(file)['address']
+
+
+def ensure_parent_inscribed(directory, file_prefix, file_extension, scheduler, pool=None, cwd=None, tracker=None):
+    """Mint drivers call this before any item: inscribe the shared parent if needed.
+
+    Returns the parent inscription id, or None when the collection in `directory` has
+    no <prefix>_shared.json (a normal, self-contained collection). The parent goes to
+    PARENT_ADDRESS, or to the minting wallet's own address. Its txid is stored in the
+    spec and the item stubs are written right after, so the items minted next already
+    point at it.
+    """
+    parent_file, spec_file = shared_file_names(file_prefix, file_extension)
+    spec_path = os.path.join(directory, spec_file)
+    if not os.path.exists(spec_path):
+        return None
+    spec = _read_spec(spec_path)
+    if not spec.get('parent_txid'):
+        address = os.getenv('PARENT_ADDRESS') or wallet_address(cwd)
+        parent_path = os.path.abspath(os.path.join(directory, parent_file))
+        print(f"Inscribing shared parent {parent_file} to {address}")
+        result = scheduler.mint(address, parent_path, pool, cwd)
+        if result.txid is None:
+            raise RuntimeError(f"Could not inscribe {parent_file} ({result.error_class}): {result.stdout}{result.stderr}")
+        spec['parent_txid'] = result.txid
+        _write_spec(spec_path, spec)
+        scheduler.record_mint(spec['parent_txid'])
+        if tracker is not None:
+            tracker.add(spec['parent_txid'], parent_file)
+        print(f"Shared parent inscribed: {spec['parent_txid']}i0")
+    build_stubs(spec_path)
+    return f"{spec['parent_txid']}i0"
@@ -0,0 +1,239 @@
+import base64
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+from decimal import Decimal
+from urllib.parse import urlsplit
+
+from metrics import get_metrics
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def rpc_url_from_env():
+    """Build the node URL from the same RPC_* variables the minting scripts use."""
+    rpc_user = os.getenv('RPC_USER', '<username>')
+    rpc_password = os.getenv('RPC_PASSWORD', '<password>')
+    rpc_host = os.getenv('RPC_HOST', 'localhost')
+    rpc_port = os.getenv('RPC_PORT', '22555')
+    return f"http://{rpc_user}:{rpc_password}@{rpc_host}:{rpc_port}/"
+
+
+class JsonRpcError(Exception):
+    """An error the node returned for one call (the node itself is reachable)."""
+
+    def __init__(self, error):
+        super().__init__(f"{error.get('code')}: {error.get('message')}")
+        self.code = error.get('code')
+        self.message = error.get('message')
+
+
+class _DecimalEncoder(json.JSONEncoder):
+    def default(self, o):
+        if isinstance(o, Decimal):
+            return float(round(o, 8))
+        return super().default(o)
+
+
+class RpcClient:
+    """JSON-RPC client for the Dogecoin node, safe to share between threads and scripts.
+
+    - keeps a pool of keep-alive HTTP connections instead of one per request
+    - reconnects transparently when the node drops a connection (e.g. WinError 10053);
+      a pooled keep-alive connection the node already closed is retried on a fresh
+      one at once and does not count as a failure
+    - after `failure_threshold` consecutive connection failures it opens a circuit
+      breaker: calls wait out an exponential backoff (capped at `max_backoff`) before
+      the next attempt, instead of pinging the node before every call
+    - gives up with ConnectionError after `max_attempts` failed attempts (default
+      RPC_MAX_ATTEMPTS, 10, about two minutes of backoff; 0 retries forever)
+    - records call count, error count and latency per RPC method (see `stats`), also
+      reported to metrics.py as rpc_call_seconds{method}
+
+    `client.gettransaction(txid)` works like AuthServiceProxy; `client(calls)` sends a
+    batch and returns one (result, error) pair per call.
+    """
+
+    def __init__(self, url=None, pool_size=4, timeout=30, failure_threshold=3,
+                 base_backoff=1, max_backoff=60, max_attempts=None):
+        parts = urlsplit(url or rpc_url_from_env())
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = parts.path or '/'
+        self.timeout = timeout
+        credentials = f"{parts.username or ''}:{parts.password or ''}".encode()
+        self.headers = {"Authorization": "Basic " + base64.b64encode(credentials).decode(),
+                        "Content-Type": "application/json"}
+        self.connections = queue.LifoQueue(maxsize=pool_size)
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        if max_attempts is None:
+            max_attempts = int(os.getenv('RPC_MAX_ATTEMPTS', '10'))
+        self.max_attempts = max_attempts or None
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.open_until = 0
+        self.next_id = 0
+        self.latency = {}  # method -> [calls, errors, total seconds, max seconds]
+        self.http_requests = 0
+
+    # -- connection pool -------------------------------------------------
+
+    def _get_connection(self):
+        """(connection, pooled): a kept-alive connection from the pool if there is one."""
+        try:
+            return self.connections.get_nowait(), True
+        except queue.Empty:
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+    def _put_connection(self, connection):
+        try:
+            self.connections.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    # -- circuit breaker -------------------------------------------------
+
+    def _wait_for_circuit(self):
+        delay = self.open_until - time.monotonic()
+        if delay > 0:
+            print(f"RPC node unreachable, retrying in {delay:.1f} seconds...")
+            time.sleep(delay)
+
+    def _record_failure(self, error):
+        get_metrics().inc('retries_total', error_class=type(error).__name__ if isinstance(error, Exception) else 'rpc_http')
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                backoff = min(self.max_backoff, self.base_backoff * 2 ** (self.failures - self.failure_threshold))
+                self.open_until = time.monotonic() + backoff
+                print(f"RPC connection failed {self.failures} times ({error}), backing off {backoff}s")
+
+    def _record_success(self):
+        if self.failures:
+            with self.lock:
+                if self.failures >= self.failure_threshold:
+                    print("RPC connection restored.")
+                self.failures = 0
+                self.open_until = 0
+
+    # -- requests --------------------------------------------------------
+
+    def _post(self, payload):
+        """POST one JSON payload, reconnecting and backing off until the node answers or max_attempts fail."""
+        body = json.dumps(payload, cls=_DecimalEncoder)
+        attempts = 0
+        while True:
+            self._wait_for_circuit()
+            connection, pooled = self._get_connection()
+            try:
+                connection.request("POST", self.path, body, self.headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                connection.close()
+                if pooled:
+                    continue  # The node closed this idle connection; that says nothing about the node.
+                attempts += 1
+                self._record_failure(e)
+                if self.max_attempts is not None and attempts >= self.max_attempts:
+                    raise ConnectionError(f"RPC node unreachable: {e}") from e
+                continue
+            self._put_connection(connection)
+            self.http_requests += 1
+            if response.status == 401:
+                raise PermissionError("RPC authentication failed, check RPC_USER / RPC_PASSWORD")
+            try:
+                reply = json.loads(data, parse_float=Decimal)
+            except ValueError:
+                attempts += 1
+                self._record_failure(f"HTTP {response.status}")
+                if self.max_attempts is not None and attempts >= self.max_attempts:
+                    raise ConnectionError(f"RPC node returned HTTP {response.status}")
+                continue
+            self._record_success()
+            return reply
+
+    def _track(self, method, seconds, failed):
+        with self.lock:
+            stats = self.latency.setdefault(method, [0, 0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += int(failed)
+            stats[2] += seconds
+            stats[3] = max(stats[3], seconds)
+        metrics = get_metrics()
+        metrics.observe('rpc_call_seconds', seconds, method=method)
+        if failed:
+            metrics.inc('rpc_errors_total', method=method)
+
+    def _ids(self, count):
+        with self.lock:
+            first = self.next_id
+            self.next_id += count
+        return range(first, first + count)
+
+    def call(self, method, *params):
+        """Run one RPC method; raises JsonRpcError if the node returns an error."""
+        [request_id] = self._ids(1)
+        started = time.perf_counter()
+        reply = self._post({"jsonrpc": "1.0", "id": request_id, "method": method, "params": list(params)})
+        error = reply.get("error")
+        self._track(method, time.perf_counter() - started, error is not None)
+        if error is not None:
+            raise JsonRpcError(error)
+        return reply.get("result")
+
+    def batch(self, calls):
+        """Send (method, params) pairs in one request; returns a (result, error) pair per call."""
+        if not calls:
+            return []
+        ids = self._ids(len(calls))
+        payload = [{"jsonrpc": "1.0", "id": request_id, "method": method, "params": list(params)}
+                   for request_id, (method, params) in zip(ids, calls)]
+        started = time.perf_counter()
+        replies = self._post(payload)
+        if isinstance(replies, dict):
+            raise JsonRpcError(replies.get("error") or {"code": None, "message": "batch rejected"})
+        elapsed = (time.perf_counter() - started) / len(calls)
+        by_id = {reply.get("id"): reply for reply in replies}
+        results = []
+        for request_id, (method, _) in zip(ids, calls):
+            reply = by_id.get(request_id, {"error": {"code": None, "message": "missing reply"}})
+            self._track(method, elapsed, reply.get("error") is not None)
+            results.append((reply.get("result"), reply.get("error")))
+        return results
+
+    __call__ = batch
+
+    def __getattr__(self, method):
+        if method.startswith('_'):
+            raise AttributeError(method)
+        return lambda *params: self.call(method, *params)
+
+    def stats(self):
+        """Per-method {calls, errors, avg_ms, max_ms}."""
+        with self.lock:
+            return {method: {"calls": calls, "errors": errors,
+                             "avg_ms": round(total / calls * 1000, 2) if calls else 0,
+                             "max_ms": round(longest * 1000, 2)}
+                    for method, (calls, errors, total, longest) in self.latency.items()}
+
+    def print_stats(self):
+        print(f"RPC: {self.http_requests} HTTP requests")
+        for method, stats in sorted(self.stats().items()):
+            print(f"  {method}: {stats['calls']} calls, {stats['errors']} errors, "
+                  f"avg {stats['avg_ms']} ms, max {stats['max_ms']} ms")
+
+
+def get_rpc_client():
+    """The RpcClient shared by everything in this process, built from RPC_* on first use."""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = RpcClient(rpc_url_from_env())
+        return _shared_client
@@ -0,0 +1,68 @@
+// Stand-in for the doginals CLI (index.js) used by mint_simulator.py.
+//
+// Copied into every simulated wallet directory as index.js, so `node . mint` and
+// mintworker.js run it exactly like the real CLI. Instead of building transactions
+// it asks the simulated node (SIM_NODE_URL) to accept as many transactions as a
+// real inscription of the file would need. Output and pending-txs.json handling
+// follow doginals: when the node rejects a transaction for chain length the rest
+// is kept in pending-txs.json and broadcast by `node . wallet sync`.
+const fs = require('fs')
+const http = require('http')
+
+const NODE_URL = new URL(process.env.SIM_NODE_URL || 'http://127.0.0.1:22555/')
+const MINT_LATENCY_MS = Number(process.env.SIM_MINT_LATENCY_MS || 50)
+const MAX_CHUNK_LEN = 240
+const MAX_PAYLOAD_LEN = 1500
+
+function rpc(method, params) {
+    const body = JSON.stringify({ jsonrpc: '1.0', id: 0, method, params })
+    return new Promise((resolve, reject) => {
+        const request = http.request(NODE_URL, { method: 'POST', headers: { 'Content-Type': 'application/json' } }, response => {
+            let data = ''
+            response.on('data', chunk => data += chunk)
+            response.on('end', () => {
+                const reply = JSON.parse(data)
+                if (reply.error) reject(new Error(reply.error.message))
+                else resolve(reply.result)
+            })
+        })
+        request.on('error', reject)
+        request.end(body)
+    })
+}
+
+// Same layout as doginals: 240-byte pushes, ~1500 script bytes per tx, one final tx.
+function txCount(bytes) {
+    const chunks = Math.max(1, Math.ceil(bytes / MAX_CHUNK_LEN))
+    const script = 4 + 2 + 24 + bytes + chunks * 4
+    return Math.ceil(script / MAX_PAYLOAD_LEN) + 1
+}
+
+async function broadcast(inscription, count) {
+    const result = await rpc('sim_broadcast', [process.cwd(), inscription, count])
+    if (result.accepted < count) {
+        fs.writeFileSync('pending-txs.json', JSON.stringify({ inscription: result.inscription, remaining: count - result.accepted }))
+        console.log(`broadcast failed: 64: too-long-mempool-chain (${count - result.accepted} txs saved to pending-txs.json)`)
+        process.exit(1)
+    }
+    try { fs.unlinkSync('pending-txs.json') } catch (e) {}
+    console.log('inscription txid:', result.inscription)
+}
+
+async function main() {
+    const cmd = process.argv[2]
+    if (cmd == 'mint') {
+        if (fs.existsSync('pending-txs.json')) throw new Error('pending-txs.json exists, run `node . wallet sync` first')
+        const count = txCount(fs.statSync(process.argv[4]).size)
+        await new Promise(resolve => setTimeout(resolve, MINT_LATENCY_MS))
+        await broadcast(null, count)
+    } else if (cmd == 'wallet' && process.argv[3] == 'sync') {
+        if (!fs.existsSync('pending-txs.json')) return console.log('balance synced')
+        const pending = JSON.parse(fs.readFileSync('pending-txs.json'))
+        await broadcast(pending.inscription, pending.remaining)
+    }
+}
+
+main().catch(e => {
+    console.log(e.message)
+})
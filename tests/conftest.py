@@ -0,0 +1,11 @@
+import pytest
+
+# Settings that would make the modules under test write outside the test's directories.
+_ISOLATED_ENV = ('DPAY_DB', 'DPAY_CAMPAIGN', 'METRICS_TRACE', 'METRICS_TEXTFILE', 'METRICS_PORT',
+                 'MINT_WORKERS', 'DOGINALS_COMMAND', 'ZMQ_BLOCK_ENDPOINT', 'BLOCKNOTIFY_PORT')
+
+
+@pytest.fixture(autouse=True)
+def isolated_env(monkeypatch):
+    for name in _ISOLATED_ENV:
+        monkeypatch.delenv(name, raising=False)
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from allocation import allocate, load_holdings, main, parse_tiers  # noqa: E402
+from holder_snapshots import SnapshotStore  # noqa: E402
+
+
+def test_proportional_sums_to_the_total():
+    allocation = allocate([5, 3, 2], 'proportional', total=7)
+    assert allocation.tolist() == [4, 2, 1]
+
+
+def test_capped_shares_the_excess_among_the_rest():
+    allocation = allocate([100, 10, 10], 'capped', total=30, cap=12)
+    assert allocation.tolist() == [12, 9, 9]
+
+
+def test_proportional_applies_the_cap():
+    allocation = allocate([100, 10, 10], 'proportional', total=30, cap=12)
+    assert allocation.tolist() == [12, 9, 9]
+    assert allocate([100, 10, 10], 'proportional', total=30).tolist() == [25, 3, 2]
+
+
+def test_lottery_rejects_a_cap():
+    with pytest.raises(ValueError):
+        allocate([1, 2], 'lottery', total=2, seed=1, cap=1)
+
+
+def test_capped_allocates_at_most_cap_per_holder():
+    assert allocate([5, 5], 'capped', total=10, cap=3).tolist() == [3, 3]
+
+
+def test_tiers():
+    tiers = parse_tiers('1:1,10:3,50:10')
+    assert allocate([0.5, 1, 49, 50, 500], 'tiered', tiers=tiers).tolist() == [0, 1, 3, 10, 10]
+
+
+def test_lottery_is_reproducible_from_its_seed():
+    first = allocate([1, 2, 3, 4], 'lottery', total=3, seed=7, unique=True)
+    assert first.tolist() == allocate([1, 2, 3, 4], 'lottery', total=3, seed=7, unique=True).tolist()
+    assert first.sum() == 3
+    assert first.max() == 1
+
+
+def test_holdings_combine_files_and_snapshots(tmp_path):
+    (tmp_path / 'counts.json').write_text(json.dumps([{"address": "DA", "count": 2}, {"address": "DB", "count": 1}]))
+    store = SnapshotStore('dpay', str(tmp_path / 'snapshots'))
+    store.record({'DB': '4', 'DC': None})
+    addresses, holdings = load_holdings([(str(tmp_path / 'counts.json'), 1.0, False)], [(store, None, 0.5)])
+    assert addresses.tolist() == ['DA', 'DB', 'DC']
+    assert holdings.tolist() == [2, 3, 0.5]
+
+
+def test_main_writes_one_entry_per_item(tmp_path):
+    (tmp_path / 'counts.json').write_text(json.dumps([{"address": "DA", "count": 3}, {"address": "DB", "count": 1}]))
+    output = tmp_path / 'out.json'
+    main([str(tmp_path / 'counts.json'), '--items', '4', '--output', str(output)])
+    assert [row['dogecoin_address'] for row in json.loads(output.read_text())['airDropList']] == ['DA'] * 3 + ['DB']
@@ -0,0 +1,41 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+from mint_simulator import _RUNNER, DRIVERS, REPO_DIR, SimulatedNode, make_campaign
+
+pytestmark = pytest.mark.skipif(shutil.which('node') is None, reason="the simulated doginals CLI needs node")
+
+MINT_SECONDS = 2
+
+
+def test_two_wallets_mint_side_by_side(tmp_path):
+    node = SimulatedNode(block_interval=0.2).start()
+    try:
+        root = str(tmp_path)
+        files, wallet_dirs = make_campaign(root, 4, 2, 200)
+        env = dict(os.environ, RPC_USER='sim', RPC_PASSWORD='sim', RPC_HOST='127.0.0.1',
+                   RPC_PORT=str(node.server.server_address[1]), SIM_NODE_URL=node.url,
+                   SIM_MINT_LATENCY_MS=str(MINT_SECONDS * 1000), MEMPOOL_CHAIN_LIMIT='25', BLOCK_POLL_INTERVAL='0.2')
+        script = _RUNNER.format(repo=REPO_DIR, files=files, prefix='dpaystone', items=4, wallet_dirs=wallet_dirs,
+                                driver=DRIVERS['async_minter'])
+        started = time.perf_counter()
+        process = subprocess.run([sys.executable, '-c', script], cwd=root, env=env, capture_output=True, text=True,
+                                 timeout=120)
+        seconds = time.perf_counter() - started
+        assert process.returncode == 0, process.stdout[-2000:] + process.stderr[-2000:]
+    finally:
+        node.stop()
+
+    minted_by = re.findall(r"^\[(.+)\] Successful mint of (\S+),", process.stdout, re.M)
+    assert sorted(wallet for wallet, _ in minted_by) == sorted(wallet_dirs * 2)
+    with open(tmp_path / 'airDropOutput.json') as file:
+        assert sorted(json.load(file)) == [f"dpaystone{number:05}.html" for number in range(1, 5)]
+    # Four mints one after another would take four mint latencies; two wallets halve that.
+    assert seconds < 3 * MINT_SECONDS
@@ -0,0 +1,50 @@
+import threading
+
+from block_events import BlockEvents, NotifySocketBlockEvents, PollingBlockEvents, send_block_notification
+from mint_simulator import SimulatedNode
+from rpc_client import RpcClient
+
+
+def test_a_block_between_check_and_wait_is_not_missed():
+    events = BlockEvents()
+    seen = events.generation
+    events._new_block('hash1')  # arrives after the caller read generation, before it waits
+    assert events.wait(seen, timeout=0) == 'hash1'
+
+
+def test_the_same_hash_twice_is_one_block():
+    events = BlockEvents()
+    events._new_block('hash1')
+    events._new_block('hash1')
+    assert events.generation == 1
+    assert events.wait(timeout=0) is None
+
+
+def test_wait_wakes_when_the_block_arrives():
+    events = BlockEvents()
+    seen = events.generation
+    threading.Timer(0.05, events._new_block, ['hash1']).start()
+    assert events.wait(seen, timeout=5) == 'hash1'
+
+
+def test_notify_socket_receives_blocknotify_hashes():
+    events = NotifySocketBlockEvents(port=0)
+    try:
+        seen = events.generation
+        send_block_notification('abc123', port=events.port)
+        assert events.wait(seen, timeout=5) == 'abc123'
+    finally:
+        events.close()
+
+
+def test_polling_follows_the_best_block():
+    node = SimulatedNode(block_interval=3600).start()
+    events = PollingBlockEvents(RpcClient(node.url), interval=0.05)
+    try:
+        seen = events.generation
+        assert events.best_hash == node.best_hash
+        node.mine_block()
+        assert events.wait(seen, timeout=5) == node.best_hash
+    finally:
+        events.close()
+        node.stop()
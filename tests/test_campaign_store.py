@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from campaign_store import CampaignStore, campaign_name, dedupe_airdrop_list
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CampaignStore(str(tmp_path / 'dpay.db'))
+
+
+def test_shard_journals_belong_to_their_campaign(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert campaign_name('airDropOutput.wallet2.jsonl') == 'airDropOutput'
+    assert campaign_name('drops/NerdStone.json') == 'drops/NerdStone'
+
+
+def test_reimporting_a_mint_keeps_its_confirmed_status(store):
+    store.record_mint('drop', 'stone00001.html', 'tx1', 'DA')
+    store.set_status('tx1', 'confirmed')
+    store.add_inscriptions('drop', [('stone00001.html', 'tx1', None, 'minted')])
+    assert store.address_history('DA') == [('drop', 'stone00001.html', 'tx1', 'confirmed')]
+
+
+def test_a_remint_replaces_the_row(store):
+    store.record_mint('drop', 'stone00001.html', 'tx1', 'DA')
+    store.set_status('tx1', 'failed')
+    store.record_mint('drop', 'stone00001.html', 'tx2', 'DA')
+    assert store.address_history('DA') == [('drop', 'stone00001.html', 'tx2', 'minted')]
+
+
+def test_import_and_dedupe_across_campaigns(store, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'first.jsonl').write_text(json.dumps({"file": "a00001.html", "txid": "tx1", "address": "DA"}) + '\n')
+    (tmp_path / 'first.wallet2.jsonl').write_text(json.dumps({"file": "a00002.html", "txid": "tx2", "address": "DB"}) + '\n')
+    (tmp_path / 'next.json').write_text(json.dumps({"airDropList": [{"dogecoin_address": address}
+                                                                    for address in ("DA", "DB", "DC")]}))
+    assert store.import_paths(['first.jsonl', 'first.wallet2.jsonl', 'next.json']) == 5
+    assert [row['name'] for row in store.report()] == ['first', 'next']
+
+    assert dedupe_airdrop_list(store, 'next.json', 'deduped.json', 'next') == (1, 2)
+    assert json.loads((tmp_path / 'deduped.json').read_text()) == {"airDropList": [{"dogecoin_address": "DC"}]}
+
+
+def test_unreadable_journal_lines_are_skipped(store, tmp_path):
+    journal = tmp_path / 'drop.jsonl'
+    journal.write_text(json.dumps({"file": "a00001.html", "txid": "tx1", "address": "DA"}) + '\n'
+                       '{"file": "a00002.ht\n'
+                       + json.dumps({"file": "a00003.html", "txid": "tx3", "address": "DA"}) + '\n')
+    assert store.import_file(str(journal), 'drop') == ('journal', 2)
+    assert [row[1] for row in store.address_history('DA')] == ['a00001.html', 'a00003.html']
@@ -0,0 +1,69 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+
+import pytest
+
+from checker_index import build_checker_index, shard_file_name, shard_of
+from mint_simulator import REPO_DIR, sim_address
+
+ADDRESSES = [sim_address(f"holder{number}") for number in range(50)]
+
+# Runs checker.html's own script under node, with fetch reading the index from disk.
+LOOKUP_JS = r"""
+const fs = require('fs'), path = require('path');
+const [html, indexDir, queries] = process.argv.slice(1);
+const script = fs.readFileSync(html, 'utf8').match(/<script>([\s\S]*)<\/script>/)[1];
+const fetch = name => Promise.resolve({
+    json: () => JSON.parse(fs.readFileSync(path.join(indexDir, name.replace('checker_index/', '')), 'utf8')),
+    text: () => fs.readFileSync(path.join(indexDir, name.replace('checker_index/', '')), 'utf8'),
+});
+const lookups = eval(script + `;
+    JSON.parse(queries).map(address => loadManifest().then(index => {
+        const shard = fnv1a(address) % index.shards;
+        return loadShard(shard).then(sorted => [fnv1a(address), shard, contains(sorted, address)]);
+    }))`);
+Promise.all(lookups).then(results => console.log(JSON.stringify(results)));
+"""
+
+
+def test_shard_layout(tmp_path):
+    directory = str(tmp_path / 'index')
+    manifest = build_checker_index(ADDRESSES + [' ' + ADDRESSES[0] + '\n', ''], directory, shard_size=8)
+    assert (manifest['count'], manifest['shards'], manifest['hash']) == (50, 7, 'fnv1a32')
+    with open(os.path.join(directory, 'index.json')) as file:
+        assert json.load(file) == manifest
+
+    indexed = []
+    for shard in range(7):
+        with open(os.path.join(directory, shard_file_name(shard))) as file:
+            members = file.read().split('\n')
+        assert members == sorted(members)
+        assert all(shard_of(address, 7) == shard for address in members)
+        indexed += members
+    assert sorted(indexed) == sorted(ADDRESSES)
+
+    build_checker_index(ADDRESSES[:10], directory, shard_size=8)
+    assert sorted(os.listdir(directory)) == ['0000.txt', '0001.txt', 'index.json']
+
+
+def test_shard_of_is_fnv1a():
+    assert shard_of('', 1 << 32) == 0x811c9dc5
+    assert shard_of('a', 1 << 32) == 0xe40c292c
+    assert shard_of('foobar', 1 << 32) == 0xbf9cf968
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="checker.html's script runs under node")
+def test_checker_html_finds_addresses_in_the_shards_python_wrote(tmp_path):
+    directory = str(tmp_path / 'index')
+    build_checker_index(ADDRESSES, directory, shard_size=8)
+    queries = ADDRESSES + [sim_address('not listed')]
+    process = subprocess.run(['node', '-e', LOOKUP_JS, os.path.join(REPO_DIR, 'checker.html'), directory,
+                              json.dumps(queries)], capture_output=True, text=True, timeout=30)
+    assert process.returncode == 0, process.stderr
+    results = json.loads(process.stdout)
+    assert [hash_value for hash_value, _, _ in results] == [shard_of(address, 1 << 32) for address in queries]
+    assert [shard for _, shard, _ in results] == [shard_of(address, 7) for address in queries]
+    assert [found for _, _, found in results] == [True] * 50 + [False]
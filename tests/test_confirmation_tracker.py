@@ -0,0 +1,97 @@
+import pytest
+
+from confirmation_tracker import ConfirmationTracker
+from mint_simulator import SimulatedNode
+from rpc_client import RpcClient
+
+UNKNOWN = (None, {"code": -5, "message": "Invalid or non-wallet transaction id"})
+
+
+@pytest.fixture
+def node():
+    node = SimulatedNode(block_interval=3600).start()  # blocks only when the test mines one
+    yield node
+    node.stop()
+
+
+def scripted(*polls):
+    """A batch_call answering each poll with the next list of (result, error) replies."""
+    replies = iter(polls)
+    batches = []
+
+    def batch_call(calls):
+        batches.append(calls)
+        return next(replies)
+    batch_call.batches = batches
+    return batch_call
+
+
+def test_every_pending_txid_is_checked_in_one_request(node):
+    txids = [node.broadcast('wallet', None, 2)['inscription'] for _ in range(3)]
+    confirmed = []
+    tracker = ConfirmationTracker(RpcClient(node.url), on_confirmed=lambda txid, depth, label: confirmed.append(label))
+    for number, txid in enumerate(txids, 1):
+        tracker.add(txid, number)
+
+    requests = node.http_requests
+    assert tracker.poll() == {txid: 0 for txid in txids}
+    assert node.http_requests == requests + 1
+
+    node.mine_block()
+    assert tracker.wait_all(max_polls=1)
+    assert sorted(confirmed) == [1, 2, 3]
+    assert node.http_requests == requests + 2
+
+
+def test_unknown_txid_keeps_waiting_until_the_timeout():
+    batch_call = scripted([UNKNOWN], [UNKNOWN], [({"confirmations": 1}, None)])
+    tracker = ConfirmationTracker(batch_call, poll_interval=0, missing_timeout=60)
+    tracker.add('tx1')
+    assert tracker.wait_all()
+    assert tracker.confirmed == {'tx1': 1}
+    assert tracker.failed == {}
+    assert len(batch_call.batches) == 3
+
+
+def test_unknown_txid_fails_once_the_timeout_passes():
+    failed = []
+    tracker = ConfirmationTracker(scripted([UNKNOWN]), missing_timeout=0,
+                                  on_failed=lambda txid, reason, label: failed.append((txid, label)))
+    tracker.add('tx1', 'item 1')
+    tracker.poll()
+    assert failed == [('tx1', 'item 1')]
+    assert not tracker.pending
+
+
+def test_seeing_the_txid_again_resets_the_timeout(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr('confirmation_tracker.time.monotonic', lambda: clock[0])
+    tracker = ConfirmationTracker(scripted([UNKNOWN], [({"confirmations": 0}, None)], [UNKNOWN], [UNKNOWN]),
+                                  missing_timeout=10)
+    tracker.add('tx1')
+    for seconds in (0, 8, 16, 20):
+        clock[0] = seconds
+        tracker.poll()
+    assert 'tx1' in tracker.pending  # unknown at 16 and 20 only, not 10 seconds yet
+    assert tracker.failed == {}
+
+
+def test_conflicted_transaction_fails():
+    tracker = ConfirmationTracker(scripted([({"confirmations": -1}, None)]))
+    tracker.add('tx1')
+    tracker.poll()
+    assert tracker.failed == {'tx1': 'conflicted (-1 confirmations)'}
+
+
+def test_connection_error_leaves_everything_pending():
+    def batch_call(calls):
+        raise ConnectionError("node down")
+    tracker = ConfirmationTracker(batch_call)
+    tracker.add('tx1')
+    assert tracker.poll() == {}
+    assert 'tx1' in tracker.pending
+
+
+def test_missing_timeout_defaults_from_the_environment(monkeypatch):
+    monkeypatch.setenv('CONFIRM_MISSING_TIMEOUT', '42')
+    assert ConfirmationTracker(scripted()).missing_timeout == 42
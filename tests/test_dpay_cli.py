@@ -0,0 +1,74 @@
+import json
+import os
+
+import pytest
+
+from dpay_cli import load_config, main
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('DPAY_CONFIG', raising=False)
+
+
+def test_generate_fills_traits_from_a_manifest(tmp_path):
+    (tmp_path / 'template.html').write_text("<p>#{0} {color} {1}</p>")
+    (tmp_path / 'traits.csv').write_text("color\nred\nblue\n")
+    main(['generate', 'template.html', '1', '2', 'stone', '--manifest', 'traits.csv', '--arg', 'wow',
+          '--directory', 'out', '--workers', '1'])
+    assert (tmp_path / 'out' / 'stone00001.html').read_text() == "<p>#1 red wow</p>"
+    assert (tmp_path / 'out' / 'stone00002.html').read_text() == "<p>#2 blue wow</p>"
+
+
+def test_generate_numbers_manifest_rows_from_start(tmp_path):
+    (tmp_path / 'template.html').write_text("{0}:{color}")
+    (tmp_path / 'traits.json').write_text(json.dumps([{"color": "red"}, {"color": "blue"}]))
+    main(['generate', 'template.html', '5', '6', 'stone', '--manifest', 'traits.json', '--workers', '1'])
+    assert (tmp_path / 'stone00005.html').read_text() == "5:red"
+    assert (tmp_path / 'stone00006.html').read_text() == "6:blue"
+
+
+def test_config_file_supplies_arguments_and_env(tmp_path, monkeypatch):
+    monkeypatch.delenv('DPAY_TEST_SETTING', raising=False)  # undone after the test, whatever main sets
+    (tmp_path / 'template.html').write_text("{0}")
+    (tmp_path / 'dpay.toml').write_text('[env]\nDPAY_TEST_SETTING = "set"\n\n'
+                                        '[generate]\ntemplate = "template.html"\nstart = 1\nend = 1\n'
+                                        'file_prefix = "item"\nworkers = 1\n')
+    main(['generate'])
+    assert (tmp_path / 'item00001.html').read_text() == "1"
+    assert os.environ['DPAY_TEST_SETTING'] == 'set'
+
+
+def test_flags_win_over_the_config_file(tmp_path):
+    (tmp_path / 'dpay.json').write_text(json.dumps({"generate": {"file_prefix": "config"}}))
+    (tmp_path / 'template.html').write_text("{0}")
+    main(['generate', 'template.html', '1', '1', 'flag', '--workers', '1'])
+    assert (tmp_path / 'flag00001.html').exists()
+    assert not (tmp_path / 'config00001.html').exists()
+    assert load_config() == {"generate": {"file_prefix": "config"}}
+
+
+def test_missing_arguments_are_reported(capsys):
+    with pytest.raises(SystemExit):
+        main(['generate', 'template.html'])
+    assert "generate needs start, end, file_prefix" in capsys.readouterr().err
+
+
+def test_convert(tmp_path):
+    (tmp_path / 'airDropOutput.jsonl').write_text(json.dumps({"file": "stone00001.html", "txid": "tx1"}) + '\n')
+    main(['convert', '--output', 'dm=dm.json', '--name', 'Stone'])
+    assert json.loads((tmp_path / 'dm.json').read_text()) == [{"inscriptionId": "tx1i0", "name": "Stone #1"}]
+
+
+@pytest.mark.parametrize('setting, enabled', [(None, False), ('0', False), ('1', True), ('w1', True)])
+def test_sharded_mint_reads_mint_workers_like_the_pool(tmp_path, monkeypatch, setting, enabled):
+    import mint_shards
+
+    calls = []
+    monkeypatch.setattr(mint_shards, 'sharded_minting_process', lambda *args, **kwargs: calls.append(kwargs))
+    if setting is not None:
+        monkeypatch.setenv('MINT_WORKERS', setting)
+    (tmp_path / 'airDropList.json').write_text(json.dumps({"airDropList": []}))
+    main(['mint', 'files', 'stone', '--engine', 'sharded', '--wallet', 'w1'])
+    assert calls[0]['use_workers'] is enabled
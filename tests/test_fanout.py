@@ -0,0 +1,99 @@
+import json
+import sys
+
+import pytest
+
+import fanout
+from fanout import FanoutLedger, fan_out, reconcile
+from rpc_client import JsonRpcError
+
+# Stands in for walletsign.js: a deterministic "signature" over the wallet's UTXOs and the request.
+SIGNER = """
+import hashlib, json, sys
+request = json.load(sys.stdin)
+wallet = json.load(open('.wallet.json'))
+txid = hashlib.sha256(json.dumps([wallet['utxos'], request]).encode()).hexdigest()
+print(json.dumps({"txid": txid, "hex": "00" + txid,
+                  "outputs": [{"n": n, "script": "76a9" + address, "satoshis": sats}
+                              for n, (address, sats) in enumerate(request['outputs'])]}))
+"""
+
+
+class Node:
+    def __init__(self, fail_first=False):
+        self.fail_first = fail_first
+        self.sent = []
+
+    def sendrawtransaction(self, raw_hex):
+        if self.fail_first:
+            self.fail_first = False
+            raise ConnectionError("connection dropped")
+        if raw_hex in self.sent:
+            raise JsonRpcError({"code": -27, "message": "transaction already in block chain"})
+        self.sent.append(raw_hex)
+        return raw_hex[2:]
+
+
+def make_wallet(directory, address, sats=0):
+    directory.mkdir()
+    utxos = [{"txid": "ff" * 32, "vout": 0, "script": "", "satoshis": sats}] if sats else []
+    (directory / '.wallet.json').write_text(json.dumps({"address": address, "privkey": "key", "utxos": utxos}))
+    return str(directory)
+
+
+def balance(wallet_dir):
+    with open(f"{wallet_dir}/.wallet.json") as file:
+        return sum(utxo['satoshis'] for utxo in json.load(file)['utxos'])
+
+
+@pytest.fixture
+def campaign(tmp_path, monkeypatch):
+    signer = tmp_path / 'signer.py'
+    signer.write_text(SIGNER)
+    monkeypatch.setattr(fanout, 'SIGNER_COMMAND', [sys.executable, str(signer)])
+    item = tmp_path / 'stone00001.html'
+    item.write_text('<p>wow</p>')
+    source = make_wallet(tmp_path / 'source', 'DSource', 10 ** 12)
+    wallets = [make_wallet(tmp_path / 'w1', 'DW1'), make_wallet(tmp_path / 'w2', 'DW2')]
+    shards = [[(str(item), {})], [(str(item), {})]]
+    return source, wallets, shards, str(tmp_path / 'airDropOutput.fanout.json')
+
+
+def test_fan_out_funds_every_wallet_once(campaign):
+    source, wallets, shards, ledger_path = campaign
+    node = Node()
+    entry = fan_out(source, wallets, shards, ledger_path, rpc=node, fee_per_kb=100_000, wait=False)
+    assert entry['status'] == 'broadcast'
+    assert len(node.sent) == 1
+    assert all(balance(wallet) > 0 for wallet in wallets)
+    assert balance(source) == 10 ** 12 - sum(balance(wallet) for wallet in wallets) - entry['fee_sats']
+
+    assert fan_out(source, wallets, shards, ledger_path, rpc=node, fee_per_kb=100_000, wait=False) is None
+    assert len(node.sent) == 1
+
+
+def test_a_fan_out_interrupted_before_broadcast_is_finished_not_repeated(campaign):
+    source, wallets, shards, ledger_path = campaign
+    with pytest.raises(ConnectionError):
+        fan_out(source, wallets, shards, ledger_path, rpc=Node(fail_first=True), fee_per_kb=100_000, wait=False)
+    [entry] = FanoutLedger(ledger_path).entries
+    assert entry['status'] == 'signed'
+    assert balance(wallets[0]) == 0
+
+    node = Node()
+    assert fan_out(source, wallets, shards, ledger_path, rpc=node, fee_per_kb=100_000, wait=False) is None
+    assert node.sent == [entry['tx']['hex']]
+    assert [entry['status'] for entry in FanoutLedger(ledger_path).entries] == ['broadcast']
+    assert all(balance(wallet) > 0 for wallet in wallets)
+
+
+def test_reconcile_finishes_an_interrupted_fan_out(campaign, tmp_path):
+    source, wallets, shards, ledger_path = campaign
+    with pytest.raises(ConnectionError):
+        fan_out(source, wallets, shards, ledger_path, rpc=Node(fail_first=True), fee_per_kb=100_000, wait=False)
+    node = Node()
+    node.sent.append(FanoutLedger(ledger_path).entries[0]['tx']['hex'])  # the first send did reach the node
+    [entry] = reconcile(ledger_path, str(tmp_path / 'airDropOutput.json'), rpc=node)
+    assert entry['status'] == 'broadcast'
+    assert [item['missing'] for item in entry['reconciled']['wallets']] == [['stone00001.html']] * 2
+    assert all(balance(wallet) > 0 for wallet in wallets)
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from holder_aggregate import JsonListWriter, _Reader, iter_json_items, iter_json_members, parse_source
+
+ITEMS = [{"dogecoin_address": "DAddr1", "count": 12345}, {"nested": [1.5, None, True, "é"]}, 67890, "x"]
+
+
+def dumped(path, data):
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=4)
+    return path.read_bytes()
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 1 << 16])
+def test_items_survive_every_chunk_boundary(tmp_path, chunk_size):
+    path = tmp_path / 'list.json'
+    path.write_text(json.dumps({"other": {"skip": [1, 2]}, "airDropList": ITEMS}, indent=4))
+    assert list(iter_json_items(str(path), chunk_size=chunk_size)) == ITEMS
+    path.write_text(json.dumps(ITEMS))
+    assert list(iter_json_items(str(path), chunk_size=chunk_size)) == ITEMS
+
+
+def test_a_number_split_across_chunks_is_read_whole(tmp_path):
+    path = tmp_path / 'numbers.json'
+    path.write_text('[123456, 7.25e3,\n-42]')
+    with open(path) as file:
+        reader = _Reader(file, 4)  # the first chunk ends inside 123456
+        reader.expect('[')
+        assert reader.value() == 123456
+        reader.expect(',')
+        assert reader.value() == 7.25e3
+    assert list(iter_json_items(str(path), chunk_size=1)) == [123456, 7250.0, -42]
+
+
+def test_members_of_a_ledger_with_chunk_size_one(tmp_path):
+    ledger = {"a.html": {"txid": "t1"}, "b.html": {"txid": "t2", "n": 10}}
+    path = tmp_path / 'ledger.json'
+    path.write_text(json.dumps(ledger, indent=4))
+    assert dict(iter_json_members(str(path), chunk_size=1)) == ledger
+
+
+@pytest.mark.parametrize('key', [None, 'airDropList'])
+@pytest.mark.parametrize('items', [ITEMS, []])
+def test_writer_matches_json_dump(tmp_path, key, items):
+    with JsonListWriter(str(tmp_path / 'written.json'), key) as writer:
+        for item in items:
+            writer.write(item)
+    expected = dumped(tmp_path / 'expected.json', {key: items} if key else items)
+    assert (tmp_path / 'written.json').read_bytes() == expected
+
+
+@pytest.mark.parametrize('key', [None, 'airDropList'])
+@pytest.mark.parametrize('first', [0, 2])
+def test_append_reopens_the_list(tmp_path, key, first):
+    path = str(tmp_path / 'written.json')
+    with JsonListWriter(path, key) as writer:
+        for item in ITEMS[:first]:
+            writer.write(item)
+    with JsonListWriter(path, key, append=True) as writer:
+        for item in ITEMS[first:]:
+            writer.write(item)
+    assert (tmp_path / 'written.json').read_bytes() == dumped(tmp_path / 'expected.json',
+                                                              {key: ITEMS} if key else ITEMS)
+
+
+def test_append_refuses_a_file_it_did_not_write(tmp_path):
+    path = tmp_path / 'other.json'
+    path.write_text('{"a": 1}')
+    with pytest.raises(ValueError):
+        JsonListWriter(str(path), append=True)
+
+
+@pytest.mark.parametrize('spec, expected', [
+    ('cujoNFTholders.json', ('cujoNFTholders.json', 1.0, False)),
+    ('cujoNFTholders.json:2:per-item', ('cujoNFTholders.json', 2.0, True)),
+    ('holders.json:per-item', ('holders.json', 1.0, True)),
+    ('C:\\snapshots\\holders.json', ('C:\\snapshots\\holders.json', 1.0, False)),
+    ('C:\\snapshots\\holders.json:0.5', ('C:\\snapshots\\holders.json', 0.5, False)),
+    ('C:\\snapshots\\holders.json:3:per-item', ('C:\\snapshots\\holders.json', 3.0, True)),
+    ('D:holders.json', ('D:holders.json', 1.0, False)),
+])
+def test_parse_source(spec, expected):
+    assert parse_source(spec) == expected
@@ -0,0 +1,43 @@
+import pytest
+
+from holder_fetcher import HolderFetcher, HolderFixtureServer, extract_holders
+
+HOLDERS = [{"address": f"DHolder{n:04d}", "balance": str(n)} for n in range(250)]
+
+
+def fetcher(server, tmp_path, **kwargs):
+    kwargs.setdefault('rate', 0)
+    return HolderFetcher(server.url_template, page_size=100, cache_dir=str(tmp_path / 'cache'), **kwargs)
+
+
+@pytest.mark.parametrize('report_total', [True, False])
+def test_every_holder_in_order(tmp_path, report_total):
+    with HolderFixtureServer(HOLDERS, delay=0, report_total=report_total) as server:
+        holders = fetcher(server, tmp_path).fetch_holders('dpay')
+    assert holders == HOLDERS
+
+
+def test_cached_pages_are_not_fetched_again(tmp_path):
+    with HolderFixtureServer(HOLDERS, delay=0) as server:
+        fetcher(server, tmp_path).fetch_holders('dpay')
+        requests = server.requests
+        again = fetcher(server, tmp_path, max_age=None)
+        assert again.fetch_holders('dpay') == HOLDERS
+        assert server.requests == requests
+        assert again.stats()['cache_hits'] == 3
+
+        again.fetch_holders('dpay', refresh=True)
+        assert server.requests == requests + 3
+
+
+def test_a_holder_repeated_across_pages_is_listed_once(tmp_path):
+    shifted = HOLDERS[:100] + HOLDERS[99:199]  # the list moved while it was being paged
+    with HolderFixtureServer(shifted, delay=0) as server:
+        holders = fetcher(server, tmp_path).fetch_holders('dpay')
+    assert [holder["address"] for holder in holders] == [holder["address"] for holder in HOLDERS[:199]]
+
+
+def test_extract_holders_accepts_the_usual_envelopes():
+    assert extract_holders(["DA", "DB"]) == [{"address": "DA"}, {"address": "DB"}]
+    assert extract_holders({"data": [{"holder": "DA", "amount": 5}, {"other": 1}]}) == [{"address": "DA", "balance": 5}]
+    assert extract_holders({"unexpected": 1}) == []
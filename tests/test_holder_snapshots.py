@@ -0,0 +1,58 @@
+import json
+
+from holder_fetcher import HolderFetcher, HolderFixtureServer
+from holder_snapshots import SnapshotStore, delta_airdrop, diff_holders, load_holder_file, scrape_snapshot
+
+
+def test_diff_holders():
+    added, removed, changed = diff_holders({'DA': '1', 'DB': '2', 'DC': None}, {'DD': '1', 'DA': '1', 'DB': '5'})
+    assert added == ['DD']
+    assert removed == ['DC']
+    assert changed == [('DB', '2', '5')]
+
+
+def test_delta_airdrop_adds_increased_balances_only():
+    airdrop = delta_airdrop(['DN'], [('DU', '1', '3'), ('DD', '3', '1')])
+    assert [row['dogecoin_address'] for row in airdrop['airDropList']] == ['DN', 'DU']
+
+
+def test_versions_and_diff(tmp_path):
+    store = SnapshotStore('dpay', str(tmp_path))
+    assert store.record({'DA': 1, 'DB': 2}) == (1, True)
+    assert store.record([('DA', 1), ('DC', 3)]) == (2, True)
+    assert store.diff() == (['DC'], ['DB'], [])
+    assert store.diff(None, 1) == (['DA', 'DB'], [], [])
+
+    reopened = SnapshotStore('dpay', str(tmp_path))
+    assert reopened.versions() == [1, 2]
+    assert reopened.load(1) == {'DA': '1', 'DB': '2'}
+
+
+def test_recording_the_latest_snapshot_again_creates_nothing(tmp_path):
+    store = SnapshotStore('dpay', str(tmp_path))
+    store.record({'DA': 1})
+    store.record({'DA': 1, 'DB': 2})
+    assert store.record({'DA': '1', 'DB': '2'}) == (2, False)
+    assert store.versions() == [1, 2]
+    assert store.diff() == (['DB'], [], [])  # still v1 -> v2, not an empty v2 -> v2
+
+
+def test_scrape_stops_once_pages_match_the_latest_snapshot(tmp_path):
+    holders = [{"address": f"DHolder{n:04d}", "balance": str(1000 - n)} for n in range(500)]
+    store = SnapshotStore('dpay', str(tmp_path / 'snapshots'))
+    with HolderFixtureServer(holders, delay=0) as server:
+        fetcher = HolderFetcher(server.url_template, page_size=50, concurrency=1, rate=0,
+                                cache_dir=str(tmp_path / 'cache'))
+        assert scrape_snapshot(fetcher, store) == (1, True, 10, False)
+
+        holders.insert(0, {"address": "DNewcomer", "balance": "5000"})
+        version, created, pages, stopped = scrape_snapshot(fetcher, store)
+    assert (version, created, stopped) == (2, True, True)
+    assert pages < 10
+    assert store.diff() == (['DNewcomer'], [], [])
+
+
+def test_load_holder_file_counts_marketplace_rows(tmp_path):
+    path = tmp_path / 'holders.json'
+    path.write_text(json.dumps([{"seller_address": "DA"}, {"seller_address": "DB"}, {"seller_address": "DA"}]))
+    assert load_holder_file(str(path)) == {'DA': '2', 'DB': '1'}
@@ -0,0 +1,62 @@
+import os
+
+from html_collection import HASH_INDEX_NAME, build_collection, item_file_name
+
+TEMPLATE = "<title>#{0} {color}</title>\n<p>{1}</p>\n"
+MANIFEST = {number: {'color': 'red' if number % 2 else 'blue'} for number in range(1, 8)}
+
+
+def build(directory, template=TEMPLATE, manifest=MANIFEST, **kwargs):
+    return build_collection(template, 1, 7, 'dpaystone', directory=str(directory), args=('one',), manifest=manifest,
+                            chunk_size=3, newline='\n', **kwargs)
+
+
+def read_files(directory):
+    return {name: (directory / name).read_bytes() for name in sorted(os.listdir(directory))}
+
+
+def test_unchanged_items_are_not_rewritten(tmp_path):
+    assert build(tmp_path, workers=1)['written'] == 7
+    path = tmp_path / item_file_name(3, 'dpaystone', 'html')
+    os.utime(path, (0, 0))
+
+    stats = build(tmp_path, workers=1)
+    assert (stats['written'], stats['unchanged']) == (0, 7)
+    assert path.stat().st_mtime == 0
+    assert path.read_text() == "<title>#3 red</title>\n<p>one</p>\n"
+
+
+def test_a_manifest_edit_rewrites_only_that_item(tmp_path):
+    build(tmp_path, workers=1)
+    manifest = {**MANIFEST, 4: {'color': 'green'}}
+
+    stats = build(tmp_path, manifest=manifest, workers=1)
+    assert (stats['written'], stats['unchanged']) == (1, 6)
+    assert (tmp_path / item_file_name(4, 'dpaystone', 'html')).read_text().startswith("<title>#4 green</title>")
+
+
+def test_a_template_edit_rewrites_every_item(tmp_path):
+    build(tmp_path, workers=1)
+
+    stats = build(tmp_path, template=TEMPLATE.replace('<p>', '<p class="x">'), workers=1)
+    assert (stats['written'], stats['unchanged']) == (7, 0)
+    assert '<p class="x">one</p>' in (tmp_path / item_file_name(7, 'dpaystone', 'html')).read_text()
+
+
+def test_a_file_changed_on_disk_is_rewritten_when_missing_from_the_index(tmp_path):
+    build(tmp_path, workers=1)
+    (tmp_path / HASH_INDEX_NAME).unlink()
+    (tmp_path / item_file_name(2, 'dpaystone', 'html')).write_text("edited by hand")
+
+    stats = build(tmp_path, workers=1)
+    assert (stats['written'], stats['unchanged']) == (1, 6)
+
+
+def test_the_process_pool_writes_what_a_serial_run_writes(tmp_path):
+    serial, pooled = tmp_path / 'serial', tmp_path / 'pooled'
+    serial_stats = build(serial, workers=1)
+    pooled_stats = build(pooled, workers=2)
+
+    assert read_files(pooled) == read_files(serial)
+    assert pooled_stats['sizes'] == serial_stats['sizes']
+    assert pooled_stats['written'] == serial_stats['written'] == 7
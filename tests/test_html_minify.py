@@ -0,0 +1,29 @@
+from html_minify import minify_css, minify_html, minify_js, minify_template
+
+
+def test_whitespace_between_tags_becomes_one_space():
+    html = "<p>\n    <b>much</b>\n    <i>wow</i>\n</p>"
+    assert minify_html(html) == "<p> <b>much</b> <i>wow</i> </p>"
+
+
+def test_pre_and_comments():
+    html = "<div>  <!-- note -->\n<pre>  keep\n   this </pre></div>"
+    assert minify_html(html) == "<div> <pre>  keep\n   this </pre></div>"
+
+
+def test_css():
+    assert minify_css("a , b {\n  color: red ;\n  /* c */ margin: 0 auto;\n}\n") == "a,b{color:red;margin:0 auto}"
+    assert minify_css("a :hover { x: 1 }") == "a :hover{x:1}"  # not a:hover
+    assert minify_css('p::before { content: "  a ; b  "; }') == 'p::before{content:"  a ; b  "}'
+
+
+def test_js_keeps_strings_regexes_and_line_breaks_that_end_statements():
+    js = "// comment\nvar a = 'x  y'\nvar re = / +/g;\nif (a) {\n    a = a + +1\n}\n"
+    assert minify_js(js) == "var a='x  y'\nvar re=/ +/g;if(a){a=a+ +1}"
+
+
+def test_template_fields_survive():
+    template = "<style>\n  body {{ margin: 0; }}\n</style>\n<p>  #{0} {name}  </p>"
+    minified = minify_template(template)
+    assert minified == "<style>body{{margin:0}}</style> <p> #{0} {name} </p>"
+    assert minified.format(7, name="Stone") == "<style>body{margin:0}</style> <p> #7 Stone </p>"
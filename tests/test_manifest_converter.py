@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+from manifest_converter import convert
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # .manifest_state.json is kept in the working directory
+
+
+def write_journal(path, numbers, mode='w'):
+    with open(path, mode) as file:
+        for number in numbers:
+            file.write(json.dumps({"file": f"dpaystone{number:05}.html", "txid": f"tx{number}", "address": "DA"}) + '\n')
+
+
+def load(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def test_one_pass_writes_every_format(tmp_path):
+    (tmp_path / 'NerdStone.json').write_text(json.dumps({"stone00002.png": "tx2", "parent.html": "tx0",
+                                                         "stone00001.png": {"txid": "tx1"}}))
+    count = convert('NerdStone.json', [('ow', 'ow.json'), ('dl', 'dl.json'), ('dm', 'dm.json')],
+                    name="Stone", symbol="stones", image_uri="https://example.com/c.png")
+    assert count == 2
+    assert load('ow.json') == [{"id": "tx2i0", "meta": {"name": "Stone #2"}},
+                               {"id": "tx1i0", "meta": {"name": "Stone #1"}}]
+    assert load('dl.json') == {"body": [
+        {"inscriptionId": "tx2i0", "name": "Stone #2", "imageURI": "https://example.com/c.png", "collectionSymbol": "stones"},
+        {"inscriptionId": "tx1i0", "name": "Stone #1", "imageURI": "https://example.com/c.png", "collectionSymbol": "stones"}]}
+    assert load('dm.json') == [{"inscriptionId": "tx2i0", "name": "Stone #2"},
+                               {"inscriptionId": "tx1i0", "name": "Stone #1"}]
+
+
+def test_an_ow_manifest_converts_to_the_others():
+    with open('ow.json', 'w') as file:
+        json.dump([{"id": "tx1i0", "meta": {"name": "Stone #1"}}], file)
+    convert('ow.json', [('dm', 'dm.json')])
+    assert load('dm.json') == [{"inscriptionId": "tx1i0", "name": "Stone #1"}]
+
+
+def test_journal_runs_append_only_the_new_mints():
+    write_journal('airDropOutput.jsonl', [1, 2])
+    assert convert('airDropOutput.json', [('ow', 'ow.json')]) == 2
+    write_journal('airDropOutput.jsonl', [3], mode='a')
+    assert convert('airDropOutput.json', [('ow', 'ow.json')]) == 1
+    assert [item["id"] for item in load('ow.json')] == ["tx1i0", "tx2i0", "tx3i0"]
+
+
+def test_an_edited_manifest_is_rewritten_from_the_start():
+    write_journal('airDropOutput.jsonl', [1, 2])
+    convert('airDropOutput.json', [('ow', 'ow.json')])
+    with open('ow.json', 'w') as file:
+        json.dump([], file)
+    assert convert('airDropOutput.json', [('ow', 'ow.json')]) == 2
+
+
+def test_a_missing_source_leaves_the_manifests_alone():
+    with open('ow.json', 'w') as file:
+        json.dump([{"id": "kept"}], file)
+    with pytest.raises(FileNotFoundError):
+        convert('NerdStone.json', [('ow', 'ow.json')])
+    assert load('ow.json') == [{"id": "kept"}]
+
+
+@pytest.mark.parametrize('source', ['{"stone00001.png": "tx1", "stone', 'not json'])
+def test_a_broken_source_leaves_the_manifests_alone(tmp_path, source):
+    (tmp_path / 'NerdStone.json').write_text(source)
+    with open('ow.json', 'w') as file:
+        json.dump([{"id": "kept"}], file)
+    with pytest.raises(ValueError):
+        convert('NerdStone.json', [('ow', 'ow.json')])
+    assert load('ow.json') == [{"id": "kept"}]
+    assert not (tmp_path / 'ow.json.tmp').exists()
+
+
+def test_unknown_format_is_refused_before_anything_is_written(tmp_path):
+    write_journal('airDropOutput.jsonl', [1])
+    with pytest.raises(ValueError):
+        convert('airDropOutput.json', [('ow', 'ow.json'), ('xx', 'xx.json')])
+    assert not (tmp_path / 'ow.json').exists()
+
+
+def test_unreadable_journal_lines_are_skipped():
+    write_journal('airDropOutput.jsonl', [1])
+    with open('airDropOutput.jsonl', 'a') as file:
+        file.write('{"file": "dpaystone00002.ht\x00\n')
+    write_journal('airDropOutput.jsonl', [3], mode='a')
+    assert convert('airDropOutput.json', [('ow', 'ow.json')]) == 2
+    assert [item["id"] for item in load('ow.json')] == ["tx1i0", "tx3i0"]
+
+
+def test_a_remint_is_listed_once_with_its_latest_txid():
+    write_journal('airDropOutput.jsonl', [1, 2])
+    with open('airDropOutput.jsonl', 'a') as file:
+        file.write(json.dumps({"file": "dpaystone00001.html", "txid": "again", "address": "DA"}) + '\n')
+    convert('airDropOutput.json', [('ow', 'ow.json')])
+    assert [item["id"] for item in load('ow.json')] == ["againi0", "tx2i0"]
+
+
+def test_a_remint_after_the_last_run_rebuilds_the_manifest():
+    write_journal('airDropOutput.jsonl', [1, 2])
+    convert('airDropOutput.json', [('ow', 'ow.json')])
+    with open('airDropOutput.jsonl', 'a') as file:
+        file.write(json.dumps({"file": "dpaystone00002.html", "txid": "again", "address": "DA"}) + '\n')
+    write_journal('airDropOutput.jsonl', [3], mode='a')
+    assert convert('airDropOutput.json', [('ow', 'ow.json')]) == 3
+    assert [item["id"] for item in load('ow.json')] == ["tx1i0", "againi0", "tx3i0"]
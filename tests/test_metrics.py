@@ -0,0 +1,83 @@
+import json
+import urllib.request
+
+from metrics import BUCKETS, Metrics
+
+
+def samples(text):
+    """{sample name with labels: value} from an exposition, checking each line's shape."""
+    result = {}
+    for line in text.splitlines():
+        if line.startswith('#'):
+            continue
+        name, value = line.rsplit(' ', 1)
+        result[name] = float(value)
+    return result
+
+
+def test_counter_exposition():
+    metrics = Metrics()
+    metrics.inc('retries_total', error_class='chain_full')
+    metrics.inc('retries_total', 2, error_class='chain_full')
+    metrics.inc('retries_total', error_class='rpc')
+    text = metrics.render_prometheus()
+
+    assert text.splitlines() == [
+        '# HELP dpay_retries_total Retried operations by error class',
+        '# TYPE dpay_retries_total counter',
+        'dpay_retries_total{error_class="chain_full"} 3',
+        'dpay_retries_total{error_class="rpc"} 1',
+    ]
+    assert text.endswith('\n')
+
+
+def test_histogram_exposition():
+    metrics = Metrics()
+    for seconds in (0.003, 0.02, 0.02, 7, 5000):
+        metrics.observe('rpc_call_seconds', seconds, method='getblockcount')
+    metrics.observe('rpc_call_seconds', 0.1, method='gettransaction')
+    text = metrics.render_prometheus()
+    lines = text.splitlines()
+
+    assert lines[:2] == ['# HELP dpay_rpc_call_seconds Node JSON-RPC latency per method',
+                         '# TYPE dpay_rpc_call_seconds histogram']
+    assert sum(line.startswith('# TYPE') for line in lines) == 1
+    values = samples(text)
+    buckets = [values[f'dpay_rpc_call_seconds_bucket{{method="getblockcount",le="{bound}"}}'] for bound in BUCKETS]
+    assert buckets == sorted(buckets)  # cumulative
+    assert values['dpay_rpc_call_seconds_bucket{method="getblockcount",le="0.005"}'] == 1
+    assert values['dpay_rpc_call_seconds_bucket{method="getblockcount",le="0.025"}'] == 3
+    assert values['dpay_rpc_call_seconds_bucket{method="getblockcount",le="10"}'] == 4
+    assert values['dpay_rpc_call_seconds_bucket{method="getblockcount",le="3600"}'] == 4
+    assert values['dpay_rpc_call_seconds_bucket{method="getblockcount",le="+Inf"}'] == 5
+    assert values['dpay_rpc_call_seconds_count{method="getblockcount"}'] == 5
+    assert values['dpay_rpc_call_seconds_sum{method="getblockcount"}'] == 0.003 + 0.02 + 0.02 + 7 + 5000
+    assert values['dpay_rpc_call_seconds_count{method="gettransaction"}'] == 1
+
+
+def test_label_values_are_escaped():
+    metrics = Metrics()
+    metrics.inc('mint_failures_total', reason='bad "fee"\\n\nretry')
+    assert metrics.render_prometheus().splitlines()[-1] == (
+        'dpay_mint_failures_total{reason="bad \\"fee\\"\\\\n\\nretry"} 1')
+
+
+def test_textfile_and_http_endpoint(tmp_path):
+    metrics = Metrics(trace_path=str(tmp_path / 'trace.jsonl'))
+    metrics.observe('ledger_write_seconds', 0.002)
+    path = str(tmp_path / 'dpay.prom')
+    metrics.write_textfile(path)
+    with open(path) as file:
+        assert file.read() == metrics.render_prometheus()
+
+    server = metrics.serve(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.headers['Content-Type'] == 'text/plain; version=0.0.4'
+            assert response.read().decode() == metrics.render_prometheus()
+    finally:
+        server.shutdown()
+        server.server_close()
+    with open(tmp_path / 'trace.jsonl') as file:
+        assert json.loads(file.readline())['metric'] == 'ledger_write_seconds'
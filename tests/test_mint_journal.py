@@ -0,0 +1,90 @@
+import json
+
+from mint_journal import MintJournal
+
+
+def read_lines(path):
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def test_records_survive_reopening(tmp_path):
+    output = str(tmp_path / 'airDropOutput.json')
+    journal = MintJournal(output)
+    journal.record('files/dpaystone00001.html', 'tx1', 'DAddr1')
+    journal.record('files/dpaystone00002.html', 'tx2', 'DAddr2', number=2)
+    journal.close()
+
+    reopened = MintJournal(output)
+    assert len(reopened) == 2
+    assert 'dpaystone00002.html' in reopened
+    assert reopened.by_file['dpaystone00002.html'] == {'txid': 'tx2', 'address': 'DAddr2', 'number': 2}
+    assert reopened.files_for_address('DAddr1') == ['dpaystone00001.html']
+    reopened.close()
+
+
+def test_a_later_record_replaces_the_earlier_one(tmp_path):
+    journal = MintJournal(str(tmp_path / 'airDropOutput.json'))
+    journal.record('dpaystone00001.html', 'tx1', 'DAddr1')
+    journal.record('dpaystone00001.html', 'tx1b', 'DAddr2')
+    assert journal.by_file['dpaystone00001.html']['txid'] == 'tx1b'
+    assert journal.files_for_address('DAddr1') == []
+    assert journal.files_for_address('DAddr2') == ['dpaystone00001.html']
+    journal.close()
+
+
+def test_torn_last_line_is_moved_aside(tmp_path):
+    output = str(tmp_path / 'airDropOutput.json')
+    journal_path = tmp_path / 'airDropOutput.jsonl'
+    journal_path.write_text(json.dumps({'file': 'a.html', 'txid': 'tx1', 'address': 'D1'}) + '\n{"file": "b.ht')
+
+    journal = MintJournal(output)
+    assert list(journal.by_file) == ['a.html']
+    journal.record('c.html', 'tx3', 'D3')
+    journal.close()
+
+    assert [record['file'] for record in read_lines(journal_path)] == ['a.html', 'c.html']
+    assert (tmp_path / 'airDropOutput.jsonl.corrupt').read_text() == '{"file": "b.ht\n'
+    assert [record['file'] for record in read_lines(journal_path)] == list(MintJournal(output).by_file)
+
+
+def test_unreadable_lines_from_older_runs_are_moved_aside(tmp_path):
+    journal_path = tmp_path / 'airDropOutput.jsonl'
+    journal_path.write_bytes(b'{"file": "a.html", "txid": "tx1"}\n{"file": "b\xff\n{"file": "c.html", "txid": "tx3"}\n')
+    journal = MintJournal(str(tmp_path / 'airDropOutput.json'))
+    journal.close()
+    assert list(journal.by_file) == ['a.html', 'c.html']
+    assert [record['file'] for record in read_lines(journal_path)] == ['a.html', 'c.html']
+
+
+def test_a_record_missing_only_its_newline_is_kept(tmp_path):
+    journal_path = tmp_path / 'airDropOutput.jsonl'
+    journal_path.write_text(json.dumps({'file': 'a.html', 'txid': 'tx1', 'address': 'D1'}))
+    journal = MintJournal(str(tmp_path / 'airDropOutput.json'))
+    journal.record('b.html', 'tx2', 'D2')
+    journal.close()
+    assert [record['file'] for record in read_lines(journal_path)] == ['a.html', 'b.html']
+    assert not (tmp_path / 'airDropOutput.jsonl.corrupt').exists()
+
+
+def test_existing_output_file_seeds_a_new_journal(tmp_path):
+    output = tmp_path / 'airDropOutput.json'
+    output.write_text(json.dumps({'a.html': {'txid': 'tx1', 'address': 'D1'},
+                                  'b.html': {'txid': 'tx2', 'address': 'D2'}}))
+    journal = MintJournal(str(output))
+    assert len(journal) == 2
+    journal.close()
+    assert [record['file'] for record in read_lines(tmp_path / 'airDropOutput.jsonl')] == ['a.html', 'b.html']
+
+
+def test_compact_writes_the_output_layout(tmp_path):
+    output = tmp_path / 'airDropOutput.json'
+    journal = MintJournal(str(output))
+    journal.record('a.html', 'tx1', 'D1')
+    journal.record('b.html', 'tx2', 'D2')
+    journal.record('a.html', 'tx1b', 'D1')
+    journal.compact()
+    journal.close()
+    assert json.loads(output.read_text()) == {'a.html': {'txid': 'tx1b', 'address': 'D1'},
+                                              'b.html': {'txid': 'tx2', 'address': 'D2'}}
+    assert not (tmp_path / 'airDropOutput.json.tmp').exists()
@@ -0,0 +1,111 @@
+import asyncio
+import subprocess
+
+import pytest
+
+from mint_retry import DeadLetterQueue, RetryEngine, RetryPolicy, classify
+
+MINTED = "inscription txid: abc123\n"
+
+
+@pytest.mark.parametrize('output, error_class', [
+    ("64: too-long-mempool-chain, too many unconfirmed ancestors [limit: 25]", 'chain_limit'),
+    ("pending-txs.json exists, run wallet sync", 'pending_txs'),
+    ("found pending-txs.json. rebroadcasting...", 'pending_txs'),
+    ("Error: not enough funds", 'insufficient_funds'),
+    ("66: min relay fee not met", 'fee_too_low'),
+    ("Error: connect ECONNREFUSED 127.0.0.1:22555", 'rpc_unreachable'),
+    ("Request failed with status code 503", 'rpc_unreachable'),
+    ("ENOENT: no such file or directory, open 'x.html'", 'missing_file'),
+    ("something new", 'unknown'),
+])
+def test_classify(output, error_class):
+    assert classify(output) == error_class
+
+
+class Scheduler:
+    def __init__(self):
+        self.waits = []
+
+    def chain_full(self):
+        self.waits.append('chain_full')
+
+    def wait_for_block(self):
+        self.waits.append('block')
+
+
+def commands(*outputs):
+    """run_command answering each doginals command with the next output; the args are kept."""
+    replies = iter(outputs)
+    runs = []
+
+    def run_command(args):
+        runs.append(args)
+        return subprocess.CompletedProcess(args, 0, next(replies), '')
+    run_command.runs = runs
+    return run_command
+
+
+@pytest.fixture
+def engine(tmp_path):
+    fast = {'rpc_unreachable': RetryPolicy('backoff', max_retries=2, base_delay=0, max_delay=0)}
+    return RetryEngine(fast, DeadLetterQueue(str(tmp_path / 'dead_letters.jsonl')))
+
+
+def test_chain_limit_waits_for_room_then_syncs(engine):
+    scheduler = Scheduler()
+    run_command = commands("too-long-mempool-chain", MINTED)
+    result = engine.run(scheduler, 'DA', 'a.html', run_command)
+    assert result.txid == 'abc123'
+    assert result.attempts == 2
+    assert scheduler.waits == ['chain_full']
+    assert run_command.runs == [['mint', 'DA', 'a.html'], ['wallet', 'sync']]
+
+
+def test_backoff_gives_up_after_max_retries(engine):
+    run_command = commands(*["ECONNRESET"] * 3)
+    result = engine.run(Scheduler(), 'DA', 'a.html', run_command)
+    assert result.txid is None
+    assert (result.error_class, result.attempts) == ('rpc_unreachable', 3)
+    assert [entry['image_path'] for entry in engine.dead_letters.entries()] == ['a.html']
+
+
+def test_an_empty_wallet_halts_the_rest_without_running_them(engine):
+    run_command = commands("not enough funds")
+    assert engine.run(Scheduler(), 'DA', 'a.html', run_command).error_class == 'insufficient_funds'
+    skipped = engine.run(Scheduler(), 'DB', 'b.html', run_command)
+    assert (skipped.error_class, skipped.attempts) == ('insufficient_funds', 0)
+    assert len(run_command.runs) == 1
+    assert sorted(entry['image_path'] for entry in engine.dead_letters.entries()) == ['a.html', 'b.html']
+
+
+def test_run_async_retries_the_same_way(engine):
+    scheduler = Scheduler()
+    sync_command = commands("66: min relay fee not met", MINTED)
+
+    async def run_command(args):
+        return sync_command(args)
+    result = asyncio.run(engine.run_async(scheduler, 'DA', 'a.html', run_command))
+    assert result.txid == 'abc123'
+    assert scheduler.waits == ['block']
+    assert sync_command.runs == [['mint', 'DA', 'a.html']] * 2
+
+
+def test_dead_letters_keep_the_latest_failure_per_item(tmp_path):
+    queue = DeadLetterQueue(str(tmp_path / 'dead_letters.jsonl'))
+    queue.add('a.html', 'DA', 'unknown', 'first', 1)
+    queue.add('b.html', 'DB', 'unknown', 'other', 1)
+    queue.add('a.html', 'DA', 'fee_too_low', 'second', 3)
+    assert [(entry['image_path'], entry['error_class']) for entry in queue.entries()] == [
+        ('a.html', 'fee_too_low'), ('b.html', 'unknown')]
+    queue.remove(['a.html'])
+    assert [entry['image_path'] for entry in queue.entries()] == ['b.html']
+
+
+def test_a_rebroadcast_of_pending_txs_is_synced_not_minted_again(engine):
+    scheduler = Scheduler()
+    run_command = commands("found pending-txs.json. rebroadcasting...\n", MINTED)
+    result = engine.run(scheduler, 'DA', 'a.html', run_command)
+    assert run_command.runs == [['mint', 'DA', 'a.html'], ['wallet', 'sync']]
+    assert scheduler.waits == ['block']
+    assert result.txid == 'abc123'
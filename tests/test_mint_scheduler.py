@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+from block_events import BlockEvents
+from mint_scheduler import MintScheduler
+from mint_simulator import SimulatedNode
+from rpc_client import RpcClient
+
+
+@pytest.fixture
+def node():
+    node = SimulatedNode(block_interval=3600).start()  # blocks only when the test mines one
+    yield node
+    node.stop()
+
+
+@pytest.fixture
+def events():
+    return BlockEvents()
+
+
+def mine(node, events):
+    node.mine_block()
+    events._new_block(node.best_hash)
+
+
+def mint(node, scheduler, txs=2):
+    txid = node.broadcast('wallet', None, txs)['inscription']
+    scheduler.record_mint(txid)
+    return txid
+
+
+def in_thread(target):
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_record_mint_reads_the_ancestor_count(node, events):
+    scheduler = MintScheduler(RpcClient(node.url), chain_limit=25, block_events=events)
+    mint(node, scheduler)
+    assert (scheduler.depth, scheduler.txs_per_mint) == (2, 2)
+    mint(node, scheduler)
+    assert (scheduler.depth, scheduler.txs_per_mint) == (4, 2)
+
+
+def test_minting_stops_at_capacity_and_resumes_after_a_block(node, events):
+    scheduler = MintScheduler(RpcClient(node.url), chain_limit=5, block_events=events)
+    mint(node, scheduler)
+    assert scheduler.has_capacity()
+    mint(node, scheduler)
+    assert not scheduler.has_capacity()  # 4 deep, a mint adds 2, the limit is 5
+
+    waiting = in_thread(scheduler.wait_for_capacity)
+    waiting.join(0.2)
+    assert waiting.is_alive()
+    mine(node, events)
+    waiting.join(5)
+    assert not waiting.is_alive()
+    assert scheduler.depth == 0
+
+
+def test_chain_full_blocks_until_a_block_arrives(node, events):
+    scheduler = MintScheduler(RpcClient(node.url), chain_limit=25, block_events=events)
+    waiting = in_thread(scheduler.chain_full)  # no tip yet: the chain's depth is unknown
+    waiting.join(0.2)
+    assert waiting.is_alive()
+    mine(node, events)
+    waiting.join(5)
+    assert not waiting.is_alive()
+
+
+def test_chain_full_learns_that_a_mint_needs_more_room(node, events):
+    scheduler = MintScheduler(RpcClient(node.url), chain_limit=10, block_events=events)
+    mint(node, scheduler)
+    node.broadcast('wallet', None, 4)  # a larger file, not recorded: the node rejected part of it
+    waiting = in_thread(scheduler.chain_full)
+    waiting.join(0.2)
+    assert waiting.is_alive()
+    assert scheduler.txs_per_mint == 10 - 2 + 1
+    mine(node, events)
+    waiting.join(5)
+    assert not waiting.is_alive()
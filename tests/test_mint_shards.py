@@ -0,0 +1,85 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from mint_journal import open_journal
+from mint_shards import merge_shard_journals, plan_shards, shard_output_file
+from mint_simulator import _RUNNER, REPO_DIR, SimulatedNode, make_campaign
+
+SHARDED = ("import mint_shards as d, json; "
+           "d.sharded_minting_process(wallet_dirs, files, prefix, 'html', "
+           "json.load(open('airDropList.json'))['airDropList'])")
+
+
+def file_name(number):
+    return f"dpaystone{number:05}.html"
+
+
+def journal_lines(path):
+    with open(os.path.splitext(path)[0] + '.jsonl') as file:
+        return [json.loads(line) for line in file]
+
+
+def test_plan_shards_deals_items_round_robin_by_file_number():
+    details = [{'dogecoin_address': f"D{number}"} for number in range(1, 6)]
+    shards = plan_shards(details, 2, 'files', 'dpaystone', 'html', {file_name(3)})
+    assert [[(os.path.basename(path), item['dogecoin_address']) for path, item in jobs] for jobs in shards] == [
+        [(file_name(1), 'D1'), (file_name(5), 'D5')],
+        [(file_name(2), 'D2'), (file_name(4), 'D4')],
+    ]
+
+
+def test_shard_output_file():
+    assert shard_output_file('out/airDropOutput.json', 1) == 'out/airDropOutput.wallet2.json'
+
+
+def test_merge_writes_every_file_once(tmp_path):
+    output = str(tmp_path / 'airDropOutput.json')
+    open_journal(output).record(file_name(1), 'tx1', 'D1')  # merged by an earlier run
+    first, second = (open_journal(shard_output_file(output, i)) for i in range(2))
+    first.record(file_name(1), 'tx1', 'D1')
+    first.record(file_name(3), 'tx3', 'D3')
+    second.record(file_name(2), 'tx2', 'D2')
+
+    merge_shard_journals(output, 2)
+    merge_shard_journals(output, 2)  # a second merge appends nothing
+
+    assert [line['file'] for line in journal_lines(output)] == [file_name(1), file_name(2), file_name(3)]
+    with open(output) as file:
+        assert json.load(file) == {file_name(n): {'txid': f"tx{n}", 'address': f"D{n}"} for n in (1, 2, 3)}
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="the simulated doginals CLI needs node")
+def test_a_partly_done_shard_resumes_without_minting_twice(tmp_path):
+    node = SimulatedNode(block_interval=0.2).start()
+    try:
+        root = str(tmp_path)
+        files, wallet_dirs = make_campaign(root, 6, 2, 200)
+        # As if the first run had stopped after wallet1 minted items 1 and 3.
+        with open(tmp_path / 'airDropOutput.wallet1.jsonl', 'w') as file:
+            for number in (1, 3):
+                file.write(json.dumps({'file': file_name(number), 'txid': f"earlier{number}", 'address': 'D'}) + '\n')
+
+        env = dict(os.environ, RPC_USER='sim', RPC_PASSWORD='sim', RPC_HOST='127.0.0.1',
+                   RPC_PORT=str(node.server.server_address[1]), SIM_NODE_URL=node.url, SIM_MINT_LATENCY_MS='1',
+                   MEMPOOL_CHAIN_LIMIT='25', BLOCK_POLL_INTERVAL='0.2')
+        script = _RUNNER.format(repo=REPO_DIR, files=files, prefix='dpaystone', items=6, wallet_dirs=wallet_dirs,
+                                driver=SHARDED)
+        process = subprocess.run([sys.executable, '-c', script], cwd=root, env=env, capture_output=True, text=True,
+                                 timeout=120)
+        assert process.returncode == 0, process.stdout[-2000:] + process.stderr[-2000:]
+
+        assert len(node.inscriptions) == 4
+        merged = journal_lines(str(tmp_path / 'airDropOutput.json'))
+        assert sorted(line['file'] for line in merged) == [file_name(n) for n in range(1, 7)]
+        assert {line['file']: line['txid'] for line in merged}[file_name(3)] == 'earlier3'
+        assert [line['file'] for line in journal_lines(str(tmp_path / 'airDropOutput.wallet1.json'))] == [
+            file_name(n) for n in (1, 3, 5)]
+        assert [line['file'] for line in journal_lines(str(tmp_path / 'airDropOutput.wallet2.json'))] == [
+            file_name(n) for n in (2, 4, 6)]
+    finally:
+        node.stop()
@@ -0,0 +1,97 @@
+import json
+
+from inscription_cost import INSCRIPTION_OUTPUT_SATS, SATS_PER_DOGE
+from mint_verifier import VerifiedCache, iter_ledger, print_report, verify_ledger
+
+INSCRIPTION_VALUE = INSCRIPTION_OUTPUT_SATS / SATS_PER_DOGE
+
+
+def tx(address, confirmations=3, value=INSCRIPTION_VALUE, script_type='pubkeyhash'):
+    return {"confirmations": confirmations,
+            "vout": [{"value": value, "scriptPubKey": {"address": address, "type": script_type}}]}
+
+
+class FakeNode:
+    """Answers getrawtransaction from `raw`, the wallet's gettransaction from `wallet` (hex decoded from `raw_hex`)."""
+
+    def __init__(self, raw=None, wallet=None, raw_hex=None):
+        self.raw = raw or {}
+        self.wallet = wallet or {}
+        self.raw_hex = raw_hex or {}
+        self.batches = []
+
+    def __call__(self, calls):
+        self.batches.append([method for method, _ in calls])
+        replies = []
+        for method, params in calls:
+            table = {'getrawtransaction': self.raw, 'gettransaction': self.wallet,
+                     'decoderawtransaction': self.raw_hex}[method]
+            if params[0] in table:
+                replies.append((table[params[0]], None))
+            else:
+                replies.append((None, {"code": -5, "message": "No such transaction"}))
+        return replies
+
+
+def write_journal(path, records):
+    path.write_text(''.join(json.dumps(record) + '\n' for record in records))
+
+
+def test_statuses(tmp_path):
+    write_journal(tmp_path / 'airDropOutput.jsonl', [
+        {"file": "s00001.html", "txid": "ok", "address": "DA"},
+        {"file": "s00002.html", "txid": "wrong", "address": "DB"},
+        {"file": "s00003.html", "txid": "young", "address": "DC"},
+        {"file": "s00004.html", "txid": "part", "address": "DD"},
+        {"file": "s00005.html", "txid": "gone", "address": "DE"},
+        {"file": "s00006.html", "txid": "wallet", "address": "DF"},
+    ])
+    node = FakeNode(raw={"ok": tx("DA"), "wrong": tx("DX"), "young": tx("DC", confirmations=0),
+                         "part": tx("9Script", script_type='scripthash')},
+                    wallet={"wallet": {"confirmations": 2, "hex": "beef"}},
+                    raw_hex={"beef": tx("DF")})
+    report = verify_ledger(str(tmp_path / 'airDropOutput.json'), cache=VerifiedCache(str(tmp_path / 'cache.jsonl')),
+                           rpc=node, workers=1)
+    assert report["counts"] == {"verified": 2, "wrong_address": 1, "pending": 1, "verified_partial": 1, "missing": 1}
+    assert node.batches[0] == ['getrawtransaction'] * 6
+    assert len(node.batches) == 3
+
+
+def test_verified_txids_are_not_checked_again(tmp_path):
+    write_journal(tmp_path / 'airDropOutput.jsonl', [{"file": "s00001.html", "txid": "ok", "address": "DA"}])
+    cache_path = str(tmp_path / 'cache.jsonl')
+    node = FakeNode(raw={"ok": tx("DA")})
+    verify_ledger(str(tmp_path / 'airDropOutput.jsonl'), cache=VerifiedCache(cache_path), rpc=node, workers=1)
+    report = verify_ledger(str(tmp_path / 'airDropOutput.jsonl'), cache=VerifiedCache(cache_path), rpc=node,
+                           workers=1)
+    assert report["cached"] == 1
+    assert len(node.batches) == 1
+
+
+def test_the_airdrop_list_decides_the_recipient(tmp_path):
+    write_journal(tmp_path / 'airDropOutput.jsonl', [{"file": "s00001.html", "txid": "ok", "address": "DWrong"}])
+    (tmp_path / 'airDropList.json').write_text(json.dumps({"airDropList": [{"dogecoin_address": "DA"}]}))
+    report = verify_ledger(str(tmp_path / 'airDropOutput.jsonl'), str(tmp_path / 'airDropList.json'),
+                           cache=VerifiedCache(str(tmp_path / 'cache.jsonl')), rpc=FakeNode(raw={"ok": tx("DA")}),
+                           workers=1)
+    assert report["counts"] == {"verified": 1}
+    assert [mismatch["status"] for mismatch in report["mismatches"]] == ["list_mismatch"]
+
+
+def test_only_the_latest_record_per_file_is_verified(tmp_path):
+    write_journal(tmp_path / 'airDropOutput.jsonl', [{"file": "s00001.html", "txid": "old", "address": "DA"},
+                                                     {"file": "s00001.html", "txid": "new", "address": "DA"}])
+    assert list(iter_ledger(str(tmp_path / 'airDropOutput.jsonl'))) == [("s00001.html", "new", "DA")]
+
+
+def test_unreadable_journal_lines_are_skipped_and_counted(tmp_path, capsys):
+    journal = tmp_path / 'airDropOutput.jsonl'
+    write_journal(journal, [{"file": "s00001.html", "txid": "ok", "address": "DA"}])
+    with open(journal, 'a') as file:
+        file.write('{"file": "s00002.ht\n')
+    report = verify_ledger(str(journal), cache=VerifiedCache(str(tmp_path / 'cache.jsonl')),
+                           rpc=FakeNode(raw={"ok": tx("DA")}), workers=1)
+    assert report["counts"] == {"verified": 1}
+    assert report["unreadable"] == 1
+    print_report(report)
+    assert "1 unreadable journal lines skipped" in capsys.readouterr().out
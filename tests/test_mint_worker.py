@@ -0,0 +1,93 @@
+import os
+import shutil
+
+import pytest
+
+from mint_simulator import SimulatedNode, make_campaign, sim_address
+from mint_worker import MintWorkerPool
+
+
+def test_worker_mode_is_off_by_default(monkeypatch):
+    assert MintWorkerPool.from_env() is None
+    monkeypatch.setenv('MINT_WORKERS', '0')
+    assert MintWorkerPool.from_env() is None
+
+
+def test_one_worker_per_wallet_directory(monkeypatch):
+    monkeypatch.setenv('MINT_WORKERS', os.pathsep.join(['wallet1', 'wallet2']))
+    pool = MintWorkerPool.from_env()
+    assert [worker.cwd for worker in pool.workers] == ['wallet1', 'wallet2']
+    pool.close()
+
+    monkeypatch.setenv('MINT_WORKERS', '1')
+    pool = MintWorkerPool.from_env()
+    assert [worker.cwd for worker in pool.workers] == [None]
+    pool.close()
+
+
+def test_several_workers_on_one_wallet_are_refused(monkeypatch):
+    monkeypatch.setenv('MINT_WORKERS', '4')
+    with pytest.raises(ValueError, match="one wallet"):
+        MintWorkerPool.from_env()
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="mintworker.js needs node")
+def test_worker_mints_and_is_restarted_after_a_crash(tmp_path, monkeypatch):
+    node = SimulatedNode(block_interval=3600).start()
+    monkeypatch.setenv('SIM_NODE_URL', node.url)
+    monkeypatch.setenv('SIM_MINT_LATENCY_MS', '1')
+    files, wallet_dirs = make_campaign(str(tmp_path), 2, 1, 100)
+    pool = MintWorkerPool(wallet_dirs)
+    try:
+        first = pool.run(['mint', sim_address('holder'), os.path.join(files, 'dpaystone00001.html')])
+        assert first.returncode == 0
+        assert 'inscription txid:' in first.stdout
+
+        worker = pool.workers[0]
+        worker.process.kill()
+        worker.process.wait()
+        second = pool.run(['mint', sim_address('holder'), os.path.join(files, 'dpaystone00002.html')])
+        assert 'inscription txid:' in second.stdout
+        assert worker.restarts == 1
+    finally:
+        pool.close()
+        node.stop()
+
+
+# A doginals-like CLI: main() runs on load, and `stray` writes to stdout behind console's back.
+FAKE_CLI = """#!/usr/bin/env node
+const fs = require('fs')
+
+async function main() {
+    fs.appendFileSync('main_calls.txt', process.argv[2] + '\\n')
+    if (process.argv[2] == 'stray') process.stdout.write('(node) a warning on stdout\\n')
+    console.log('inscription txid: ' + process.argv[2])
+}
+
+main().catch(e => console.log(e.message))
+"""
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="mintworker.js needs node")
+def test_the_load_time_main_call_does_not_run(tmp_path):
+    (tmp_path / 'index.js').write_text(FAKE_CLI)
+    pool = MintWorkerPool([str(tmp_path)])
+    try:
+        assert pool.run(['tx1']).stdout == 'inscription txid: tx1\n'
+    finally:
+        pool.close()
+    assert (tmp_path / 'main_calls.txt').read_text() == 'tx1\n'
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="mintworker.js needs node")
+def test_a_stray_stdout_line_fails_the_job_and_restarts_the_worker(tmp_path):
+    (tmp_path / 'index.js').write_text(FAKE_CLI)
+    pool = MintWorkerPool([str(tmp_path)])
+    try:
+        stray = pool.run(['stray'])
+        assert stray.returncode == -1
+        assert 'a warning on stdout' in stray.stderr
+        assert pool.run(['tx2']).stdout == 'inscription txid: tx2\n'
+        assert pool.workers[0].restarts == 1
+    finally:
+        pool.close()
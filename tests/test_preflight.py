@@ -0,0 +1,77 @@
+import json
+import os
+
+import pytest
+
+from mint_journal import open_journal
+from mint_simulator import sim_address
+from preflight import address_problem, build_plan, preflight
+
+ADDRESS = sim_address('holder')
+
+
+def campaign(tmp_path, numbers, satoshis=10 ** 12):
+    files = tmp_path / 'files'
+    files.mkdir()
+    for number in numbers:
+        (files / f"dpaystone{number:05}.html").write_text('<p>' + 'x' * 500)
+    (tmp_path / '.wallet.json').write_text(json.dumps({"utxos": [{"satoshis": satoshis}]}))
+    return str(files)
+
+
+def items(count, address=ADDRESS):
+    return [(number, {'dogecoin_address': address}) for number in range(1, count + 1)]
+
+
+def job_files(plan):
+    return [os.path.basename(path) for path, _ in plan.jobs]
+
+
+def test_missing_files_and_bad_addresses_are_rejected(tmp_path):
+    files = campaign(tmp_path, [1, 3])
+    plan = build_plan(items(3), files, 'dpaystone', 'html', wallet_dirs=[str(tmp_path)])
+    assert job_files(plan) == ['dpaystone00001.html', 'dpaystone00003.html']
+    assert plan.rejected == {'dpaystone00002.html': "file not found"}
+
+    plan = build_plan([(3, {'dogecoin_address': 'not an address'})], files, 'dpaystone', 'html',
+                      wallet_dirs=[str(tmp_path)])
+    assert plan.jobs == []
+    assert plan.rejected['dpaystone00003.html'].startswith("not an address: not base58check")
+    assert address_problem(ADDRESS) is None
+
+
+def test_a_funds_shortfall_stops_the_campaign(tmp_path, monkeypatch, capsys):
+    monkeypatch.delenv('PREFLIGHT_ALLOW_SHORTFALL', raising=False)
+    files = campaign(tmp_path, [1, 2], satoshis=1000)
+    plan = build_plan(items(2), files, 'dpaystone', 'html', wallet_dirs=[str(tmp_path)])
+    assert plan.balance_sats == 1000
+    assert plan.shortfall_sats == plan.cost_sats - 1000 > 0
+
+    assert preflight(items(2), files, 'dpaystone', 'html', wallet_dirs=[str(tmp_path)]) is None
+    out = capsys.readouterr().out
+    assert "DOGE short of the estimated cost" in out
+    assert "Preflight failed" in out
+
+    monkeypatch.setenv('PREFLIGHT_ALLOW_SHORTFALL', '1')
+    assert job_files(preflight(items(2), files, 'dpaystone', 'html', wallet_dirs=[str(tmp_path)])) == [
+        'dpaystone00001.html', 'dpaystone00002.html']
+
+
+def test_an_unreadable_wallet_leaves_the_balance_unknown(tmp_path):
+    files = campaign(tmp_path, [1])
+    (tmp_path / '.wallet.json').write_text('{')
+    plan = build_plan(items(1), files, 'dpaystone', 'html', wallet_dirs=[str(tmp_path)])
+    assert plan.balance_sats is None
+    assert plan.shortfall_sats == 0
+
+
+def test_resume_skips_files_already_in_the_journal(tmp_path):
+    files = campaign(tmp_path, [1, 2, 3])
+    journal = open_journal(str(tmp_path / 'airDropOutput.json'))
+    journal.record('dpaystone00002.html', 'tx2', ADDRESS)
+
+    plan = build_plan(items(3), files, 'dpaystone', 'html', journal.by_file, wallet_dirs=[str(tmp_path)])
+    assert job_files(plan) == ['dpaystone00001.html', 'dpaystone00003.html']
+    assert plan.rejected == {}
+    full = build_plan(items(3), files, 'dpaystone', 'html', wallet_dirs=[str(tmp_path)])
+    assert plan.cost_sats == pytest.approx(full.cost_sats * 2 / 3)
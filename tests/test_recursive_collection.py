@@ -0,0 +1,55 @@
+import json
+import re
+
+from html_collection import CompiledTemplate
+from recursive_collection import prepare_shared_collection, shared_file_names, split_template, stub_template
+
+TEMPLATE = '<title>#{0:05d}</title>\n<p class="{1}">{color}</p>\n'
+TRAITS = {'color': 'red <b>'}
+
+
+def stub_values(stub):
+    """The values the stub's script puts into the parent's markers."""
+    return json.loads('[' + re.search(r'let v=\[(.*?)\],d=', stub).group(1) + ']')
+
+
+def test_split_template_keeps_constants_in_the_parent():
+    parent, fields = split_template(TEMPLATE, args=('gold',), newline='\n')
+    assert parent == '<title>#__ITEM0__</title>\n<p class="gold">__ITEM1__</p>\n'
+    assert fields == ['0:05d', 'color']
+
+
+def test_a_stub_fills_the_parent_in_to_the_full_item():
+    parent, fields = split_template(TEMPLATE, args=('gold',), newline='\n')
+    template = stub_template(fields).replace('{parent_id}', 'abci0')
+    stub = CompiledTemplate(template, '\n').render(7, traits=TRAITS)
+
+    assert 'fetch("/content/abci0")' in stub
+    assert '<b>' not in stub  # trait values are escaped for <script>
+    values = stub_values(stub)
+    assert values == ['00007', 'red <b>']
+    filled = re.sub(r'__ITEM(\d+)__', lambda match: values[int(match.group(1))], parent)
+    assert filled == CompiledTemplate(TEMPLATE, '\n').render(7, ('gold',), TRAITS)
+
+
+def test_a_changed_parent_drops_the_inscribed_txid(tmp_path, capsys):
+    parent_file, spec_file = shared_file_names('dpaystone', 'html')
+    manifest = tmp_path / 'traits.json'
+    manifest.write_text(json.dumps([TRAITS] * 3))
+    collection = tmp_path / 'collection'
+    shared = dict(directory=str(collection), manifest_path=str(manifest))
+    spec = prepare_shared_collection(TEMPLATE, 1, 3, 'dpaystone', **shared, args=('gold',))
+    assert spec['parent_txid'] is None
+    assert not (collection / 'dpaystone00001.html').exists()  # stubs wait for the parent's txid
+
+    spec['parent_txid'] = 'abc'  # as the mint driver records it
+    (collection / spec_file).write_text(json.dumps(spec))
+    spec = prepare_shared_collection(TEMPLATE, 1, 3, 'dpaystone', **shared, args=('gold',))
+    assert spec['parent_txid'] == 'abc'
+    assert 'fetch("/content/abci0")' in (collection / 'dpaystone00003.html').read_text()
+
+    spec = prepare_shared_collection(TEMPLATE, 1, 3, 'dpaystone', **shared, args=('silver',))
+    assert spec['parent_txid'] is None
+    assert json.loads((collection / spec_file).read_text())['parent_txid'] is None
+    assert 'class="silver"' in (collection / parent_file).read_text()
+    assert "changed since it was inscribed as abci0" in capsys.readouterr().out
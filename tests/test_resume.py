@@ -0,0 +1,54 @@
+"""Drivers resume a campaign by file name: a second run mints exactly what the journal lacks."""
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from mint_simulator import _RUNNER, DRIVERS, REPO_DIR, SimulatedNode, make_campaign
+
+pytestmark = pytest.mark.skipif(shutil.which('node') is None, reason="the simulated doginals CLI needs node")
+
+OUTPUTS = {'inscriberauto': 'airDropOutput', 'HTMLairdropper': 'airDropOutput', 'inscriberautoV2': 'NothingStonesOutput'}
+
+
+def run_driver(driver, root, files, items, node):
+    env = dict(os.environ, RPC_USER='sim', RPC_PASSWORD='sim', RPC_HOST='127.0.0.1',
+               RPC_PORT=str(node.server.server_address[1]), SIM_NODE_URL=node.url, SIM_MINT_LATENCY_MS='1',
+               MEMPOOL_CHAIN_LIMIT='25', BLOCK_POLL_INTERVAL='0.2')
+    script = _RUNNER.format(repo=REPO_DIR, files=files, prefix='dpaystone', items=items, wallet_dirs=[],
+                            driver=DRIVERS[driver])
+    process = subprocess.run([sys.executable, '-c', script], cwd=root, env=env, capture_output=True, text=True,
+                             timeout=120)
+    assert process.returncode == 0, process.stdout[-2000:] + process.stderr[-2000:]
+
+
+@pytest.fixture
+def node():
+    node = SimulatedNode(block_interval=0.2).start()
+    yield node
+    node.stop()
+
+
+@pytest.mark.parametrize('driver', sorted(OUTPUTS))
+def test_resume_fills_gaps_in_the_journal(driver, node, tmp_path):
+    root = str(tmp_path)
+    files, _ = make_campaign(root, 8, 1, 200)
+    run_driver(driver, root, files, 8, node)
+
+    journal_path = tmp_path / f"{OUTPUTS[driver]}.jsonl"
+    records = [json.loads(line) for line in journal_path.read_text().splitlines()]
+    # As if the first run had stopped after item 5 with item 3 never recorded.
+    kept = {f"dpaystone{number:05}.html" for number in (1, 2, 4, 5)}
+    journal_path.write_text(''.join(json.dumps(record) + '\n' for record in records if record['file'] in kept))
+    (tmp_path / f"{OUTPUTS[driver]}.json").unlink()
+    run_driver(driver, root, files, 8, node)
+
+    records = [json.loads(line) for line in journal_path.read_text().splitlines()]
+    assert sorted(record['file'] for record in records) == [f"dpaystone{number:05}.html" for number in range(1, 9)]
+    addresses = json.loads((tmp_path / 'airDropList.json').read_text())['airDropList']
+    ledger = json.loads((tmp_path / f"{OUTPUTS[driver]}.json").read_text())
+    for number in range(1, 9):
+        assert ledger[f"dpaystone{number:05}.html"]['address'] == addresses[number - 1]['dogecoin_address']
@@ -0,0 +1,75 @@
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mint_simulator import SimulatedNode
+from rpc_client import JsonRpcError, RpcClient
+
+
+class OneShotHandler(BaseHTTPRequestHandler):
+    """Answers getblockcount, then drops the connection without saying so (a keep-alive timeout)."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        body = json.dumps({"result": 7, "error": None, "id": request["id"]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+def unused_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_calls_and_batches():
+    node = SimulatedNode(block_interval=3600).start()
+    try:
+        client = RpcClient(node.url)
+        assert client.getblockcount() == 0
+        assert client([("getblockcount", []), ("gettransaction", ["00" * 32])])[0] == (0, None)
+        with pytest.raises(JsonRpcError) as error:
+            client.gettransaction("00" * 32)
+        assert error.value.code == -5
+    finally:
+        node.stop()
+
+
+def test_gives_up_after_max_attempts():
+    client = RpcClient(f"http://u:p@127.0.0.1:{unused_port()}/", failure_threshold=2, base_backoff=0.01,
+                       max_attempts=3)
+    with pytest.raises(ConnectionError):
+        client.getblockcount()
+
+
+def test_max_attempts_defaults_from_the_environment(monkeypatch):
+    monkeypatch.setenv('RPC_MAX_ATTEMPTS', '4')
+    assert RpcClient("http://u:p@127.0.0.1:1/").max_attempts == 4
+    monkeypatch.setenv('RPC_MAX_ATTEMPTS', '0')
+    assert RpcClient("http://u:p@127.0.0.1:1/").max_attempts is None
+
+
+def test_a_stale_keep_alive_connection_is_not_a_failure():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), OneShotHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = RpcClient(f"http://u:p@127.0.0.1:{server.server_address[1]}/", max_attempts=1)
+        failures = []
+        client._record_failure = failures.append
+        assert client.getblockcount() == 7
+        assert client.getblockcount() == 7  # the pooled connection is dead by now
+        assert failures == []
+        assert client.http_requests == 2
+    finally:
+        server.shutdown()
+        server.server_close()
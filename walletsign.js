@@ -0,0 +1,42 @@
+// Signs a transaction with the doginals wallet in the current directory, locally.
+//
+// Reads one JSON request from stdin: {"outputs": [["<address>", <satoshis>], ...], "fee": <satoshis>}
+// and spends every UTXO in .wallet.json to those outputs, in that order. Prints
+// {"txid": "...", "hex": "...", "outputs": [{"n": 0, "script": "...", "satoshis": ...}, ...]}.
+// The private key is read here and never leaves this process; nothing is sent
+// to the node, the caller broadcasts the hex.
+//
+// Run it from the wallet directory, where doginals and its node_modules live:
+//   node walletsign.js < request.json
+const fs = require('fs')
+const path = require('path')
+const Module = require('module')
+
+// bitcore-lib-doge comes from the doginals checkout, as it does for `node . wallet send`.
+const dogecore = Module.createRequire(path.resolve('index.js'))('bitcore-lib-doge')
+
+function sign(request) {
+    const wallet = JSON.parse(fs.readFileSync('.wallet.json', 'utf8'))
+    const tx = new dogecore.Transaction()
+    tx.from(wallet.utxos)
+    for (const [address, satoshis] of request.outputs) {
+        tx.to(address, satoshis)
+    }
+    tx.fee(request.fee)
+    tx.sign(wallet.privkey)
+    if (!tx.isFullySigned()) {
+        throw new Error('the wallet key does not sign every input')
+    }
+    return {
+        txid: tx.hash,
+        hex: tx.toString(),
+        outputs: tx.outputs.map((output, n) => ({ n, script: output.script.toHex(), satoshis: output.satoshis })),
+    }
+}
+
+try {
+    process.stdout.write(JSON.stringify(sign(JSON.parse(fs.readFileSync(0, 'utf8')))) + '\n')
+} catch (e) {
+    process.stderr.write(`walletsign failed: ${e.message}\n`)
+    process.exit(1)
+}